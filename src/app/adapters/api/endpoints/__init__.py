@@ -1,7 +1,30 @@
-from fastapi import FastAPI
+from app.core.config import Config
+from app.core.errors import OverloadedError
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+
+from .error_messages import ERROR_OVERLOADED
+
+
+async def overloaded_handler(request: Request, exc: OverloadedError) -> ORJSONResponse:
+    """Answer a shed request with a 503 telling the client when to retry."""
+    return ORJSONResponse(
+        {"detail": ERROR_OVERLOADED},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 def init_api(app: FastAPI):
-    from . import short_url
+    from . import health, short_url
+
+    if Config.METRICS_ENABLED:
+        from app.adapters.api.metrics_middleware import MetricsMiddleware
+
+        from . import metrics
 
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
+    app.add_exception_handler(OverloadedError, overloaded_handler)
+    app.include_router(health.router)
     app.include_router(short_url.router, prefix="/api")
@@ -2,3 +2,9 @@ ERROR_SHORT_URL_NOT_FOUND = "Short URL not found."
 ERROR_SHORT_CODE_CONFLICT = (
     "Short code conflict. Unable to generate a unique short code."
 )
+ERROR_CLICK_STATS_DISABLED = "Click statistics are disabled."
+ERROR_CLICK_RANGE_INVALID = "The range must end after it starts."
+ERROR_CLICK_RANGE_TOO_LARGE = "The range spans more buckets than allowed."
+ERROR_HEAVY_HITTERS_DISABLED = "Top links tracking is disabled."
+ERROR_INVALID_CURSOR = "The cursor must be the ID of a listed short URL."
+ERROR_OVERLOADED = "The service is overloaded, retry later."
@@ -0,0 +1,17 @@
+from app.core.readiness import readiness
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/ready", responses={503: {"description": "The worker is still warming up."}}
+)
+async def ready():
+    """Report whether connection pools and caches are warm, with every check's state."""
+    checks = readiness.status()
+    is_ready = all(checks.values())
+    return ORJSONResponse(
+        {"ready": is_ready, "checks": checks}, status_code=200 if is_ready else 503
+    )
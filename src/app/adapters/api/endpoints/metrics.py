@@ -0,0 +1,11 @@
+from app.core.metrics import CONTENT_TYPE, registry
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose the metrics of this worker in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
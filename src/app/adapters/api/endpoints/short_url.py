@@ -1,34 +1,78 @@
 import logging
+from datetime import UTC, datetime
+from typing import Literal
 
-from app.adapters.cache.redis_cache import delete_cache_key
-from app.adapters.db.mongo_db import get_short_link_collection
-from app.adapters.db.mongo_db.short_url_repository import MotorMongoShortURLRepository
+import orjson
+from app.adapters.cache.heavy_hitters import get_heavy_hitters
+from app.adapters.db.repositories import (
+    get_click_stats_repository,
+    get_short_url_repository,
+)
 from app.core.config import Config
 from app.core.errors import DuplicateEntityError
+from app.core.object_id import is_object_id
+from app.entities.click_stats.click_buckets import DEFAULT_RANGES, as_utc, bucket_count
 from app.entities.short_url.short_url_entity import ShortURLEntity
 from app.frameworks_and_drivers.api_models import (
+    BulkShortURLItem,
+    BulkShortURLResponse,
+    BulkURLPayload,
     ClickCountResponse,
+    ClickHistoryResponse,
     ShortURLResponse,
+    TopLinksResponse,
     URLPayload,
 )
+from app.interfaces.click_stats_interface import ClickStatsRepository
+from app.interfaces.short_url_interface import ShortURLRepository
+from app.use_cases.click_aggregator import get_click_aggregator
+from app.use_cases.short_code_allocator import get_short_code_allocator
 from app.use_cases.short_url_use_case import ShortURLUseCase
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import RedirectResponse
-from fastapi_cache.decorator import cache
-from motor.motor_asyncio import AsyncIOMotorCollection
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, RedirectResponse, StreamingResponse
 
-from .error_messages import ERROR_SHORT_CODE_CONFLICT, ERROR_SHORT_URL_NOT_FOUND
+from .error_messages import (
+    ERROR_CLICK_RANGE_INVALID,
+    ERROR_CLICK_RANGE_TOO_LARGE,
+    ERROR_CLICK_STATS_DISABLED,
+    ERROR_HEAVY_HITTERS_DISABLED,
+    ERROR_INVALID_CURSOR,
+    ERROR_OVERLOADED,
+    ERROR_SHORT_CODE_CONFLICT,
+    ERROR_SHORT_URL_NOT_FOUND,
+)
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/short_url")
+# Hot endpoints return ORJSONResponse themselves: their data is already validated, so
+# the response model is only used for the OpenAPI schema and not checked again.
+router = APIRouter(
+    prefix="/short_url",
+    default_response_class=ORJSONResponse,
+    responses={503: {"description": ERROR_OVERLOADED}},
+)
 
 
 def get_use_case(
-    short_link_collection: AsyncIOMotorCollection = Depends(get_short_link_collection),
+    short_url_repository: ShortURLRepository = Depends(get_short_url_repository),
+) -> ShortURLUseCase:
+    return ShortURLUseCase(
+        short_url_repository,
+        click_aggregator=get_click_aggregator(),
+        code_allocator=get_short_code_allocator(),
+    )
+
+
+def get_click_stats_use_case(
+    short_url_repository: ShortURLRepository = Depends(get_short_url_repository),
+    click_stats: ClickStatsRepository | None = Depends(get_click_stats_repository),
 ) -> ShortURLUseCase:
+    if click_stats is None:
+        raise HTTPException(status_code=404, detail=ERROR_CLICK_STATS_DISABLED)
     return ShortURLUseCase(
-        MotorMongoShortURLRepository(collection=short_link_collection)
+        short_url_repository,
+        click_aggregator=get_click_aggregator(),
+        click_stats=click_stats,
     )
 
 
@@ -42,51 +86,148 @@ async def create_short_url(
 ):
     """Generate and store a short URL for the given long URL."""
     try:
-        logger.info(f"Generating short URL for {payload.long_url}")
-        return await repo.create(ShortURLEntity(**payload.model_dump()))
+        logger.info("Generating short URL for %s", payload.long_url)
+        return await repo.create(
+            ShortURLEntity(long_url=payload.long_url, expires_at=payload.expires_at)
+        )
     except DuplicateEntityError:
-        logging.error("Short code conflict. Unable to generate a unique short code.")
+        logger.error("Short code conflict. Unable to generate a unique short code.")
         raise HTTPException(
             status_code=409,
             detail="Short code conflict. Unable to generate a unique short code.",
         )
 
 
+@router.post("/generate_short_urls/", response_model=BulkShortURLResponse)
+async def create_short_urls(
+    payload: BulkURLPayload, use_case: ShortURLUseCase = Depends(get_use_case)
+):
+    """Generate and store short URLs for many long URLs in one request."""
+    logger.info("Generating short URLs for %s long URLs", len(payload.long_urls))
+    created = await use_case.create_many(
+        [
+            ShortURLEntity(long_url=long_url, expires_at=payload.expires_at)
+            for long_url in payload.long_urls
+        ]
+    )
+    return BulkShortURLResponse(
+        items=[
+            BulkShortURLItem(long_url=long_url, short_code=url.short_code)
+            if url
+            else BulkShortURLItem(long_url=long_url, error=ERROR_SHORT_CODE_CONFLICT)
+            for long_url, url in zip(payload.long_urls, created)
+        ]
+    )
+
+
+@router.get(
+    "/top/",
+    response_model=TopLinksResponse,
+    responses={404: {"description": ERROR_HEAVY_HITTERS_DISABLED}},
+)
+async def get_top_links(
+    limit: int = Query(10, ge=1, le=Config.HEAVY_HITTERS_MAX_TOP),
+):
+    """Retrieve the most clicked short URLs of the last minutes across all workers."""
+    heavy_hitters = get_heavy_hitters()
+    if heavy_hitters is None:
+        raise HTTPException(status_code=404, detail=ERROR_HEAVY_HITTERS_DISABLED)
+    summaries, top = await heavy_hitters.top(limit)
+    return ORJSONResponse(
+        {
+            "window_seconds": heavy_hitters.window,
+            "summaries": summaries,
+            "links": [
+                {"short_code": code, "clicks": clicks, "min_clicks": clicks - error}
+                for code, clicks, error in top
+            ],
+        }
+    )
+
+
+async def _ndjson_rows(rows, chunk_rows: int):
+    # Rows are encoded straight from tuples and sent in chunks of ``chunk_rows`` lines.
+    chunk = []
+    async for id, short_code, long_url, click_count in rows:
+        chunk.append(
+            orjson.dumps(
+                {
+                    "id": id,
+                    "short_code": short_code,
+                    "long_url": long_url,
+                    "click_count": click_count,
+                }
+            )
+        )
+        if len(chunk) >= chunk_rows:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+@router.get(
+    "/export/",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One JSON object per line with id, short_code, long_url "
+            "and click_count, in id order.",
+        },
+        400: {"description": ERROR_INVALID_CURSOR},
+    },
+)
+async def export_short_urls(
+    after: str | None = Query(None, description="Resume after the row with this id."),
+    limit: int | None = Query(None, ge=1, description="Largest number of rows."),
+    use_case: ShortURLUseCase = Depends(get_use_case),
+):
+    """Stream every short URL with its click count as NDJSON, paging by id."""
+    if after is not None and not is_object_id(after):
+        raise HTTPException(status_code=400, detail=ERROR_INVALID_CURSOR)
+    rows = use_case.iter_short_url_rows(after=after, limit=limit)
+    return StreamingResponse(
+        _ndjson_rows(rows, Config.EXPORT_BATCH_SIZE),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get(
     "/get_long_url/{short_code}",
     response_model=ShortURLResponse,
     responses={404: {"description": ERROR_SHORT_URL_NOT_FOUND}},
 )
-@cache(expire=Config.CACHE_TIME)
 async def get_long_url(
     short_code: str, use_case: ShortURLUseCase = Depends(get_use_case)
 ):
     """Retrieve the original URL for the given short code."""
     short_url_data = await use_case.get_by_short_code(short_code=short_code)
     if not short_url_data:
-        logger.error(f"Short URL not found for code {short_code}")
+        logger.error("Short URL not found for code %s", short_code)
         raise HTTPException(status_code=404, detail=ERROR_SHORT_URL_NOT_FOUND)
-    return short_url_data
+    return ORJSONResponse(short_url_data.to_response())
 
 
 @router.get(
-    "/{short_code}", responses={404: {"description": ERROR_SHORT_URL_NOT_FOUND}}
+    "/{short_code}",
+    status_code=Config.REDIRECT_STATUS_CODE,
+    response_class=RedirectResponse,
+    responses={404: {"description": ERROR_SHORT_URL_NOT_FOUND}},
 )
 async def redirect_to_long_url(
     short_code: str, use_case: ShortURLUseCase = Depends(get_use_case)
 ):
-    """Redirect to the original long URL using the short code."""
-    url = await use_case.get_by_short_code(short_code=short_code)
-    await delete_cache_key(
-        use_case.get_by_short_code,
-        namespace=use_case.cache_namespace,
-        short_code=short_code,
-    )
-    if not url:
-        logger.error(f"Short URL not found for code {short_code}")
+    """Redirect straight to the original long URL using the short code."""
+    long_url = await use_case.resolve_long_url(short_code=short_code)
+    if long_url is None:
+        logger.error("Short URL not found for code %s", short_code)
         raise HTTPException(status_code=404, detail=ERROR_SHORT_URL_NOT_FOUND)
     await use_case.update_click_count(short_code)
-    return RedirectResponse(url=f"/get_long_url/{short_code}")
+    heavy_hitters = get_heavy_hitters()
+    if heavy_hitters is not None:
+        heavy_hitters.add(short_code)
+    return RedirectResponse(url=long_url, status_code=Config.REDIRECT_STATUS_CODE)
 
 
 @router.get(
@@ -98,8 +239,48 @@ async def get_click_count(
     short_code: str, use_case: ShortURLUseCase = Depends(get_use_case)
 ):
     """Retrieve the click count for the given short code."""
-    url = await use_case.get_by_short_code(short_code=short_code)
-    if not url:
-        logger.error(f"Short URL not found for code {short_code}")
+    click_count = await use_case.get_click_count(short_code)
+    if click_count is None:
+        logger.error("Short URL not found for code %s", short_code)
         raise HTTPException(status_code=404, detail=ERROR_SHORT_URL_NOT_FOUND)
-    return ClickCountResponse(**(url if isinstance(url, dict) else url.model_dump()))
+    return ORJSONResponse({"click_count": click_count})
+
+
+@router.get(
+    "/clicks/{short_code}",
+    response_model=ClickHistoryResponse,
+    responses={
+        400: {
+            "description": f"{ERROR_CLICK_RANGE_INVALID} {ERROR_CLICK_RANGE_TOO_LARGE}"
+        },
+        404: {"description": ERROR_SHORT_URL_NOT_FOUND},
+    },
+)
+async def get_click_history(
+    short_code: str,
+    granularity: Literal["minute", "hour", "day"] = "hour",
+    start: datetime | None = Query(None, description="Defaults to a range before end."),
+    end: datetime | None = Query(None, description="Exclusive; defaults to now."),
+    use_case: ShortURLUseCase = Depends(get_click_stats_use_case),
+):
+    """Retrieve the clicks of a short code per minute, hour or day over a time range."""
+    end = datetime.now(UTC) if end is None else as_utc(end)
+    start = end - DEFAULT_RANGES[granularity] if start is None else as_utc(start)
+    if start >= end:
+        raise HTTPException(status_code=400, detail=ERROR_CLICK_RANGE_INVALID)
+    if bucket_count(start, end, granularity) > Config.CLICK_STATS_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=ERROR_CLICK_RANGE_TOO_LARGE)
+    history = await use_case.get_click_history(short_code, granularity, start, end)
+    if history is None:
+        logger.error("Short URL not found for code %s", short_code)
+        raise HTTPException(status_code=404, detail=ERROR_SHORT_URL_NOT_FOUND)
+    return ORJSONResponse(
+        {
+            "short_code": short_code,
+            "granularity": granularity,
+            "total": sum(clicks for _, clicks in history),
+            "buckets": [
+                {"start": bucket, "clicks": clicks} for bucket, clicks in history
+            ],
+        }
+    )
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from app.adapters.cache.space_saving import SpaceSaving
+from app.core.config import Config
+from app.core.metrics import registry
+from fastapi_cache import FastAPICache
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+HEAVY_HITTERS_PUBLISHES = registry.counter(
+    "heavy_hitters_publishes_total",
+    "Heavy-hitters summaries written to Redis, by outcome.",
+    ("outcome",),
+)
+
+
+class HeavyHitters:
+    """
+    Per-worker tracker of the most clicked short codes, merged across workers in Redis.
+
+    Every redirect adds its short code to a fixed-size Space-Saving summary in process
+    memory, which takes constant time and never allocates beyond ``capacity``
+    counters. Every ``publish_interval`` seconds the worker replaces its copy of the
+    summary for the current time window in Redis with two sorted sets, one for the
+    counts and one for their error bounds, and records the summary's floor: the most
+    clicks a code it does not track may have had. Readers sum the sets of every worker
+    over the current and the previous window, so the top links cover the last one to
+    two windows and trail the redirects by at most ``publish_interval``.
+
+    A code missing from a full summary is counted at that summary's floor, with the
+    floor added to its error too. Both sets therefore hold scores minus the floor, so
+    that a plain ``ZUNIONSTORE`` adds the floors of the summaries lacking a code once
+    the sum of all floors is added back to the merged scores.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        capacity: int = Config.HEAVY_HITTERS_CAPACITY,
+        window: int = Config.HEAVY_HITTERS_WINDOW,
+        publish_interval: float = Config.HEAVY_HITTERS_PUBLISH_INTERVAL,
+        prefix: str = f"{Config.CACHE_KEY_PREFIX}:hh",
+    ) -> None:
+        """
+        Initialize HeavyHitters.
+
+        :param redis: Redis client the summaries are merged through.
+        :param capacity: Number of short codes tracked by each worker.
+        :param window: Length in seconds of the windows the summaries cover.
+        :param publish_interval: Seconds between two writes of the summary to Redis.
+        :param prefix: Prefix of the Redis keys.
+        """
+        self.redis = redis
+        self.window = window
+        self.publish_interval = publish_interval
+        self.prefix = prefix
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.summary = SpaceSaving(capacity)
+        self._window_index = self.current_window()
+        self._task: asyncio.Task | None = None
+
+    def current_window(self) -> int:
+        """Return the index of the window the current time falls in."""
+        return int(time.time() // self.window)
+
+    def _workers_key(self, window_index: int) -> str:
+        return f"{self.prefix}:{window_index}:workers"
+
+    def _counts_key(self, window_index: int, worker_id: str) -> str:
+        return f"{self.prefix}:{window_index}:{worker_id}"
+
+    def _floors_key(self, window_index: int) -> str:
+        return f"{self.prefix}:{window_index}:floors"
+
+    def add(self, short_code: str) -> None:
+        """
+        Record one click on a short code.
+
+        :param short_code: The short code that was clicked.
+        """
+        self.summary.add(short_code)
+
+    async def publish(self) -> None:
+        """
+        Write the summary of the current window to Redis.
+
+        Once the window is over, its final state is written and the summary starts
+        empty for the next one.
+        """
+        window_index = self._window_index
+        counts_key = self._counts_key(window_index, self.worker_id)
+        top = self.summary.top(self.summary.capacity)
+        floor = self.summary.floor()
+        # Keys outlive the window they belong to by one window, while it is "previous".
+        ttl = 2 * self.window + int(self.publish_interval) + 1
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(counts_key, f"{counts_key}:err")
+            if top:
+                pipe.zadd(counts_key, {code: count - floor for code, count, _ in top})
+                pipe.zadd(
+                    f"{counts_key}:err",
+                    {code: error - floor for code, _, error in top},
+                )
+                pipe.expire(counts_key, ttl)
+                pipe.expire(f"{counts_key}:err", ttl)
+            pipe.sadd(self._workers_key(window_index), self.worker_id)
+            pipe.expire(self._workers_key(window_index), ttl)
+            pipe.hset(self._floors_key(window_index), self.worker_id, floor)
+            pipe.expire(self._floors_key(window_index), ttl)
+            await pipe.execute()
+        if self.current_window() != window_index:
+            self._window_index = self.current_window()
+            self.summary.clear()
+
+    async def top(self, n: int) -> tuple[int, list[tuple[str, int, int]]]:
+        """
+        Merge the summaries of every worker and return the most clicked short codes.
+
+        :param n: Largest number of short codes returned.
+        :return: The number of summaries merged and ``(short_code, clicks, error)``
+            tuples by decreasing clicks; the true clicks over the merged summaries lie
+            between ``clicks - error`` and ``clicks``.
+        """
+        current = self.current_window()
+        windows = (current, current - 1)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for window_index in windows:
+                pipe.smembers(self._workers_key(window_index))
+                pipe.hgetall(self._floors_key(window_index))
+            replies = await pipe.execute()
+        keys = []
+        floors = 0
+        for window_index, worker_ids, window_floors in zip(
+            windows, replies[::2], replies[1::2]
+        ):
+            for worker_id in worker_ids:
+                keys.append(self._counts_key(window_index, worker_id))
+                floors += int(window_floors.get(worker_id, 0))
+        if not keys:
+            return 0, []
+        # A key per call, so concurrent readers never see each other's partial merge.
+        merged = f"{self.prefix}:merged:{uuid.uuid4().hex}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(merged, keys)
+            pipe.zunionstore(f"{merged}:err", [f"{key}:err" for key in keys])
+            pipe.expire(f"{merged}:err", self.window)
+            pipe.zrevrange(merged, 0, n - 1, withscores=True)
+            pipe.delete(merged)
+            ranked = (await pipe.execute())[3]
+        errors = []
+        if ranked:
+            errors = await self.redis.zmscore(
+                f"{merged}:err", [code for code, _ in ranked]
+            )
+        await self.redis.delete(f"{merged}:err")
+        return len(keys), [
+            (code, int(clicks) + floors, int(error or 0) + floors)
+            for (code, clicks), error in zip(ranked, errors)
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            try:
+                await self.publish()
+                HEAVY_HITTERS_PUBLISHES.labels("ok").inc()
+            except Exception as e:
+                HEAVY_HITTERS_PUBLISHES.labels("error").inc()
+                logger.error("Failed to publish the heavy hitters: %s", e)
+
+    def start(self) -> None:
+        """Start publishing the summary in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background publishing and write the summary one last time."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.publish()
+        except Exception as e:
+            logger.error("Failed to publish the heavy hitters: %s", e)
+
+
+_heavy_hitters: HeavyHitters | None = None
+
+
+def start_heavy_hitters() -> HeavyHitters | None:
+    """
+    Create and start the heavy-hitters tracker of the current worker, unless disabled.
+
+    Uses the Redis client set up by ``init_redis_cache``.
+
+    :return: The running tracker, or None if heavy hitters are disabled.
+    """
+    global _heavy_hitters
+    if Config.HEAVY_HITTERS_ENABLED and _heavy_hitters is None:
+        _heavy_hitters = HeavyHitters(FastAPICache.get_backend().redis)
+        _heavy_hitters.start()
+    return _heavy_hitters
+
+
+def get_heavy_hitters() -> HeavyHitters | None:
+    """Return the heavy-hitters tracker of the current worker, if it was started."""
+    return _heavy_hitters
+
+
+async def stop_heavy_hitters() -> None:
+    """Publish the last clicks and stop the heavy-hitters tracker of the current worker."""
+    global _heavy_hitters
+    if _heavy_hitters is not None:
+        await _heavy_hitters.stop()
+    _heavy_hitters = None
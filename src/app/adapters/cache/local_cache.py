@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LocalTTLCache:
+    """
+    Bounded in-process LRU cache whose entries also expire after a TTL.
+
+    Not thread-safe: it is meant to be used from a single event loop per worker.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Initialize the cache.
+
+        :param max_size: Maximum number of entries kept before evicting the least recently used.
+        :param ttl: Default time to live of an entry, in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_with_ttl(self, key: str) -> tuple[float, Any]:
+        """
+        Return the remaining TTL and the value stored under the key.
+
+        :param key: Cache key.
+        :return: Remaining seconds and the value, or (0, None) on a miss.
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            remaining = entry[0] - time.monotonic()
+            if remaining > 0:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return remaining, entry[1]
+            del self._data[key]
+        self.misses += 1
+        return 0, None
+
+    def get(self, key: str) -> Any:
+        """
+        Return the value stored under the key, or None on a miss.
+
+        :param key: Cache key.
+        """
+        return self.get_with_ttl(key)[1]
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """
+        Store a value, evicting the least recently used entries when full.
+
+        :param key: Cache key.
+        :param value: Value to store.
+        :param ttl: Time to live in seconds, capped by the cache default.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """
+        Remove a single entry.
+
+        :param key: Cache key.
+        :return: True if the entry was present.
+        """
+        return self._data.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Remove every entry whose key starts with the prefix.
+
+        :param prefix: Key prefix, usually a cache namespace.
+        :return: Number of removed entries.
+        """
+        keys = [key for key in self._data if key.startswith(prefix)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit, miss and eviction counters along with the current size."""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
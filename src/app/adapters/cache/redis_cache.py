@@ -1,60 +1,217 @@
+import asyncio
 import logging
 
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.adapters.cache.redis_ring import ShardedRedis
+from app.adapters.cache.short_code_filter import (
+    rebuild_short_code_filter,
+    short_code_filter,
+)
 from app.core.config import Config
+from app.core.metrics import registry
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
-from starlette.requests import Request
-from starlette.responses import Response
 
 logger = logging.getLogger(__name__)
 
+INVALIDATE_KEY = "key"
+INVALIDATE_NAMESPACE = "ns"
+SHORT_CODES_CREATED = "code"
+
+local_cache = LocalTTLCache(
+    max_size=Config.LOCAL_CACHE_MAX_SIZE, ttl=Config.LOCAL_CACHE_TTL
+)
+
+_invalidation_task: asyncio.Task | None = None
+_short_url_redis: ShardedRedis | None = None
+
+CACHE_LOOKUPS = registry.counter(
+    "cache_lookups_total",
+    "Cache lookups by namespace, tier (local or redis) and result (hit or miss).",
+    ("namespace", "tier", "result"),
+)
+registry.callback(
+    "local_cache_events_total",
+    "Hits, misses and evictions of the per-worker local cache tier.",
+    "counter",
+    lambda: {
+        (event,): value
+        for event, value in local_cache.stats().items()
+        if event != "size"
+    },
+    ("event",),
+)
+registry.callback(
+    "local_cache_entries",
+    "Entries held by the per-worker local cache tier.",
+    "gauge",
+    lambda: local_cache.stats()["size"],
+)
+
+
+class TieredRedisBackend(RedisBackend):
+    """
+    Redis backend aware of the per-worker in-process tier.
+
+    Entries are read and written through :class:`ShortURLCache`, which fills the local
+    tier. Clearing a key or namespace, e.g. ``FastAPICache.clear(namespace="u")``,
+    also publishes an invalidation message so that every worker drops its local copy.
+    """
+
+    def __init__(self, redis: aioredis.Redis, local: LocalTTLCache):
+        super().__init__(redis)
+        self.local = local
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        result = await super().clear(namespace, key)
+        if namespace:
+            self.local.delete_prefix(f"{namespace}:")
+            await self.redis.publish(
+                Config.CACHE_INVALIDATION_CHANNEL, f"{INVALIDATE_NAMESPACE}:{namespace}"
+            )
+        elif key:
+            self.local.delete(key)
+            await self.redis.publish(
+                Config.CACHE_INVALIDATION_CHANNEL, f"{INVALIDATE_KEY}:{key}"
+            )
+        return result
+
 
 def init_redis_cache():
     """
     Initialize the Redis cache for FastAPI.
+
+    With ``REDIS_CACHE_NODES`` set, the short URL cache is sharded over those nodes,
+    while the FastAPI cache, pub/sub and the heavy hitters stay on ``REDIS_CACHE_URL``.
     """
+    global _short_url_redis
     logger.info("Initializing Redis cache...")
     redis = aioredis.from_url(
         Config.REDIS_CACHE_URL, encoding="utf8", decode_responses=True
     )
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(
+        TieredRedisBackend(redis, local_cache), prefix=Config.CACHE_KEY_PREFIX
+    )
+    nodes = [url.strip() for url in Config.REDIS_CACHE_NODES.split(",") if url.strip()]
+    _short_url_redis = ShardedRedis.from_urls(nodes) if nodes else None
 
     logger.info("Redis cache initialized.")
 
 
-def my_key_builder(
-    func,
-    namespace: str = "",
-    request: Request | None = None,
-    response: Response | None = None,
-    **kwargs,
-) -> str:
+def get_short_url_redis() -> aioredis.Redis | ShardedRedis:
+    """
+    Return the Redis client holding the short URL cache.
+
+    :return: The sharded client if ``REDIS_CACHE_NODES`` is set, else the FastAPI
+        cache client.
     """
-    Custom key builder for FastAPI cache.
+    if _short_url_redis is not None:
+        return _short_url_redis
+    return FastAPICache.get_backend().redis
+
 
-    :param func: The function for which the cache key is being built.
-    :param namespace: Optional namespace for the cache key.
-    :param request: Optional FastAPI request object.
-    :param response: Optional FastAPI response object.
-    :param kwargs: Additional keyword arguments.
-    :return: The cache key as a string.
+async def warm_redis_pool(connections: int = Config.REDIS_WARM_CONNECTIONS) -> None:
     """
-    kwargs = kwargs.get("kwargs")
-    return FastAPICache.get_key_builder()(func, namespace, kwargs=kwargs)
+    Open Redis connections ahead of the first requests.
 
+    Concurrent PINGs each take their own connection from the pool, so the pool of
+    every node holds ``connections`` open connections afterwards.
 
-async def delete_cache_key(func, namespace: str, **kwargs):
+    :param connections: Number of connections to open.
     """
-    Delete a specific cache key.
+    redis = FastAPICache.get_backend().redis
+    pings = [redis.ping() for _ in range(connections)]
+    if _short_url_redis is not None:
+        pings += [
+            node.ping()
+            for node in _short_url_redis.clients.values()
+            for _ in range(connections)
+        ]
+    await asyncio.gather(*pings)
+    logger.info("Warmed %s Redis connections.", len(pings))
+
+
+def apply_invalidation(message: str) -> None:
+    """
+    Drop local cache entries named by an invalidation message.
+
+    :param message: Message in the ``<kind>:<target>`` form published by the backend.
+    """
+    kind, _, target = message.partition(":")
+    if kind == INVALIDATE_KEY:
+        local_cache.delete(target)
+    elif kind == INVALIDATE_NAMESPACE:
+        local_cache.delete_prefix(f"{target}:")
+    elif kind == SHORT_CODES_CREATED:
+        for short_code in target.split(","):
+            short_code_filter.add(short_code)
+    else:
+        logger.warning("Ignoring unknown cache invalidation message %r.", message)
+
+
+async def _listen_for_invalidations(redis: aioredis.Redis) -> None:
+    subscribed_before = False
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(Config.CACHE_INVALIDATION_CHANNEL)
+            # Anything cached while we were not subscribed may be stale, and codes
+            # created meanwhile were never added to the short code filter.
+            local_cache.clear()
+            if subscribed_before:
+                rebuild_short_code_filter()
+            subscribed_before = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Cache invalidation listener failed: %s", e)
+            local_cache.clear()
+            # Until we are subscribed again new codes would be rejected as unknown.
+            short_code_filter.reset()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+
+def start_cache_invalidation_listener() -> None:
+    """Subscribe the current worker to cache invalidations published by its peers."""
+    global _invalidation_task
+    if _invalidation_task is None:
+        backend = FastAPICache.get_backend()
+        _invalidation_task = asyncio.create_task(
+            _listen_for_invalidations(backend.redis)
+        )
+
+
+async def stop_cache_invalidation_listener() -> None:
+    """Cancel the invalidation listener started for the current worker."""
+    global _invalidation_task
+    if _invalidation_task is not None:
+        _invalidation_task.cancel()
+        try:
+            await _invalidation_task
+        except asyncio.CancelledError:
+            pass
+    _invalidation_task = None
+
+
+async def announce_short_codes(short_codes: list[str]) -> None:
+    """
+    Tell every worker about newly created short codes.
+
+    Each worker adds the codes to its short code filter, which also drops any
+    remembered miss for them. Misses are never stored in Redis.
 
-    :param func: The function for which the cache key is being deleted.
-    :param namespace: The namespace for the cache key.
-    :param kwargs: Additional keyword arguments.
+    :param short_codes: The created short codes.
     """
-    logger.info(
-        f"Deleting cache key for function {func.__name__} in namespace {namespace}"
+    if not short_codes:
+        return
+    message = f"{SHORT_CODES_CREATED}:{','.join(short_codes)}"
+    apply_invalidation(message)
+    await FastAPICache.get_backend().redis.publish(
+        Config.CACHE_INVALIDATION_CHANNEL, message
     )
-    key: str = my_key_builder(func, namespace, kwargs=kwargs)
-    await FastAPICache.get_backend().clear(key=key)
-    logger.info(f"Cache {key=} deleted.")
@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+from collections.abc import Iterable
+from hashlib import blake2b
+
+from app.core.config import Config
+from redis import asyncio as aioredis
+
+
+def ring_hash(value: str) -> int:
+    """
+    Return the position of a key or virtual node on the ring.
+
+    :param value: The key, or ``<node>#<replica>`` for a virtual node.
+    :return: A 64 bit integer.
+    """
+    return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to node names.
+
+    Every node is placed on the ring ``replicas`` times and a key belongs to the first
+    virtual node at or after its own position, wrapping around. Adding a node therefore
+    only moves the keys that now fall just before its virtual nodes, about
+    ``1 / (nodes + 1)`` of them, and removing a node only moves the keys it owned.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str] = (),
+        replicas: int = Config.REDIS_CACHE_RING_REPLICAS,
+    ) -> None:
+        """
+        Initialize HashRing.
+
+        :param nodes: Names of the initial nodes.
+        :param replicas: Virtual nodes per node; more spread the keys more evenly.
+        """
+        self.replicas = replicas
+        self._positions: list[int] = []
+        self._owners: list[str] = []
+        self.nodes: set[str] = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        """
+        Place a node on the ring.
+
+        :param node: Name of the node.
+        """
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            position = ring_hash(f"{node}#{replica}")
+            index = bisect.bisect_left(self._positions, position)
+            self._positions.insert(index, position)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        """
+        Take a node off the ring.
+
+        :param node: Name of the node.
+        """
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [
+            (position, owner)
+            for position, owner in zip(self._positions, self._owners)
+            if owner != node
+        ]
+        self._positions = [position for position, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> str:
+        """
+        Return the node a key belongs to.
+
+        :param key: The key.
+        :raises LookupError: If the ring has no nodes.
+        """
+        if not self._positions:
+            raise LookupError("The hash ring has no nodes.")
+        index = bisect.bisect_left(self._positions, ring_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+class ShardedPipeline:
+    """
+    Non-transactional pipeline over a :class:`ShardedRedis`.
+
+    Commands are buffered with their key, sent as one pipeline per node concurrently on
+    ``execute`` and their results returned in the order the commands were queued.
+    """
+
+    def __init__(self, sharded: "ShardedRedis") -> None:
+        self.sharded = sharded
+        self._commands: list[tuple[str, str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "ShardedPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands.clear()
+
+    def _queue(self, command: str, key: str, *args, **kwargs) -> "ShardedPipeline":
+        self._commands.append((command, key, args, kwargs))
+        return self
+
+    def get(self, key: str) -> "ShardedPipeline":
+        return self._queue("get", key)
+
+    def set(self, key: str, value: str, **kwargs) -> "ShardedPipeline":
+        return self._queue("set", key, value, **kwargs)
+
+    def ttl(self, key: str) -> "ShardedPipeline":
+        return self._queue("ttl", key)
+
+    def delete(self, key: str) -> "ShardedPipeline":
+        return self._queue("delete", key)
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        by_node: dict[str, list[int]] = {}
+        for index, (_, key, _, _) in enumerate(commands):
+            by_node.setdefault(self.sharded.ring.node_for(key), []).append(index)
+
+        async def run(node: str, indexes: list[int]) -> list:
+            async with self.sharded.clients[node].pipeline(transaction=False) as pipe:
+                for index in indexes:
+                    command, key, args, kwargs = commands[index]
+                    getattr(pipe, command)(key, *args, **kwargs)
+                return await pipe.execute()
+
+        results: list = [None] * len(commands)
+        node_results = await asyncio.gather(
+            *(run(node, indexes) for node, indexes in by_node.items())
+        )
+        for indexes, values in zip(by_node.values(), node_results):
+            for index, value in zip(indexes, values):
+                results[index] = value
+        return results
+
+
+class ShardedRedis:
+    """
+    Client spreading string keys over several Redis nodes with a consistent hash ring.
+
+    Offers the subset of the ``redis.asyncio.Redis`` API used by the short URL cache:
+    single-key commands go to the node owning the key, while ``mget``, ``delete`` and
+    pipelines are split per node and sent concurrently. When nodes are added or
+    removed only the keys whose owner changed miss, and they are filled again from the
+    repository; their copies left on the previous owner expire with their TTL.
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, aioredis.Redis],
+        replicas: int = Config.REDIS_CACHE_RING_REPLICAS,
+    ) -> None:
+        """
+        Initialize ShardedRedis.
+
+        :param clients: Redis clients returning decoded strings, keyed by node name.
+        :param replicas: Virtual nodes per node on the hash ring.
+        """
+        self.clients = dict(clients)
+        self.ring = HashRing(self.clients, replicas)
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str], **kwargs) -> "ShardedRedis":
+        """
+        Connect to Redis nodes, naming each node after its URL.
+
+        :param urls: Redis URLs of the nodes.
+        :param kwargs: Passed on to the constructor.
+        :return: The sharded client.
+        """
+        return cls(
+            {
+                url: aioredis.from_url(url, encoding="utf8", decode_responses=True)
+                for url in urls
+            },
+            **kwargs,
+        )
+
+    def add_node(self, name: str, client: aioredis.Redis) -> None:
+        """
+        Add a node; about ``1 / nodes`` of the keys move to it.
+
+        :param name: Name of the node.
+        :param client: Redis client of the node.
+        """
+        self.clients[name] = client
+        self.ring.add(name)
+
+    def remove_node(self, name: str) -> aioredis.Redis:
+        """
+        Remove a node; only its keys move, spread over the remaining nodes.
+
+        :param name: Name of the node.
+        :return: The Redis client of the removed node, for the caller to close.
+        """
+        self.ring.remove(name)
+        return self.clients.pop(name)
+
+    def client_for(self, key: str) -> aioredis.Redis:
+        return self.clients[self.ring.node_for(key)]
+
+    def pipeline(self, transaction: bool = False) -> ShardedPipeline:
+        if transaction:
+            raise ValueError("Transactions cannot span several Redis nodes.")
+        return ShardedPipeline(self)
+
+    async def get(self, key: str) -> str | None:
+        return await self.client_for(key).get(key)
+
+    async def set(self, key: str, value: str, **kwargs) -> bool | None:
+        return await self.client_for(key).set(key, value, **kwargs)
+
+    async def ttl(self, key: str) -> int:
+        return await self.client_for(key).ttl(key)
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.get(key)
+            return await pipe.execute()
+
+    async def delete(self, *keys: str) -> int:
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.delete(key)
+            return sum(await pipe.execute())
+
+    async def ping(self) -> bool:
+        return all(
+            await asyncio.gather(*(client.ping() for client in self.clients.values()))
+        )
+
+    async def close(self) -> None:
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
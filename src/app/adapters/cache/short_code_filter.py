@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import re
+import time
+from collections.abc import AsyncIterator, Callable
+
+from app.adapters.cache.bloom_filter import BloomFilter
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+SHORT_CODE_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+
+class ShortCodeFilter:
+    """
+    Membership pre-filter answering "this short code does not exist" without any I/O.
+
+    Codes are rejected when they are malformed, when the Bloom filter built from the
+    collection has never seen them, or when a recent lookup found nothing. Announcements
+    of created codes reach other workers asynchronously, so for ``grace`` seconds after
+    the filter is built and after each announcement, codes the Bloom filter has not
+    seen are looked up in the repository instead of being rejected.
+    """
+
+    def __init__(
+        self,
+        capacity: int = Config.SHORT_CODE_FILTER_CAPACITY,
+        error_rate: float = Config.SHORT_CODE_FILTER_ERROR_RATE,
+        max_length: int = Config.SHORT_CODE_MAX_LENGTH,
+        grace: float = Config.SHORT_CODE_FILTER_GRACE,
+    ) -> None:
+        """
+        Initialize ShortCodeFilter.
+
+        :param capacity: Number of short codes the Bloom filter is sized for.
+        :param error_rate: False positive rate of the Bloom filter at capacity.
+        :param max_length: Longest short code considered well-formed.
+        :param grace: Seconds after the build and after each announcement during which
+            codes the Bloom filter has not seen are not rejected.
+        """
+        self.max_length = max_length
+        self.grace = grace
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.missing = LocalTTLCache(
+            max_size=Config.NEGATIVE_CACHE_MAX_SIZE, ttl=Config.NEGATIVE_CACHE_TTL
+        )
+        self.ready = False
+        self.rejected = 0
+        self._grace_until = 0.0
+
+    def is_well_formed(self, short_code: str) -> bool:
+        """
+        Check that a short code could have been issued at all.
+
+        :param short_code: The short code to check.
+        """
+        return len(short_code) <= self.max_length and bool(
+            SHORT_CODE_PATTERN.fullmatch(short_code)
+        )
+
+    def might_exist(self, short_code: str) -> bool:
+        """
+        Return False only if the short code certainly does not exist.
+
+        Until the Bloom filter is built, and during the grace window, only the format
+        and the negative cache are used.
+
+        :param short_code: The short code to check.
+        """
+        if (
+            not self.is_well_formed(short_code)
+            or self.missing.get(short_code) is not None
+            or (
+                self.ready
+                and short_code not in self.bloom
+                and time.monotonic() >= self._grace_until
+            )
+        ):
+            self.rejected += 1
+            return False
+        return True
+
+    def remember_missing(self, short_code: str) -> None:
+        """
+        Cache the fact that the repository did not find a short code.
+
+        Codes rejected by :meth:`might_exist` alone must not be remembered, since the
+        Bloom filter may not have heard of a code created on another worker yet.
+
+        :param short_code: The missing short code.
+        """
+        self.missing.set(short_code, True)
+
+    def add(self, short_code: str) -> None:
+        """
+        Register a newly created short code.
+
+        :param short_code: The created short code.
+        """
+        self.bloom.add(short_code)
+        self.missing.delete(short_code)
+        self._grace_until = time.monotonic() + self.grace
+
+    def reset(self) -> None:
+        """
+        Stop rejecting codes the Bloom filter has not seen, until it is built again.
+
+        Used when announcements of created codes may have been missed, so that lookups
+        go to the repository instead of answering 404 for codes that exist.
+        """
+        self.ready = False
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.missing.clear()
+
+    async def build(self, short_codes: AsyncIterator[str]) -> None:
+        """
+        Fill the Bloom filter with every stored short code and start using it.
+
+        :param short_codes: Iterator over all stored short codes.
+        """
+        async for short_code in short_codes:
+            self.bloom.add(short_code)
+        self._grace_until = time.monotonic() + self.grace
+        self.ready = True
+        logger.info(
+            "Short code filter built with %s codes, %s bytes, %s hashes, "
+            "expected false positive rate %.4f%%.",
+            self.bloom.count,
+            self.bloom.memory_bytes,
+            self.bloom.hash_count,
+            self.bloom.false_positive_rate * 100,
+        )
+
+
+short_code_filter = ShortCodeFilter()
+
+_build_task: asyncio.Task | None = None
+_short_codes: Callable[[], AsyncIterator[str]] | None = None
+
+
+async def _build(short_codes: AsyncIterator[str]) -> None:
+    try:
+        await short_code_filter.build(short_codes)
+    except Exception as e:
+        logger.error("Failed to build the short code filter: %s", e)
+
+
+def start_short_code_filter(short_codes: Callable[[], AsyncIterator[str]]) -> None:
+    """
+    Build the short code filter of the current worker in the background.
+
+    :param short_codes: Function returning an iterator over all stored short codes,
+        called again whenever the filter is rebuilt.
+    """
+    global _build_task, _short_codes
+    if Config.SHORT_CODE_FILTER_ENABLED and _build_task is None:
+        _short_codes = short_codes
+        _build_task = asyncio.create_task(_build(short_codes()))
+
+
+def rebuild_short_code_filter() -> None:
+    """
+    Drop the short code filter of the current worker and build it again in the background.
+
+    Lookups skip the Bloom filter until the new one is built. Called when created codes
+    may not have been announced to this worker, such as after the invalidation
+    listener lost its subscription.
+    """
+    global _build_task
+    if _short_codes is None:
+        return
+    if _build_task is not None:
+        _build_task.cancel()
+    short_code_filter.reset()
+    _build_task = asyncio.create_task(_build(_short_codes()))
+
+
+def short_code_filter_settled() -> bool:
+    """
+    Tell whether lookups no longer wait on the short code filter build.
+
+    True once the filter is built, when its build failed (lookups then skip the
+    filter), or when the filter is disabled.
+    """
+    if not Config.SHORT_CODE_FILTER_ENABLED or short_code_filter.ready:
+        return True
+    return _build_task is not None and _build_task.done()
+
+
+async def stop_short_code_filter() -> None:
+    """Cancel the short code filter build if it is still running."""
+    global _build_task, _short_codes
+    if _build_task is not None:
+        _build_task.cancel()
+        try:
+            await _build_task
+        except asyncio.CancelledError:
+            pass
+    _build_task = None
+    _short_codes = None
@@ -0,0 +1,275 @@
+import time
+from datetime import UTC, datetime
+
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.adapters.cache.redis_cache import (
+    CACHE_LOOKUPS,
+    get_short_url_redis,
+    local_cache,
+)
+from app.adapters.cache.redis_ring import ShardedRedis
+from app.core.config import Config
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from fastapi_cache import FastAPICache
+from redis import asyncio as aioredis
+
+LONG_URL_KEY_TAG = "u"
+# Formerly "e", when cached entities still carried a click count.
+ENTITY_KEY_TAG = "l"
+EXPIRY_KEY_TAG = "x"
+
+_short_url_cache: "ShortURLCache | None" = None
+
+
+def encode_entity(entity: ShortURLEntity) -> str:
+    """
+    Encode a cached short URL as ``<expires_at>:<long_url>``.
+
+    The expiry is in epoch seconds and empty for short URLs that do not expire. The
+    click count changes with every redirect, so it is not cached.
+
+    :param entity: The short URL entity.
+    :return: The cached value.
+    """
+    if entity.expires_at is None:
+        return f":{entity.long_url}"
+    return f"{int(entity.expires_at.timestamp())}:{entity.long_url}"
+
+
+def decode_entity(short_code: str, value: str) -> ShortURLEntity:
+    """
+    Decode a value written by :func:`encode_entity`.
+
+    :param short_code: The short code the value was cached under.
+    :param value: The cached value.
+    :return: The short URL entity, with a click count of 0.
+    """
+    expires_at, _, long_url = value.partition(":")
+    return ShortURLEntity(
+        long_url=long_url,
+        short_code=short_code,
+        expires_at=datetime.fromtimestamp(int(expires_at), UTC) if expires_at else None,
+    )
+
+
+def cache_ttl(expire: int, expires_at: datetime | None) -> int:
+    """
+    Cap a cache lifetime so the entry goes away no later than the short URL.
+
+    :param expire: Time to live wanted, in seconds.
+    :param expires_at: When the short URL expires, if it does.
+    :return: Time to live to use, in seconds; 0 or less means do not cache.
+    """
+    if expires_at is None:
+        return expire
+    return min(expire, int(expires_at.timestamp() - time.time()))
+
+
+def _expiry_ttl(expires_at: datetime) -> int:
+    return int(expires_at.timestamp() - time.time()) + Config.EXPIRED_LINK_CACHE_TIME
+
+
+def _lookup_counters(namespace: str) -> dict:
+    return {
+        (tier, hit): CACHE_LOOKUPS.labels(namespace, tier, "hit" if hit else "miss")
+        for tier in ("local", "redis")
+        for hit in (True, False)
+    }
+
+
+class ShortURLCache:
+    """
+    Purpose-built cache of resolved short codes.
+
+    Keys are ``<prefix>:u:<short_code>`` for the long URL and ``<prefix>:l:<short_code>``
+    for the short URL entity without its click count, and values are plain strings, so
+    no key hashing or JSON coding happens per request. Short URLs whose entries were cut
+    short by their expiry also get ``<prefix>:x:<short_code>`` with the expiry in epoch
+    seconds, kept in Redis only and past the expiry, so lookups after it need not ask
+    the repository.
+    Reads go through the per-worker local tier first and fetch the Redis TTL in the same
+    round trip as the value, and preloading many short URLs takes a single pipeline.
+    """
+
+    def __init__(
+        self, redis: aioredis.Redis | ShardedRedis, local: LocalTTLCache, prefix: str
+    ) -> None:
+        """
+        Initialize ShortURLCache.
+
+        :param redis: Redis client returning decoded strings, possibly sharded.
+        :param local: Per-worker local tier shared with the FastAPI cache backend.
+        :param prefix: Key prefix, the same as the FastAPI cache prefix so clearing it
+            clears these keys as well.
+        """
+        self.redis = redis
+        self.local = local
+        self._long_url_prefix = f"{prefix}:{LONG_URL_KEY_TAG}:"
+        self._entity_prefix = f"{prefix}:{ENTITY_KEY_TAG}:"
+        self._expiry_prefix = f"{prefix}:{EXPIRY_KEY_TAG}:"
+        self._long_url_lookups = _lookup_counters("resolve_long_url")
+        self._entity_lookups = _lookup_counters("get_by_short_code")
+
+    def long_url_key(self, short_code: str) -> str:
+        return self._long_url_prefix + short_code
+
+    def entity_key(self, short_code: str) -> str:
+        return self._entity_prefix + short_code
+
+    def expiry_key(self, short_code: str) -> str:
+        return self._expiry_prefix + short_code
+
+    async def _get_with_ttl(self, key: str, lookups: dict) -> tuple[int, str | None]:
+        entry = self.local.get(key)
+        if entry is not None:
+            lookups["local", True].inc()
+            value, deadline = entry
+            return max(0, int(deadline - time.monotonic())), value
+        lookups["local", False].inc()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            ttl, value = await pipe.ttl(key).get(key).execute()
+        lookups["redis", value is not None].inc()
+        if value is not None and ttl > 0:
+            self.local.set(key, (value, time.monotonic() + ttl), ttl)
+        return ttl, value
+
+    async def _set(self, key: str, value: str, expire: int) -> None:
+        await self.redis.set(key, value, ex=expire)
+        self.local.set(key, (value, time.monotonic() + expire), expire)
+
+    async def get_long_url_with_ttl(self, short_code: str) -> tuple[int, str | None]:
+        """
+        Return the remaining TTL and the cached long URL of a short code.
+
+        :param short_code: The short code.
+        :return: Remaining seconds and the long URL, or ``(-2, None)`` on a miss.
+        """
+        return await self._get_with_ttl(
+            self.long_url_key(short_code), self._long_url_lookups
+        )
+
+    async def set_long_url(self, short_code: str, long_url: str, expire: int) -> None:
+        """
+        Cache the long URL of a short code.
+
+        :param short_code: The short code.
+        :param long_url: Its long URL.
+        :param expire: Time to live, in seconds.
+        """
+        await self._set(self.long_url_key(short_code), long_url, expire)
+
+    async def get_expiry(self, short_code: str) -> datetime | None:
+        """
+        Return the expiry recorded by :meth:`set_expiry` for a short code.
+
+        :param short_code: The short code.
+        :return: When the short URL expires, or None if no expiry is recorded.
+        """
+        value = await self.redis.get(self.expiry_key(short_code))
+        return None if value is None else datetime.fromtimestamp(int(value), UTC)
+
+    async def set_expiry(self, short_code: str, expires_at: datetime) -> None:
+        """
+        Record when a short URL expires, for ``EXPIRED_LINK_CACHE_TIME`` past its expiry.
+
+        :param short_code: The short code.
+        :param expires_at: When the short URL expires.
+        """
+        await self.redis.set(
+            self.expiry_key(short_code),
+            str(int(expires_at.timestamp())),
+            ex=_expiry_ttl(expires_at),
+        )
+
+    async def forget_expiries(self, short_codes: list[str]) -> None:
+        """
+        Drop the recorded expiries of short codes issued again.
+
+        :param short_codes: The short codes.
+        """
+        if short_codes:
+            await self.redis.delete(*(self.expiry_key(code) for code in short_codes))
+
+    async def preload(
+        self, entities: list[ShortURLEntity], expire: int, local_limit: int = 0
+    ) -> None:
+        """
+        Cache the long URL and the entity of many short URLs in one pipelined round trip.
+
+        Entries of expiring short URLs live no longer than the short URLs, with their
+        expiry recorded as by :meth:`set_expiry`, and expired ones are skipped.
+
+        :param entities: The short URL entities, hottest first.
+        :param expire: Time to live, in seconds.
+        :param local_limit: How many of the first entities also go to the local tier.
+        """
+        ttls = [cache_ttl(expire, entity.expires_at) for entity in entities]
+        if not any(ttl > 0 for ttl in ttls):
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for entity, ttl in zip(entities, ttls):
+                if ttl <= 0:
+                    continue
+                pipe.set(self.long_url_key(entity.short_code), entity.long_url, ex=ttl)
+                pipe.set(
+                    self.entity_key(entity.short_code), encode_entity(entity), ex=ttl
+                )
+                if ttl < expire:
+                    pipe.set(
+                        self.expiry_key(entity.short_code),
+                        str(int(entity.expires_at.timestamp())),
+                        ex=_expiry_ttl(entity.expires_at),
+                    )
+            await pipe.execute()
+        now = time.monotonic()
+        for entity, ttl in zip(entities[:local_limit], ttls):
+            if ttl <= 0:
+                continue
+            self.local.set(
+                self.long_url_key(entity.short_code),
+                (entity.long_url, now + ttl),
+                ttl,
+            )
+            self.local.set(
+                self.entity_key(entity.short_code),
+                (encode_entity(entity), now + ttl),
+                ttl,
+            )
+
+    async def get_entity(self, short_code: str) -> ShortURLEntity | None:
+        """
+        Return the cached short URL entity of a short code.
+
+        :param short_code: The short code.
+        :return: The entity, or None on a miss.
+        """
+        _, value = await self._get_with_ttl(
+            self.entity_key(short_code), self._entity_lookups
+        )
+        return None if value is None else decode_entity(short_code, value)
+
+    async def set_entity(self, entity: ShortURLEntity, expire: int) -> None:
+        """
+        Cache a short URL entity under its short code.
+
+        :param entity: The entity to cache.
+        :param expire: Time to live, in seconds.
+        """
+        await self._set(
+            self.entity_key(entity.short_code), encode_entity(entity), expire
+        )
+
+
+def get_short_url_cache() -> ShortURLCache:
+    """
+    Return the short URL cache of the current worker.
+
+    It uses the Redis client and key prefix configured by ``init_redis_cache``.
+
+    :return: The short URL cache.
+    """
+    global _short_url_cache
+    redis = get_short_url_redis()
+    if _short_url_cache is None or _short_url_cache.redis is not redis:
+        _short_url_cache = ShortURLCache(redis, local_cache, FastAPICache.get_prefix())
+    return _short_url_cache
@@ -0,0 +1,157 @@
+class _Bucket:
+    """Items sharing one count, linked in increasing count order."""
+
+    __slots__ = ("count", "items", "prev", "next")
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        # A dict keeps insertion order, so the oldest item of a bucket is evicted first.
+        self.items: dict[str, None] = {}
+        self.prev: _Bucket | None = None
+        self.next: _Bucket | None = None
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters summary over strings.
+
+    Keeps at most ``capacity`` counters. An unseen item takes over the counter of the
+    least counted item and inherits its count as the error bound, so every count is an
+    overestimate by at most its error, and any item seen more than ``total / capacity``
+    times is guaranteed to be tracked. Counters live in a linked list of buckets of
+    equal count (the Stream-Summary structure), so adding one occurrence moves an item
+    to the neighbouring bucket in constant time.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Size the summary.
+
+        :param capacity: Largest number of items tracked at once.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self._bucket_of: dict[str, _Bucket] = {}
+        self._error_of: dict[str, int] = {}
+        self._min: _Bucket | None = None
+        self._max: _Bucket | None = None
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._bucket_of
+
+    def _link_after(self, anchor: _Bucket | None, bucket: _Bucket) -> None:
+        following = self._min if anchor is None else anchor.next
+        bucket.prev, bucket.next = anchor, following
+        if anchor is None:
+            self._min = bucket
+        else:
+            anchor.next = bucket
+        if following is None:
+            self._max = bucket
+        else:
+            following.prev = bucket
+
+    def _unlink(self, bucket: _Bucket) -> None:
+        if bucket.prev is None:
+            self._min = bucket.next
+        else:
+            bucket.prev.next = bucket.next
+        if bucket.next is None:
+            self._max = bucket.prev
+        else:
+            bucket.next.prev = bucket.prev
+
+    def _place(self, item: str, anchor: _Bucket | None, count: int) -> None:
+        # Find the bucket for ``count`` at or after ``anchor``; one step when adding 1.
+        following = self._min if anchor is None else anchor.next
+        while following is not None and following.count < count:
+            anchor, following = following, following.next
+        if following is None or following.count != count:
+            following = _Bucket(count)
+            self._link_after(anchor, following)
+        following.items[item] = None
+        self._bucket_of[item] = following
+
+    def add(self, item: str, count: int = 1) -> None:
+        """
+        Count occurrences of an item.
+
+        :param item: The item seen.
+        :param count: Number of occurrences.
+        """
+        self.total += count
+        bucket = self._bucket_of.get(item)
+        if bucket is None:
+            if len(self._bucket_of) < self.capacity:
+                self._error_of[item] = 0
+                self._place(item, None, count)
+                return
+            bucket = self._min
+            evicted = next(iter(bucket.items))
+            del self._bucket_of[evicted], self._error_of[evicted]
+            self._error_of[item] = bucket.count
+            self._place(item, bucket, bucket.count + count)
+            del bucket.items[evicted]
+        else:
+            new_count = bucket.count + count
+            following = bucket.next
+            if len(bucket.items) == 1 and (
+                following is None or following.count > new_count
+            ):
+                # Alone in its bucket and no bucket to join: bump the bucket in place.
+                bucket.count = new_count
+                return
+            self._place(item, bucket, new_count)
+            del bucket.items[item]
+        if not bucket.items:
+            self._unlink(bucket)
+
+    def count(self, item: str) -> int:
+        """
+        Return the estimated count of an item, or 0 if it is not tracked.
+
+        :param item: The item to look up.
+        """
+        bucket = self._bucket_of.get(item)
+        return 0 if bucket is None else bucket.count
+
+    def floor(self) -> int:
+        """
+        Return the largest count an untracked item can have.
+
+        That is the least tracked count once every counter is taken, since an item
+        seen more often would have kept or taken a counter, and 0 before.
+        """
+        if len(self) < self.capacity or self._min is None:
+            return 0
+        return self._min.count
+
+    def top(self, n: int) -> list[tuple[str, int, int]]:
+        """
+        Return the most counted items.
+
+        :param n: Largest number of items returned.
+        :return: ``(item, count, error)`` tuples by decreasing count; the true count
+            lies between ``count - error`` and ``count``.
+        """
+        result = []
+        bucket = self._max
+        while bucket is not None and len(result) < n:
+            for item in reversed(bucket.items):
+                result.append((item, bucket.count, self._error_of[item]))
+                if len(result) == n:
+                    break
+            bucket = bucket.prev
+        return result
+
+    def clear(self) -> None:
+        """Forget every item."""
+        self.total = 0
+        self._bucket_of.clear()
+        self._error_of.clear()
+        self._min = self._max = None
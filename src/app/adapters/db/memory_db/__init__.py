@@ -0,0 +1,48 @@
+from app.adapters.db.memory_db.click_stats_repository import (
+    InMemoryClickStatsRepository,
+)
+from app.adapters.db.memory_db.id_block_repository import InMemoryIdBlockRepository
+from app.adapters.db.memory_db.short_url_repository import InMemoryShortURLRepository
+
+_short_url_repository: InMemoryShortURLRepository | None = None
+_id_block_repository: InMemoryIdBlockRepository | None = None
+_click_stats_repository: InMemoryClickStatsRepository | None = None
+
+
+def memory_short_url_repository() -> InMemoryShortURLRepository:
+    """
+    Return the in-memory short URL store of the current worker.
+
+    The store lives as long as the process; run a single worker when it is the
+    primary store.
+
+    :return: In-memory short URL repository
+    """
+    global _short_url_repository
+    if _short_url_repository is None:
+        _short_url_repository = InMemoryShortURLRepository()
+    return _short_url_repository
+
+
+def memory_id_block_repository() -> InMemoryIdBlockRepository:
+    """
+    Return the in-memory ID counters of the current worker.
+
+    :return: In-memory ID block repository
+    """
+    global _id_block_repository
+    if _id_block_repository is None:
+        _id_block_repository = InMemoryIdBlockRepository()
+    return _id_block_repository
+
+
+def memory_click_stats_repository() -> InMemoryClickStatsRepository:
+    """
+    Return the in-memory click buckets of the current worker.
+
+    :return: In-memory click stats repository
+    """
+    global _click_stats_repository
+    if _click_stats_repository is None:
+        _click_stats_repository = InMemoryClickStatsRepository()
+    return _click_stats_repository
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from app.entities.click_stats.click_buckets import (
+    BUCKET_WIDTHS,
+    as_utc,
+    bucket_start,
+    retention,
+)
+from app.interfaces.click_stats_interface import ClickStatsRepository
+
+
+class InMemoryClickStatsRepository(ClickStatsRepository):
+    """
+    Process-local click buckets with the semantics of the MongoDB repository.
+
+    Buckets past their retention are dropped when the same short code gets new
+    clicks in that granularity.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[tuple[str, str], dict[datetime, int]] = {}
+
+    async def add_clicks(self, counts: dict[str, int], at: datetime) -> None:
+        """
+        Add clicks to the buckets containing a point in time.
+
+        :param counts: Number of clicks, keyed by short code.
+        :param at: When the clicks happened.
+        """
+        for granularity in BUCKET_WIDTHS:
+            start = bucket_start(at, granularity)
+            keep = retention(granularity)
+            for short_code, count in counts.items():
+                buckets = self._buckets.setdefault((short_code, granularity), {})
+                buckets[start] = buckets.get(start, 0) + count
+                if keep is not None and next(iter(buckets)) < start - keep:
+                    for expired in [s for s in buckets if s < start - keep]:
+                        del buckets[expired]
+
+    async def get_buckets(
+        self, short_code: str, granularity: str, start: datetime, end: datetime
+    ) -> dict[datetime, int]:
+        """
+        Read the non-empty buckets of a short code starting in ``[start, end)``.
+
+        :param short_code: The short code.
+        :param granularity: ``minute``, ``hour`` or ``day``.
+        :param start: Start of the range.
+        :param end: End of the range, exclusive.
+        :return: Clicks keyed by UTC bucket start.
+        """
+        first, end = bucket_start(start, granularity), as_utc(end)
+        buckets = self._buckets.get((short_code, granularity), {})
+        return {
+            bucket: clicks
+            for bucket, clicks in buckets.items()
+            if first <= bucket < end
+        }
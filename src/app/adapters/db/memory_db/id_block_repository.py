@@ -0,0 +1,27 @@
+import logging
+
+from app.interfaces.short_code_allocator_interface import IdBlockRepository
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryIdBlockRepository(IdBlockRepository):
+    """
+    Process-local counters handing out blocks of consecutive IDs.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[str, int] = {}
+
+    async def lease_block(self, name: str, size: int) -> int:
+        """
+        Reserve the next block of IDs of a counter.
+
+        :param name: Name of the counter.
+        :param size: Number of IDs to reserve.
+        :return: The first ID of the reserved block.
+        """
+        start = self._counters.get(name, 0)
+        self._counters[name] = start + size
+        logger.info("Leased IDs %s-%s of counter %s.", start, start + size - 1, name)
+        return start
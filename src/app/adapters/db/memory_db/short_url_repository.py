@@ -0,0 +1,308 @@
+import asyncio
+import bisect
+import heapq
+import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from app.core.errors import DuplicateEntityError, NotFoundError
+from app.core.hashing import long_url_digest
+from app.core.object_id import new_object_id
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from app.interfaces.short_url_interface import ShortURLRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ShortURLRecord:
+    """Compact stored form of a short URL."""
+
+    __slots__ = ("id", "long_url", "short_code", "click_count", "expires_at")
+
+    def __init__(
+        self,
+        id: str,
+        long_url: str,
+        short_code: str,
+        click_count: int,
+        expires_at: datetime | None = None,
+    ) -> None:
+        self.id = id
+        self.long_url = long_url
+        self.short_code = short_code
+        self.click_count = click_count
+        self.expires_at = expires_at
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= datetime.now(UTC)
+
+    def to_dto(self) -> ShortURLDTO:
+        return ShortURLDTO(
+            _id=self.id,
+            long_url=self.long_url,
+            short_code=self.short_code,
+            click_count=self.click_count,
+            expires_at=self.expires_at,
+        )
+
+
+class InMemoryShortURLRepository(ShortURLRepository):
+    """
+    Process-local repository for ShortURL operations.
+
+    Records are indexed by short code, by long URL digest and by ID and follow the
+    semantics of the MongoDB repository: long URLs are deduplicated, duplicate short
+    codes are rejected and clicks for unknown short codes are ignored. Every method
+    completes without awaiting, so each call is atomic within the event loop. Expired
+    records are treated as missing and dropped when they are next looked up.
+    """
+
+    def __init__(self) -> None:
+        self._by_short_code: dict[str, ShortURLRecord] = {}
+        self._by_long_url_hash: dict[bytes, ShortURLRecord] = {}
+        self._by_id: dict[str, ShortURLRecord] = {}
+        # Sorted IDs, including those of dropped records until the list is compacted.
+        self._ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._by_short_code)
+
+    def _live(self, short_code: str) -> ShortURLRecord | None:
+        record = self._by_short_code.get(short_code)
+        if record is not None and record.expired():
+            self._drop(record)
+            return None
+        return record
+
+    def _live_by_long_url(self, digest: bytes) -> ShortURLRecord | None:
+        record = self._by_long_url_hash.get(digest)
+        if record is not None and record.expired():
+            self._drop(record)
+            return None
+        return record
+
+    def _drop(self, record: ShortURLRecord) -> None:
+        del self._by_short_code[record.short_code]
+        del self._by_long_url_hash[long_url_digest(record.long_url)]
+        del self._by_id[record.id]
+        if len(self._ids) > 2 * len(self._by_id):
+            self._ids = [id for id in self._ids if id in self._by_id]
+
+    def _insert(self, url: ShortURLDTO, digest: bytes) -> None:
+        record = ShortURLRecord(
+            new_object_id(),
+            url.long_url,
+            url.short_code,
+            url.click_count,
+            url.expires_at,
+        )
+        self._by_short_code[url.short_code] = record
+        self._by_long_url_hash[digest] = record
+        self._by_id[record.id] = record
+        if not self._ids or self._ids[-1] < record.id:
+            self._ids.append(record.id)
+        else:
+            # Out of order after a clock change; copied so running scans keep theirs.
+            ids = self._ids[:]
+            bisect.insort(ids, record.id)
+            self._ids = ids
+        url.id = record.id
+
+    async def create(self, url: ShortURLDTO) -> ShortURLDTO:
+        """
+        Store a new short URL.
+
+        :param url: The short URL data transfer object.
+        :return: The created short URL with its ID, or the stored one for a known long URL.
+        :raises DuplicateEntityError: If a short URL with the same code already exists.
+        """
+        digest = long_url_digest(url.long_url)
+        existing = self._live_by_long_url(digest)
+        if existing is not None:
+            logger.warning("Short URL with long URL '%s' already exists.", url.long_url)
+            return existing.to_dto()
+        if self._live(url.short_code) is not None:
+            logger.error("Short URL with code %s already exists.", url.short_code)
+            raise DuplicateEntityError(
+                f"Short URL with code {url.short_code} already exists."
+            )
+        self._insert(url, digest)
+        logger.info("Short URL created with ID %s.", url.id)
+        return url
+
+    async def create_many(
+        self, urls: list[ShortURLDTO]
+    ) -> tuple[list[ShortURLDTO], list[ShortURLDTO]]:
+        """
+        Store many short URLs.
+
+        Long URLs that are already stored are returned as they are in the store.
+
+        :param urls: The short URL data transfer objects, with distinct long URLs.
+        :return: The stored short URLs and the ones whose short code already exists.
+        """
+        stored, conflicts = [], []
+        for url in urls:
+            digest = long_url_digest(url.long_url)
+            existing = self._live_by_long_url(digest)
+            if existing is not None:
+                stored.append(existing.to_dto())
+            elif self._live(url.short_code) is not None:
+                conflicts.append(url)
+            else:
+                self._insert(url, digest)
+                stored.append(url)
+        logger.info(
+            "Created %s short URLs, %s short code conflicts.",
+            len(stored),
+            len(conflicts),
+        )
+        return stored, conflicts
+
+    async def get_by_short_code(self, short_code: str) -> ShortURLDTO | None:
+        """
+        Retrieve a short URL by its short code.
+
+        :param short_code: The short code of the URL.
+        :return: The short URL data transfer object if found, else None.
+        """
+        record = self._live(short_code)
+        if record is None:
+            logger.warning("Short URL with code %s not found.", short_code)
+            return None
+        return record.to_dto()
+
+    async def get_long_url(self, short_code: str) -> str | None:
+        """
+        Retrieve only the long URL for a short code.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL if found, else None.
+        """
+        record = self._live(short_code)
+        return None if record is None else record.long_url
+
+    async def get_long_url_with_expiry(
+        self, short_code: str
+    ) -> tuple[str | None, datetime | None]:
+        """
+        Retrieve the long URL and the expiry of a short code.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL and when it expires, or ``(None, None)`` if not found.
+        """
+        record = self._live(short_code)
+        return (None, None) if record is None else (record.long_url, record.expires_at)
+
+    async def update_click_count(self, short_code: str) -> ShortURLDTO:
+        """
+        Increment the click count of a short URL.
+
+        :param short_code: The short code of the URL.
+        :return: The updated short URL data transfer object.
+        :raises NotFoundError: If the short URL with the given code is not found.
+        """
+        record = self._live(short_code)
+        if record is None:
+            logger.warning("Short URL with code %s not found.", short_code)
+            raise NotFoundError(f"Short URL with code {short_code} not found.")
+        record.click_count += 1
+        return record.to_dto()
+
+    async def get_click_count(self, short_code: str) -> int | None:
+        """
+        Read the click count of a short URL.
+
+        :param short_code: The short code of the URL.
+        :return: The click count if the short URL exists, else None.
+        """
+        record = self._live(short_code)
+        return None if record is None else record.click_count
+
+    async def increment_click_counts(self, counts: dict[str, int]) -> None:
+        """
+        Add aggregated clicks to many short URLs, skipping unknown short codes.
+
+        :param counts: Number of clicks to add, keyed by short code.
+        """
+        updated = 0
+        for short_code, count in counts.items():
+            record = self._live(short_code)
+            if record is not None:
+                record.click_count += count
+                updated += 1
+        logger.info(
+            "Flushed clicks for %s short URLs, %s records updated.",
+            len(counts),
+            updated,
+        )
+
+    async def iter_short_codes(self, batch_size: int = 10_000) -> AsyncIterator[str]:
+        """
+        Stream every stored short code.
+
+        :param batch_size: Number of codes yielded between returns to the event loop.
+        :return: Async iterator over a snapshot of the short codes.
+        """
+        for index, short_code in enumerate(list(self._by_short_code), 1):
+            yield short_code
+            if index % batch_size == 0:
+                await asyncio.sleep(0)
+
+    async def iter_short_urls(
+        self, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream every stored short URL in creation order.
+
+        :param batch_size: Number of short URLs yielded between returns to the event loop.
+        :return: Async iterator over a snapshot of the short URLs.
+        """
+        for index, record in enumerate(list(self._by_short_code.values()), 1):
+            if not record.expired():
+                yield record.to_dto()
+            if index % batch_size == 0:
+                await asyncio.sleep(0)
+
+    async def iter_short_url_rows(
+        self, after: str | None = None, batch_size: int = 1_000
+    ) -> AsyncIterator[tuple[str, str, str, int]]:
+        """
+        Stream the fields of every stored short URL in ID order, as plain tuples.
+
+        IDs are ObjectIds kept in a sorted list, so resuming after ``after`` takes a
+        binary search instead of a scan of the records before it.
+
+        :param after: Only stream short URLs whose ID sorts after this one.
+        :param batch_size: Number of short URLs yielded between returns to the event loop.
+        :return: Async iterator over ``(id, short_code, long_url, click_count)``.
+        """
+        # The list is only appended to in place, so this is a valid snapshot.
+        ids = self._ids
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        for index in range(start, len(ids)):
+            record = self._by_id.get(ids[index])
+            if record is not None and not record.expired():
+                yield record.id, record.short_code, record.long_url, record.click_count
+            if (index - start + 1) % batch_size == 0:
+                await asyncio.sleep(0)
+
+    async def iter_top_short_urls(
+        self, limit: int, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream the most clicked short URLs, most clicked first.
+
+        :param limit: Largest number of short URLs returned.
+        :param batch_size: Number of short URLs yielded between returns to the event loop.
+        :return: Async iterator over the short URLs.
+        """
+        top = heapq.nlargest(
+            limit,
+            (record for record in self._by_short_code.values() if not record.expired()),
+            key=lambda record: record.click_count,
+        )
+        for index, record in enumerate(top, 1):
+            yield record.to_dto()
+            if index % batch_size == 0:
+                await asyncio.sleep(0)
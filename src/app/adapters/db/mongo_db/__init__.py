@@ -1,52 +1,241 @@
+import asyncio
 import logging
 
 from app.core.config import Config
-from fastapi import Depends
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
     AsyncIOMotorCollection,
     AsyncIOMotorDatabase,
 )
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
+SHORT_URL_COLLECTION_NAME = "short_urls"
+COUNTER_COLLECTION_NAME = "counters"
+CLICK_BUCKET_COLLECTION_NAME = "click_buckets"
+LONG_URL_HASH_UNIQUE_INDEX = "long_url_hash_1"
+LONG_URL_HASH_SHARDED_INDEX = "long_url_hash_sharded"
 
-def mongo_client(mongo_url: str = Config.MONGODB_DB_URL) -> AsyncIOMotorClient:
+_client: AsyncIOMotorClient | None = None
+_short_link_collection: AsyncIOMotorCollection | None = None
+_click_bucket_collection: AsyncIOMotorCollection | None = None
+
+
+def create_mongo_client(mongo_url: str = Config.MONGODB_DB_URL) -> AsyncIOMotorClient:
     """
-    Initialize and return MongoDB client.
+    Create a new MongoDB client with the pool settings from Config.
 
     :param mongo_url: MongoDB connection URL
     :return: MongoDB client
     """
-    logging.info(f"Connecting to MongoDB at {mongo_url}...")
-    return AsyncIOMotorClient(mongo_url)
+    logger.info("Connecting to MongoDB at %s...", mongo_url)
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=Config.MONGODB_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=Config.MONGODB_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=Config.MONGODB_SOCKET_TIMEOUT_MS,
+        serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        waitQueueTimeoutMS=Config.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    )
+
+
+def mongo_client() -> AsyncIOMotorClient:
+    """
+    Return the pooled MongoDB client shared by the current worker.
+
+    The client is created on first use; later calls reuse its connection pool.
+
+    :return: MongoDB client
+    """
+    global _client
+    if _client is None:
+        _client = create_mongo_client()
+    return _client
+
+
+def close_mongo_client() -> None:
+    """Close the shared MongoDB client and drop the cached collection."""
+    global _client, _short_link_collection, _click_bucket_collection
+    if _client is not None:
+        logger.info("Closing MongoDB client...")
+        _client.close()
+    _client = None
+    _short_link_collection = None
+    _click_bucket_collection = None
+
+
+async def warm_mongo_pool(connections: int = Config.MONGODB_WARM_CONNECTIONS) -> None:
+    """
+    Open MongoDB connections ahead of the first requests.
+
+    Concurrent pings each check out a connection, so the pool holds up to
+    ``connections`` open connections afterwards, capped by ``MONGODB_MAX_POOL_SIZE``.
+
+    :param connections: Number of connections to open.
+    """
+    connections = min(connections, Config.MONGODB_MAX_POOL_SIZE)
+    admin = mongo_client().admin
+    await asyncio.gather(*(admin.command("ping") for _ in range(connections)))
+    logger.info("Warmed %s MongoDB connections.", connections)
 
 
 def short_url_db(
-    client: AsyncIOMotorClient = Depends(mongo_client),
+    client: AsyncIOMotorClient | None = None,
     db_name: str = Config.LINK_MINIMIZER_DB_NAME,
 ) -> AsyncIOMotorDatabase:
     """
     Get MongoDB database from a client.
 
-    :param client: MongoDB client
+    :param client: MongoDB client, defaults to the shared worker client
     :param db_name: Database name
     :return: MongoDB Database
     """
-    logging.info(f"Accessing database {db_name}")
-    return client[db_name]
+    return (client or mongo_client())[db_name]
+
+
+async def shard_short_link_collection(collection: AsyncIOMotorCollection) -> None:
+    """
+    Shard the short links collection on a hashed ``short_code`` key.
+
+    Lookups, click updates and inserts all carry the short code, so each is routed to a
+    single shard, and hashing spreads sequentially allocated codes evenly. The hashed
+    index backing the shard key is created first, as a collection holding documents
+    cannot be sharded without it, and the unique ``long_url_hash`` index must already
+    be gone (see :func:`ensure_short_link_indexes`). Running it again with the same key
+    is a no-op. Requires a ``mongos`` connection.
+
+    :param collection: MongoDB Collection for short links
+    """
+    await collection.create_index([("short_code", "hashed")])
+    admin = collection.database.client.admin
+    await admin.command("enableSharding", collection.database.name)
+    await admin.command(
+        "shardCollection", collection.full_name, key={"short_code": "hashed"}
+    )
+    logger.info("Collection %s sharded on hashed short_code.", collection.full_name)
+
+
+async def ensure_short_link_indexes(
+    collection: AsyncIOMotorCollection, sharded: bool = False
+) -> None:
+    """
+    Create the indexes required by the short links collection.
+
+    Meant to run once per worker at startup, not on the request path. A sharded
+    collection cannot enforce uniqueness on ``long_url_hash``, which is not prefixed
+    by the shard key, so there long URLs are deduplicated by the lookup before each
+    insert only and two concurrent creates may store two codes for one long URL.
+
+    The unique and the plain ``long_url_hash`` indexes have different names, and the
+    one not wanted is dropped before the other is built, since MongoDB refuses to
+    change the options of an existing index.
+
+    :param collection: MongoDB Collection for short links
+    :param sharded: Whether the collection is sharded on ``short_code``
+    """
+    await collection.create_index("short_code", unique=True)
+    logger.info("Index for short_code created successfully.")
+    name, unwanted = (
+        (LONG_URL_HASH_SHARDED_INDEX, LONG_URL_HASH_UNIQUE_INDEX)
+        if sharded
+        else (LONG_URL_HASH_UNIQUE_INDEX, LONG_URL_HASH_SHARDED_INDEX)
+    )
+    if unwanted in await collection.index_information():
+        await collection.drop_index(unwanted)
+        logger.info("Index %s dropped.", unwanted)
+    # Documents written before long_url_hash existed are skipped until backfilled.
+    await collection.create_index(
+        "long_url_hash",
+        name=name,
+        unique=not sharded,
+        partialFilterExpression={"long_url_hash": {"$exists": True}},
+    )
+    logger.info("Index for long_url_hash created successfully.")
+    # Lets the cache warm-up read the most clicked links without a collection scan.
+    await collection.create_index([("click_count", -1)])
+    logger.info("Index for click_count created successfully.")
+    # Expiring links are deleted once past expires_at; links without it are kept.
+    await collection.create_index("expires_at", expireAfterSeconds=0)
+    logger.info("TTL index for expires_at created successfully.")
 
 
-async def get_short_link_collection(
-    db: AsyncIOMotorDatabase = Depends(short_url_db),
+async def init_short_link_collection(
+    db: AsyncIOMotorDatabase | None = None,
 ) -> AsyncIOMotorCollection:
     """
-    Initialize the MongoDB database connection and create an index for short_code.
+    Bootstrap the short links collection and remember it for request handlers.
 
-    :param db: MongoDB Database
+    With ``MONGODB_SHARDED`` the collection is sharded once its indexes are built, which
+    also drops the unique ``long_url_hash`` index that would prevent sharding.
+
+    :param db: MongoDB Database, defaults to the shared worker database
     :return: MongoDB Collection for short links
     """
-    collection = db.short_urls
-    await collection.create_index("short_code", unique=True)
-    logging.info("Index for short_code created successfully.")
+    global _short_link_collection
+    collection = (db if db is not None else short_url_db())[SHORT_URL_COLLECTION_NAME]
+    await ensure_short_link_indexes(collection, sharded=Config.MONGODB_SHARDED)
+    if Config.MONGODB_SHARDED:
+        await shard_short_link_collection(collection)
+    _short_link_collection = collection
     return collection
+
+
+async def get_short_link_collection() -> AsyncIOMotorCollection:
+    """
+    Dependency returning the short links collection prepared at startup.
+
+    :return: MongoDB Collection for short links
+    """
+    if _short_link_collection is None:
+        return await init_short_link_collection()
+    return _short_link_collection
+
+
+def get_counter_collection(
+    db: AsyncIOMotorDatabase | None = None,
+) -> AsyncIOMotorCollection:
+    """
+    Return the collection holding central counters, such as the short code ID counter.
+
+    :param db: MongoDB Database, defaults to the shared worker database
+    :return: MongoDB Collection for counters
+    """
+    return (db if db is not None else short_url_db())[COUNTER_COLLECTION_NAME]
+
+
+async def init_click_bucket_collection(
+    db: AsyncIOMotorDatabase | None = None,
+) -> AsyncIOMotorCollection:
+    """
+    Bootstrap the click buckets collection and remember it for request handlers.
+
+    Buckets are looked up by short code, granularity and start, and expire through a
+    TTL index on ``expires_at``; day buckets have no ``expires_at`` and are kept.
+
+    :param db: MongoDB Database, defaults to the shared worker database
+    :return: MongoDB Collection for click buckets
+    """
+    global _click_bucket_collection
+    collection = (db if db is not None else short_url_db())[
+        CLICK_BUCKET_COLLECTION_NAME
+    ]
+    await collection.create_index(
+        [("short_code", 1), ("granularity", 1), ("start", 1)], unique=True
+    )
+    await collection.create_index("expires_at", expireAfterSeconds=0)
+    logger.info("Indexes for click buckets created successfully.")
+    _click_bucket_collection = collection
+    return collection
+
+
+async def get_click_bucket_collection() -> AsyncIOMotorCollection:
+    """
+    Return the click buckets collection prepared at startup.
+
+    :return: MongoDB Collection for click buckets
+    """
+    if _click_bucket_collection is None:
+        return await init_click_bucket_collection()
+    return _click_bucket_collection
@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime
+
+from app.core.metrics import timed
+from app.entities.click_stats.click_buckets import (
+    BUCKET_WIDTHS,
+    as_utc,
+    bucket_start,
+    retention,
+)
+from app.interfaces.click_stats_interface import ClickStatsRepository
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from .short_url_repository import MONGO_OPERATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class MotorMongoClickStatsRepository(ClickStatsRepository):
+    """
+    Pre-aggregated click counts per short code in minute, hour and day buckets.
+
+    One document holds the clicks of one short code in one bucket. Every flush adds
+    the clicks to all three granularities, so a range is answered by reading one
+    document per bucket through the ``(short_code, granularity, start)`` index, however
+    many clicks the link got. Minute and hour buckets expire through a TTL index.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        """
+        Initialize the repository with the given database collection.
+
+        :param collection: The Motor asynchronous collection holding the buckets.
+        """
+        self.collection = collection
+
+    @timed(MONGO_OPERATION_SECONDS, "add_clicks")
+    async def add_clicks(self, counts: dict[str, int], at: datetime) -> None:
+        """
+        Add clicks to the buckets containing a point in time, with one bulk write.
+
+        :param counts: Number of clicks, keyed by short code.
+        :param at: When the clicks happened.
+        """
+        if not counts:
+            return
+        operations = []
+        for granularity in BUCKET_WIDTHS:
+            start = bucket_start(at, granularity)
+            keep = retention(granularity)
+            on_insert = {} if keep is None else {"expires_at": start + keep}
+            for short_code, count in counts.items():
+                update = {"$inc": {"clicks": count}}
+                if on_insert:
+                    update["$setOnInsert"] = on_insert
+                operations.append(
+                    UpdateOne(
+                        {
+                            "short_code": short_code,
+                            "granularity": granularity,
+                            "start": start,
+                        },
+                        update,
+                        upsert=True,
+                    )
+                )
+        await self.collection.bulk_write(operations, ordered=False)
+        logger.info("Added click buckets for %s short URLs.", len(counts))
+
+    @timed(MONGO_OPERATION_SECONDS, "get_buckets")
+    async def get_buckets(
+        self, short_code: str, granularity: str, start: datetime, end: datetime
+    ) -> dict[datetime, int]:
+        """
+        Read the non-empty buckets of a short code starting in ``[start, end)``.
+
+        :param short_code: The short code.
+        :param granularity: ``minute``, ``hour`` or ``day``.
+        :param start: Start of the range.
+        :param end: End of the range, exclusive.
+        :return: Clicks keyed by UTC bucket start.
+        """
+        cursor = self.collection.find(
+            {
+                "short_code": short_code,
+                "granularity": granularity,
+                "start": {"$gte": bucket_start(start, granularity), "$lt": end},
+            },
+            {"start": 1, "clicks": 1, "_id": 0},
+        )
+        return {as_utc(doc["start"]): doc["clicks"] async for doc in cursor}
@@ -0,0 +1,39 @@
+import logging
+
+from app.interfaces.short_code_allocator_interface import IdBlockRepository
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class MotorMongoIdBlockRepository(IdBlockRepository):
+    """
+    MongoDB backed central counter handing out blocks of consecutive IDs.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        """
+        Initialize the repository with the given database collection.
+
+        :param collection: The Motor asynchronous collection holding the counters.
+        """
+        self.collection = collection
+
+    async def lease_block(self, name: str, size: int) -> int:
+        """
+        Atomically reserve the next block of IDs of a counter.
+
+        :param name: Name of the counter.
+        :param size: Number of IDs to reserve.
+        :return: The first ID of the reserved block.
+        """
+        result = await self.collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"value": size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        start = result["value"] - size
+        logger.info("Leased IDs %s-%s of counter %s.", start, result["value"] - 1, name)
+        return start
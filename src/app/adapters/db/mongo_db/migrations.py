@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from app.adapters.db.mongo_db import (
+    close_mongo_client,
+    ensure_short_link_indexes,
+    init_short_link_collection,
+)
+from app.core.config import Config
+from app.core.hashing import long_url_digest
+from app.core.logging_setup import setup_logging
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_long_url_hashes(
+    collection: AsyncIOMotorCollection, batch_size: int = 1_000
+) -> int:
+    """
+    Store ``long_url_hash`` on documents created before the digest existed.
+
+    Safe to run while the application is serving traffic and to re-run after an
+    interruption: only documents without the field are touched. When several
+    legacy documents share a long URL, the first one gets the digest and the
+    others are left as they are.
+
+    :param collection: MongoDB Collection for short links
+    :param batch_size: Number of documents updated per bulk write
+    :return: Number of documents that received a digest
+    """
+    await ensure_short_link_indexes(collection, sharded=Config.MONGODB_SHARDED)
+    updated = 0
+    batch: list[UpdateOne] = []
+    cursor = collection.find(
+        {"long_url_hash": {"$exists": False}}, {"long_url": 1}, batch_size=batch_size
+    )
+    async for doc in cursor:
+        batch.append(
+            UpdateOne(
+                {"_id": doc["_id"], "long_url_hash": {"$exists": False}},
+                {"$set": {"long_url_hash": long_url_digest(doc["long_url"])}},
+            )
+        )
+        if len(batch) >= batch_size:
+            updated += await _write_batch(collection, batch)
+            batch = []
+    if batch:
+        updated += await _write_batch(collection, batch)
+    logger.info("Backfilled long_url_hash for %s short URLs.", updated)
+    return updated
+
+
+async def _write_batch(
+    collection: AsyncIOMotorCollection, batch: list[UpdateOne]
+) -> int:
+    try:
+        result = await collection.bulk_write(batch, ordered=False)
+        return result.modified_count
+    except BulkWriteError as e:
+        skipped = len(e.details.get("writeErrors", []))
+        logger.warning(
+            "Skipped %s short URLs with an already hashed long URL.", skipped
+        )
+        return e.details.get("nModified", 0)
+
+
+async def main() -> None:
+    collection = await init_short_link_collection()
+    try:
+        await backfill_long_url_hashes(collection)
+    finally:
+        close_mongo_client()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
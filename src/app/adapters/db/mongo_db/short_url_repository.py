@@ -1,17 +1,49 @@
 import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 
-from app.core.errors import DuplicateEntityError, NotFoundError
+from app.core.errors import (
+    DuplicateEntityError,
+    NotFoundError,
+    PartialWriteError,
+    RepositoryError,
+)
+from app.core.hashing import long_url_digest
+from app.core.metrics import registry, timed
 from app.entities.short_url.short_url_dto import ShortURLDTO
 from app.interfaces.short_url_interface import ShortURLRepository
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY_ERROR_CODE = 11000
 
 logger = logging.getLogger(__name__)
 
+MONGO_OPERATION_SECONDS = registry.histogram(
+    "mongo_operation_duration_seconds",
+    "Duration of short URL repository operations against MongoDB.",
+    ("operation",),
+)
+
+
+def _expired(doc: dict) -> bool:
+    """Tell whether a document is past its ``expires_at``, stored as naive UTC."""
+    expires_at = doc.get("expires_at")
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=UTC)
+    return expires_at <= datetime.now(UTC)
+
 
 class MotorMongoShortURLRepository(ShortURLRepository):
     """
     MongoDB repository for ShortURL operations using the Motor asynchronous driver.
+
+    Documents with an ``expires_at`` are removed by a TTL index. The TTL monitor runs
+    about once a minute, so reads also treat documents past their expiry as missing.
     """
 
     def __init__(self, collection: AsyncIOMotorCollection):
@@ -22,32 +54,172 @@ class MotorMongoShortURLRepository(ShortURLRepository):
         """
         self.collection = collection
 
+    @staticmethod
+    def _to_document(url: ShortURLDTO, digest: bytes) -> dict:
+        """
+        Build the document stored for a short URL.
+
+        An ID already assigned to the short URL is kept as the document ``_id``.
+
+        :param url: The short URL data transfer object.
+        :param digest: The digest of its long URL.
+        :return: The MongoDB document.
+        """
+        document = url.model_dump(exclude={"id"}, exclude_none=True)
+        document["long_url_hash"] = digest
+        if url.id is not None:
+            document["_id"] = ObjectId(url.id)
+        return document
+
+    @timed(MONGO_OPERATION_SECONDS, "create")
     async def create(self, url: ShortURLDTO) -> ShortURLDTO:
         """
         Create a new short URL record in the database.
 
+        Long URLs are deduplicated through the indexed ``long_url_hash`` digest.
+
         :param url: The short URL data transfer object.
-        :return: The created short URL with its ID.
-        :raises DuplicateEntityError: If a short URL with the same code already exists.
+        :return: The created short URL with its ID, or the stored one for a known long URL.
+        :raises DuplicateEntityError: If a short URL with the same code already exists,
+            or the concurrently stored long URL could not be read back twice.
         """
-        existed_long_url = await self.collection.find_one({"long_url": url.long_url})
+        digest = long_url_digest(url.long_url)
+        existed_long_url = await self.collection.find_one({"long_url_hash": digest})
+        if existed_long_url and not _expired(existed_long_url):
+            logger.warning("Short URL with long URL '%s' already exists.", url.long_url)
+            return ShortURLDTO.from_document(existed_long_url)
         if existed_long_url:
-            logger.warning(f"Short URL with long URL '{url.long_url}' already exists.")
-            return ShortURLDTO(**existed_long_url)
-        else:
+            await self._delete_expired([existed_long_url["_id"]])
+        # One retry for a concurrently stored long URL that expired or went meanwhile.
+        for _ in range(2):
             try:
                 result = await self.collection.insert_one(
-                    url.model_dump(exclude_none=True)
+                    self._to_document(url, digest)
                 )
-                url.id = str(result.inserted_id)
-                logger.info(f"Short URL created with ID {url.id}.")
+            except DuplicateKeyError as e:
+                if "long_url_hash" not in (e.details or {}).get("keyPattern", {}):
+                    logger.error("Error creating short URL: %s", e)
+                    raise DuplicateEntityError(
+                        f"Short URL with code {url.short_code} already exists."
+                    ) from e
+                # The same long URL was stored concurrently, return that record.
+                stored = await self.collection.find_one({"long_url_hash": digest})
+                if stored and not _expired(stored):
+                    return ShortURLDTO.from_document(stored)
+                if stored:
+                    await self._delete_expired([stored["_id"]])
+                continue
             except Exception as e:
-                logger.error(f"Error creating short URL: {str(e)}")
+                logger.error("Error creating short URL: %s", e)
                 raise DuplicateEntityError(
                     f"Short URL with code {url.short_code} already exists."
                 ) from e
+            url.id = str(result.inserted_id)
+            logger.info("Short URL created with ID %s.", url.id)
             return url
+        logger.error("Long URL '%s' kept conflicting on insert.", url.long_url)
+        raise DuplicateEntityError(f"Short URL for {url.long_url} could not be stored.")
+
+    @timed(MONGO_OPERATION_SECONDS, "create_many")
+    async def create_many(
+        self, urls: list[ShortURLDTO]
+    ) -> tuple[list[ShortURLDTO], list[ShortURLDTO]]:
+        """
+        Create many short URL records with one dedup query and one unordered insert.
 
+        Long URLs that are already stored are returned as they are in the database.
+
+        :param urls: The short URL data transfer objects, with distinct long URLs.
+        :return: The stored short URLs and the ones whose short code already exists.
+        :raises RepositoryError: If the insert fails for a reason other than a duplicate key.
+        """
+        if not urls:
+            return [], []
+        digests = [long_url_digest(url.long_url) for url in urls]
+        stored, expired = [], []
+        async for doc in self.collection.find({"long_url_hash": {"$in": digests}}):
+            if _expired(doc):
+                expired.append(doc["_id"])
+            else:
+                stored.append(ShortURLDTO.from_document(doc))
+        await self._delete_expired(expired)
+        existing_long_urls = {url.long_url for url in stored}
+        to_insert = [
+            (url, digest)
+            for url, digest in zip(urls, digests)
+            if url.long_url not in existing_long_urls
+        ]
+        if not to_insert:
+            return stored, []
+
+        docs = [self._to_document(url, digest) for url, digest in to_insert]
+        failed_indexes: set[int] = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(err["code"] != DUPLICATE_KEY_ERROR_CODE for err in write_errors):
+                logger.error("Error creating short URLs: %s", e)
+                raise RepositoryError("Failed to create short URLs.") from e
+            failed_indexes = {err["index"] for err in write_errors}
+
+        conflicts = []
+        for index, ((url, _), doc) in enumerate(zip(to_insert, docs)):
+            if index in failed_indexes:
+                conflicts.append(url)
+            else:
+                url.id = str(doc["_id"])
+                stored.append(url)
+        logger.info(
+            "Created %s short URLs, %s short code conflicts.",
+            len(to_insert) - len(conflicts),
+            len(conflicts),
+        )
+        return stored, conflicts
+
+    async def _delete_expired(self, ids: list) -> None:
+        """
+        Delete expired documents ahead of the TTL monitor, to free their long URL.
+
+        :param ids: IDs of the documents; ones no longer expired are left alone.
+        """
+        if ids:
+            await self.collection.delete_many(
+                {"_id": {"$in": ids}, "expires_at": {"$lte": datetime.now(UTC)}}
+            )
+
+    @timed(MONGO_OPERATION_SECONDS, "import_many")
+    async def import_many(self, urls: list[ShortURLDTO]) -> list[str]:
+        """
+        Insert exported short URLs as they are, with one unordered insert.
+
+        Unlike ``create_many`` there is no dedup query: the unique indexes reject short
+        codes and long URLs that are already stored, and those rows are skipped, so an
+        interrupted import can be run again from the start.
+
+        :param urls: The short URL data transfer objects, IDs and click counts included.
+        :return: The short codes that were inserted.
+        :raises RepositoryError: If the insert fails for a reason other than a duplicate key.
+        """
+        if not urls:
+            return []
+        docs = [self._to_document(url, long_url_digest(url.long_url)) for url in urls]
+        failed_indexes: set[int] = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(err["code"] != DUPLICATE_KEY_ERROR_CODE for err in write_errors):
+                logger.error("Error importing short URLs: %s", e)
+                raise RepositoryError("Failed to import short URLs.") from e
+            failed_indexes = {err["index"] for err in write_errors}
+        return [
+            url.short_code
+            for index, url in enumerate(urls)
+            if index not in failed_indexes
+        ]
+
+    @timed(MONGO_OPERATION_SECONDS, "get_by_short_code")
     async def get_by_short_code(self, short_code: str) -> ShortURLDTO | None:
         """
         Retrieve a short URL from the database by its short code.
@@ -55,14 +227,65 @@ class MotorMongoShortURLRepository(ShortURLRepository):
         :param short_code: The short code of the URL.
         :return: The short URL data transfer object if found, else None.
         """
-        doc = await self.collection.find_one({"short_code": short_code})
-        if doc:
-            logger.info(f"Retrieved short URL with code {short_code}.")
-            return ShortURLDTO(**doc)
+        doc = await self.collection.find_one(
+            {"short_code": short_code}, {"long_url_hash": 0}
+        )
+        if doc and not _expired(doc):
+            logger.info("Retrieved short URL with code %s.", short_code)
+            return ShortURLDTO.from_document(doc)
         else:
-            logger.warning(f"Short URL with code {short_code} not found.")
+            logger.warning("Short URL with code %s not found.", short_code)
             return None
 
+    @timed(MONGO_OPERATION_SECONDS, "get_by_short_codes")
+    async def get_by_short_codes(self, short_codes: list[str]) -> list[ShortURLDTO]:
+        """
+        Retrieve the stored short URLs among many short codes with one query.
+
+        :param short_codes: The short codes to look up.
+        :return: The short URLs found, in no particular order.
+        """
+        if not short_codes:
+            return []
+        cursor = self.collection.find(
+            {"short_code": {"$in": short_codes}}, {"long_url_hash": 0}
+        )
+        return [
+            ShortURLDTO.from_document(doc) async for doc in cursor if not _expired(doc)
+        ]
+
+    async def get_long_url(self, short_code: str) -> str | None:
+        """
+        Retrieve only the long URL for a short code, without building a DTO.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL if found, else None.
+        """
+        long_url, _ = await self.get_long_url_with_expiry(short_code)
+        return long_url
+
+    @timed(MONGO_OPERATION_SECONDS, "get_long_url")
+    async def get_long_url_with_expiry(
+        self, short_code: str
+    ) -> tuple[str | None, datetime | None]:
+        """
+        Retrieve the long URL and the expiry of a short code, without building a DTO.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL and when it expires, or ``(None, None)`` if not found.
+        """
+        doc = await self.collection.find_one(
+            {"short_code": short_code}, {"long_url": 1, "expires_at": 1, "_id": 0}
+        )
+        if doc is None or _expired(doc):
+            logger.warning("Short URL with code %s not found.", short_code)
+            return None, None
+        expires_at = doc.get("expires_at")
+        if expires_at is not None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        return doc["long_url"], expires_at
+
+    @timed(MONGO_OPERATION_SECONDS, "update_click_count")
     async def update_click_count(self, short_code: str) -> ShortURLDTO:
         """
         Update the click count of a short URL in the database.
@@ -74,11 +297,143 @@ class MotorMongoShortURLRepository(ShortURLRepository):
         result = await self.collection.find_one_and_update(
             {"short_code": short_code},
             {"$inc": {"click_count": 1}},
+            projection={"long_url_hash": 0},
             return_document=ReturnDocument.AFTER,
         )
         if not result:
-            logger.warning(f"Short URL with code {short_code} not found.")
+            logger.warning("Short URL with code %s not found.", short_code)
             raise NotFoundError(f"Short URL with code {short_code} not found.")
         else:
-            logger.info(f"Updated click count for short URL with code {short_code}.")
-            return ShortURLDTO(**result)
+            logger.info("Updated click count for short URL with code %s.", short_code)
+            return ShortURLDTO.from_document(result)
+
+    @timed(MONGO_OPERATION_SECONDS, "get_click_count")
+    async def get_click_count(self, short_code: str) -> int | None:
+        """
+        Read the persisted click count of a short URL, bypassing any cache.
+
+        :param short_code: The short code of the URL.
+        :return: The click count if the short URL exists, else None.
+        """
+        doc = await self.collection.find_one(
+            {"short_code": short_code}, {"click_count": 1, "expires_at": 1, "_id": 0}
+        )
+        if doc is None or _expired(doc):
+            logger.warning("Short URL with code %s not found.", short_code)
+            return None
+        return doc.get("click_count", 0)
+
+    @timed(MONGO_OPERATION_SECONDS, "increment_click_counts")
+    async def increment_click_counts(self, counts: dict[str, int]) -> None:
+        """
+        Add aggregated clicks to many short URLs with a single bulk write.
+
+        :param counts: Number of clicks to add, keyed by short code.
+        :raises PartialWriteError: If some updates failed; the others were applied.
+        """
+        if not counts:
+            return
+        short_codes = list(counts)
+        try:
+            result = await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"short_code": short_code},
+                        {"$inc": {"click_count": counts[short_code]}},
+                    )
+                    for short_code in short_codes
+                ],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            # Unordered: every update not listed in writeErrors was applied.
+            failed = {
+                short_codes[err["index"]]: counts[short_codes[err["index"]]]
+                for err in e.details.get("writeErrors", [])
+            }
+            logger.error("Failed to flush clicks for %s short URLs: %s", len(failed), e)
+            raise PartialWriteError(
+                f"Failed to flush clicks for {len(failed)} short URLs.", failed
+            ) from e
+        logger.info(
+            "Flushed clicks for %s short URLs, %s documents updated.",
+            len(counts),
+            result.modified_count,
+        )
+
+    async def iter_short_codes(self, batch_size: int = 10_000) -> AsyncIterator[str]:
+        """
+        Stream every stored short code, using the short_code index only.
+
+        :param batch_size: Number of codes fetched per round trip.
+        :return: Async iterator over the short codes.
+        """
+        cursor = self.collection.find(
+            {}, {"short_code": 1, "_id": 0}, batch_size=batch_size
+        ).hint("short_code_1")
+        async for doc in cursor:
+            yield doc["short_code"]
+
+    async def iter_short_urls(
+        self, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream every stored short URL in ``_id`` order.
+
+        :param batch_size: Number of documents fetched per round trip.
+        :return: Async iterator over the short URLs.
+        """
+        cursor = self.collection.find(
+            {}, {"long_url_hash": 0}, batch_size=batch_size
+        ).sort("_id", 1)
+        async for doc in cursor:
+            if not _expired(doc):
+                yield ShortURLDTO.from_document(doc)
+
+    async def iter_short_url_rows(
+        self, after: str | None = None, batch_size: int = 1_000
+    ) -> AsyncIterator[tuple[str, str, str, int]]:
+        """
+        Stream the fields of every short URL in ``_id`` order, as plain tuples.
+
+        Pages through the ``_id`` index from ``after``, so resuming deep into the
+        collection costs the same as starting, and no DTO is built per document.
+
+        :param after: Only stream short URLs whose ID sorts after this one.
+        :param batch_size: Number of documents fetched per round trip.
+        :return: Async iterator over ``(id, short_code, long_url, click_count)``.
+        """
+        query = {} if after is None else {"_id": {"$gt": ObjectId(after)}}
+        cursor = self.collection.find(
+            query,
+            {"short_code": 1, "long_url": 1, "click_count": 1, "expires_at": 1},
+            batch_size=batch_size,
+        ).sort("_id", 1)
+        async for doc in cursor:
+            if _expired(doc):
+                continue
+            yield (
+                str(doc["_id"]),
+                doc["short_code"],
+                doc["long_url"],
+                doc.get("click_count", 0),
+            )
+
+    async def iter_top_short_urls(
+        self, limit: int, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream the most clicked short URLs, most clicked first.
+
+        :param limit: Largest number of short URLs returned.
+        :param batch_size: Number of documents fetched per round trip.
+        :return: Async iterator over the short URLs.
+        """
+        cursor = (
+            self.collection.find({}, {"long_url_hash": 0}, batch_size=batch_size)
+            .sort("click_count", -1)
+            .limit(limit)
+        )
+        async for doc in cursor:
+            if not _expired(doc):
+                yield ShortURLDTO.from_document(doc)
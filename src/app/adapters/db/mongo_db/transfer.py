@@ -0,0 +1,339 @@
+"""
+Stream short URLs between MongoDB and JSONL or CSV files.
+
+    python -m app.adapters.db.mongo_db.transfer export links.jsonl
+    python -m app.adapters.db.mongo_db.transfer import links.csv --concurrency 8
+
+``-`` reads from stdin or writes to stdout; the format then comes from ``--format``.
+Rows carry ``id``, ``short_code``, ``long_url``, ``click_count`` and ``expires_at``,
+so an export imported elsewhere keeps its IDs, counters and expiries.
+
+With ``SHORT_URL_REPOSITORY=redis`` every batch written to MongoDB is also loaded into
+the Redis store, which serves the links. If loading or announcing a batch fails, the
+import goes on and exits with status 1; running it again with the same file finishes
+those rows.
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import nullcontext
+from typing import TextIO
+
+import orjson
+from app.adapters.db.mongo_db import close_mongo_client, init_short_link_collection
+from app.adapters.db.mongo_db.short_url_repository import MotorMongoShortURLRepository
+from app.adapters.db.repositories import REDIS_REPOSITORY
+from app.core.config import Config
+from app.core.logging_setup import setup_logging
+from app.entities.short_url.short_url_dto import ShortURLDTO
+
+FIELDS = ("id", "short_code", "long_url", "click_count", "expires_at")
+JSONL = "jsonl"
+CSV = "csv"
+
+logger = logging.getLogger(__name__)
+
+
+class Progress:
+    """Print the rows handled so far and the rate, at most once per ``every`` seconds."""
+
+    def __init__(self, label: str, every: float = 1.0, stream: TextIO = sys.stderr):
+        """
+        Start the clock.
+
+        :param label: Name of the operation shown on each line.
+        :param every: Seconds between two progress lines.
+        :param stream: Where progress lines are written.
+        """
+        self.label = label
+        self.every = every
+        self.stream = stream
+        self.rows = 0
+        self.started = self._last = time.monotonic()
+
+    def update(self, rows: int) -> None:
+        """
+        Count handled rows and print a progress line if one is due.
+
+        :param rows: Number of rows handled since the last update.
+        """
+        self.rows += rows
+        now = time.monotonic()
+        if now - self._last >= self.every:
+            self._last = now
+            self._print(now)
+
+    def finish(self) -> float:
+        """
+        Print the final line.
+
+        :return: Average rows per second.
+        """
+        return self._print(time.monotonic())
+
+    def _print(self, now: float) -> float:
+        rate = self.rows / max(now - self.started, 1e-9)
+        print(f"{self.label}: {self.rows:,} rows, {rate:,.0f} rows/s", file=self.stream)
+        return rate
+
+
+def read_rows(stream: TextIO, file_format: str) -> Iterator[ShortURLDTO]:
+    """
+    Parse short URLs from a JSONL or CSV stream, one line at a time.
+
+    :param stream: Text stream to read.
+    :param file_format: ``jsonl`` or ``csv``; CSV needs a header row.
+    :return: Iterator over the short URLs.
+    """
+    rows = (
+        csv.DictReader(stream)
+        if file_format == CSV
+        else (orjson.loads(line) for line in stream if line.strip())
+    )
+    for row in rows:
+        yield ShortURLDTO(
+            _id=row.get("id") or None,
+            long_url=row["long_url"],
+            short_code=row["short_code"],
+            click_count=row.get("click_count") or 0,
+            expires_at=row.get("expires_at") or None,
+        )
+
+
+async def export_short_urls(
+    repo: MotorMongoShortURLRepository,
+    stream: TextIO,
+    file_format: str = JSONL,
+    batch_size: int = 10_000,
+    progress: Progress | None = None,
+) -> int:
+    """
+    Write every stored short URL to a stream in ``_id`` order.
+
+    Documents are read through one cursor fetching ``batch_size`` documents per round
+    trip and written as they arrive, so memory holds one batch at most.
+
+    :param repo: Repository to read.
+    :param stream: Text stream to write.
+    :param file_format: ``jsonl`` or ``csv``.
+    :param batch_size: Number of documents fetched per round trip.
+    :param progress: Progress to report the written rows to.
+    :return: Number of short URLs written.
+    """
+    if file_format == CSV:
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+    written = 0
+    async for url in repo.iter_short_urls(batch_size=batch_size):
+        if file_format == CSV:
+            writer.writerow(
+                (
+                    url.id,
+                    url.short_code,
+                    url.long_url,
+                    url.click_count,
+                    url.expires_at.isoformat() if url.expires_at else "",
+                )
+            )
+        else:
+            stream.write(
+                orjson.dumps(
+                    {
+                        "id": url.id,
+                        "short_code": url.short_code,
+                        "long_url": url.long_url,
+                        "click_count": url.click_count,
+                        "expires_at": url.expires_at,
+                    }
+                ).decode()
+            )
+            stream.write("\n")
+        written += 1
+        if progress is not None and written % batch_size == 0:
+            progress.update(batch_size)
+    if progress is not None:
+        progress.update(written % batch_size)
+    return written
+
+
+async def import_short_urls(
+    repo: MotorMongoShortURLRepository,
+    urls: Iterable[ShortURLDTO],
+    batch_size: int = 5_000,
+    concurrency: int = 4,
+    progress: Progress | None = None,
+    on_imported: Callable[[list[ShortURLDTO]], Awaitable[None]] | None = None,
+) -> tuple[int, int, int]:
+    """
+    Insert short URLs in batches, with up to ``concurrency`` batches in flight.
+
+    Reading waits whenever ``concurrency`` batches are being inserted, so memory holds
+    ``concurrency + 1`` batches at most however large the input is. Short URLs whose
+    code or long URL is already stored are skipped.
+
+    ``on_imported`` gets every short URL of the batch that is stored after the insert,
+    including codes a previous run inserted, so an import interrupted after the insert
+    of a batch but before its follow-up finishes it when run again. A failing follow-up
+    is logged and counted rather than stopping the other batches.
+
+    :param repo: Repository to write.
+    :param urls: Short URLs to import, read lazily.
+    :param batch_size: Number of short URLs per unordered insert.
+    :param concurrency: Largest number of inserts running at once.
+    :param progress: Progress to report the handled rows to.
+    :param on_imported: Called with the stored short URLs of each batch.
+    :return: Number of short URLs inserted, skipped, and whose follow-up failed.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    imported = skipped = failed = 0
+
+    async def follow_up(batch: list[ShortURLDTO], codes: list[str]) -> None:
+        nonlocal failed
+        inserted = set(codes)
+        stored = [url for url in batch if url.short_code in inserted]
+        try:
+            stored += await repo.get_by_short_codes(
+                [url.short_code for url in batch if url.short_code not in inserted]
+            )
+            if stored:
+                await on_imported(stored)
+        except Exception as e:
+            logger.error("Failed to finish %s imported short URLs: %s", len(batch), e)
+            failed += len(batch)
+
+    async def insert(batch: list[ShortURLDTO]) -> None:
+        nonlocal imported, skipped
+        try:
+            codes = await repo.import_many(batch)
+            if on_imported is not None:
+                await follow_up(batch, codes)
+        finally:
+            slots.release()
+        imported += len(codes)
+        skipped += len(batch) - len(codes)
+        if progress is not None:
+            progress.update(len(batch))
+
+    async with asyncio.TaskGroup() as tasks:
+        batch: list[ShortURLDTO] = []
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= batch_size:
+                await slots.acquire()
+                tasks.create_task(insert(batch))
+                batch = []
+                # Let the insert reach the driver before reading the next batch.
+                await asyncio.sleep(0)
+        if batch:
+            await slots.acquire()
+            tasks.create_task(insert(batch))
+    return imported, skipped, failed
+
+
+async def _after_import(
+    announce: bool,
+) -> Callable[[list[ShortURLDTO]], Awaitable[None]] | None:
+    """
+    Build the follow-up of each imported batch: load it into the Redis store when that
+    is the primary repository, then announce its short codes to running workers.
+    """
+    load_into_redis = Config.SHORT_URL_REPOSITORY == REDIS_REPOSITORY
+    if not load_into_redis and not announce:
+        return None
+    from app.adapters.cache.redis_cache import announce_short_codes, init_redis_cache
+
+    init_redis_cache()
+    redis_repo = None
+    if load_into_redis:
+        from app.adapters.db.redis_db import redis_short_url_repository
+
+        redis_repo = await redis_short_url_repository()
+
+    async def after_import(urls: list[ShortURLDTO]) -> None:
+        if redis_repo is not None:
+            await redis_repo.load(urls)
+        if announce:
+            await announce_short_codes([url.short_code for url in urls])
+
+    return after_import
+
+
+def _file_format(path: str, requested: str | None) -> str:
+    if requested:
+        return requested
+    return CSV if path.endswith(".csv") else JSONL
+
+
+def _open(path: str, mode: str, file_format: str):
+    if path == "-":
+        return nullcontext(sys.stdout if mode == "w" else sys.stdin)
+    return open(
+        path, mode, newline="" if file_format == CSV else None, buffering=1 << 20
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    file_format = _file_format(args.path, args.format)
+    repo = MotorMongoShortURLRepository(await init_short_link_collection())
+    try:
+        if args.command == "export":
+            progress = Progress("export")
+            with _open(args.path, "w", file_format) as stream:
+                await export_short_urls(
+                    repo, stream, file_format, args.batch_size, progress
+                )
+            progress.finish()
+            return
+        on_imported = await _after_import(args.announce)
+        progress = Progress("import")
+        with _open(args.path, "r", file_format) as stream:
+            imported, skipped, failed = await import_short_urls(
+                repo,
+                read_rows(stream, file_format),
+                args.batch_size,
+                args.concurrency,
+                progress,
+                on_imported,
+            )
+        progress.finish()
+        print(
+            f"imported {imported:,}, skipped {skipped:,} already stored",
+            file=sys.stderr,
+        )
+        if failed:
+            print(
+                f"{failed:,} stored rows were not loaded or announced; "
+                "run the same import again to finish them",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    finally:
+        close_mongo_client()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="JSONL or CSV file, or - for stdin/stdout.")
+    parser.add_argument("--format", choices=[JSONL, CSV])
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--no-announce",
+        dest="announce",
+        action="store_false",
+        help="Do not tell running workers about the imported short codes.",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size is None:
+        args.batch_size = 10_000 if args.command == "export" else 5_000
+    return args
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main(parse_args()))
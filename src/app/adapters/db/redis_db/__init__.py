@@ -0,0 +1,32 @@
+from app.adapters.db.mongo_db import get_short_link_collection
+from app.adapters.db.mongo_db.short_url_repository import MotorMongoShortURLRepository
+from app.adapters.db.redis_db.short_url_repository import RedisPrimaryShortURLRepository
+from fastapi_cache import FastAPICache
+
+_short_url_repository: RedisPrimaryShortURLRepository | None = None
+
+
+async def redis_short_url_repository() -> RedisPrimaryShortURLRepository:
+    """
+    Return the Redis-primary short URL store of the current worker.
+
+    It uses the Redis client set up by ``init_redis_cache`` and persists to the
+    MongoDB short links collection.
+
+    :return: Redis-primary short URL repository
+    """
+    global _short_url_repository
+    if _short_url_repository is None:
+        durable = MotorMongoShortURLRepository(
+            collection=await get_short_link_collection()
+        )
+        _short_url_repository = RedisPrimaryShortURLRepository(
+            FastAPICache.get_backend().redis, durable
+        )
+    return _short_url_repository
+
+
+def close_redis_short_url_repository() -> None:
+    """Forget the Redis-primary store so the next start builds it again."""
+    global _short_url_repository
+    _short_url_repository = None
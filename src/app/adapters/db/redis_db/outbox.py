@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+
+from app.adapters.db.redis_db.short_url_repository import (
+    OUTBOX_CLICKS,
+    OUTBOX_CREATE,
+    RedisPrimaryShortURLRepository,
+    outbox_entry,
+)
+from app.core.config import Config
+from app.core.errors import PartialWriteError
+from app.core.metrics import registry
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_GROUP = "mongo"
+
+OUTBOX_PERSISTED = registry.counter(
+    "outbox_entries_persisted_total", "Outbox entries copied from Redis to MongoDB."
+)
+OUTBOX_FAILURES = registry.counter(
+    "outbox_persist_failures_total",
+    "Failed attempts to copy outbox entries to MongoDB.",
+)
+
+
+class OutboxPersister:
+    """
+    Copy writes queued in the Redis outbox stream to MongoDB.
+
+    Workers share one consumer group, so each entry is handled by one worker. Entries
+    are acknowledged and deleted only after MongoDB accepted them. A worker retries its
+    own pending entries before reading new ones, so clicks never reach MongoDB ahead of
+    the create they follow; entries left by a dead worker are claimed once they have
+    been idle for ``retry_after_ms``. Creates and clicks are acknowledged separately and
+    clicks that MongoDB rejected are queued again on their own, so a retry never adds
+    applied clicks twice. Creates are idempotent thanks to the long URL digest index,
+    while click counts may be applied twice if a worker dies between the write and the
+    ack.
+    """
+
+    def __init__(
+        self,
+        repo: RedisPrimaryShortURLRepository,
+        batch_size: int = Config.OUTBOX_BATCH_SIZE,
+        block_ms: int = Config.OUTBOX_BLOCK_MS,
+        retry_after_ms: int = Config.OUTBOX_RETRY_AFTER_MS,
+    ) -> None:
+        """
+        Initialize OutboxPersister.
+
+        :param repo: Redis-primary repository whose outbox is persisted.
+        :param batch_size: Largest number of entries persisted at once.
+        :param block_ms: How long to wait for new entries per read, in milliseconds.
+        :param retry_after_ms: Idle time after which a pending entry is retried.
+        """
+        self.repo = repo
+        self.redis = repo.redis
+        self.stream = repo.outbox
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.retry_after_ms = retry_after_ms
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._task: asyncio.Task | None = None
+
+    async def ensure_group(self) -> None:
+        """Create the consumer group and the stream if they do not exist yet."""
+        try:
+            await self.redis.xgroup_create(
+                self.stream, OUTBOX_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def persist(self, entries: list[tuple[str, dict[str, str]]]) -> None:
+        """
+        Write a batch of outbox entries to MongoDB and acknowledge them.
+
+        :param entries: Stream entry IDs with their fields.
+        """
+        if not entries:
+            return
+        creates: dict[str, ShortURLDTO] = {}
+        create_ids: list[str] = []
+        counts: dict[str, int] = {}
+        click_ids: list[str] = []
+        for entry_id, fields in entries:
+            op, payload = outbox_entry(fields)
+            if op == OUTBOX_CREATE:
+                creates.setdefault(payload.long_url, payload)
+                create_ids.append(entry_id)
+            else:
+                for short_code, count in payload.items():
+                    counts[short_code] = counts.get(short_code, 0) + count
+                click_ids.append(entry_id)
+        if creates:
+            _, conflicts = await self.repo.durable.create_many(list(creates.values()))
+            for url in conflicts:
+                logger.error(
+                    "Short code %s is taken in MongoDB by another long URL; "
+                    "dropping %s from the outbox.",
+                    url.short_code,
+                    url.long_url,
+                )
+            await self._done(create_ids)
+        # Clicks go after creates so counts for codes created in this batch apply.
+        if click_ids:
+            try:
+                await self.repo.durable.increment_click_counts(counts)
+            except PartialWriteError as e:
+                await self._done(click_ids, requeue=e.failed)
+                raise
+            await self._done(click_ids)
+
+    async def _done(
+        self, ids: list[str], requeue: dict[str, int] | None = None
+    ) -> None:
+        """
+        Acknowledge and delete persisted entries in one transaction.
+
+        :param ids: Stream entry IDs to remove.
+        :param requeue: Click counts MongoDB rejected, queued again as a new entry.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if requeue:
+                pipe.xadd(
+                    self.stream, {"op": OUTBOX_CLICKS, "counts": json.dumps(requeue)}
+                )
+            pipe.xack(self.stream, OUTBOX_GROUP, *ids)
+            pipe.xdel(self.stream, *ids)
+            await pipe.execute()
+        if not requeue:
+            OUTBOX_PERSISTED.inc(len(ids))
+
+    async def _next_batch(self) -> list[tuple[str, dict[str, str]]]:
+        # Entries this worker failed to persist go first, ahead of newer ones.
+        response = await self.redis.xreadgroup(
+            OUTBOX_GROUP, self.consumer, {self.stream: "0"}, count=self.batch_size
+        )
+        if response and response[0][1]:
+            return response[0][1]
+        _, claimed, _ = await self.redis.xautoclaim(
+            self.stream,
+            OUTBOX_GROUP,
+            self.consumer,
+            min_idle_time=self.retry_after_ms,
+            start_id="0-0",
+            count=self.batch_size,
+        )
+        if claimed:
+            return claimed
+        response = await self.redis.xreadgroup(
+            OUTBOX_GROUP,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=self.block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def _run(self) -> None:
+        await self.ensure_group()
+        while True:
+            try:
+                await self.persist(await self._next_batch())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                OUTBOX_FAILURES.inc()
+                logger.error("Failed to persist the outbox to MongoDB: %s", e)
+                await asyncio.sleep(self.block_ms / 1000)
+
+    def start(self) -> None:
+        """Start persisting the outbox in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop persisting; entries still queued stay in Redis for the next worker."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_outbox_persister: OutboxPersister | None = None
+
+
+def start_outbox_persister(repo: RedisPrimaryShortURLRepository) -> OutboxPersister:
+    """
+    Create and start the outbox persister of the current worker.
+
+    :param repo: Redis-primary repository whose outbox is persisted.
+    :return: The running outbox persister.
+    """
+    global _outbox_persister
+    if _outbox_persister is None:
+        _outbox_persister = OutboxPersister(repo)
+        _outbox_persister.start()
+    return _outbox_persister
+
+
+async def stop_outbox_persister() -> None:
+    """Stop the outbox persister of the current worker."""
+    global _outbox_persister
+    if _outbox_persister is not None:
+        await _outbox_persister.stop()
+    _outbox_persister = None
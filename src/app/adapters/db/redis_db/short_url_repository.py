@@ -0,0 +1,557 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from app.core.config import Config
+from app.core.errors import DuplicateEntityError, NotFoundError
+from app.core.hashing import long_url_digest
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from app.interfaces.short_url_interface import ShortURLRepository
+from bson import ObjectId
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CREATE = "create"
+OUTBOX_CLICKS = "clicks"
+
+# Results of the create script.
+_CREATED, _LONG_URL_EXISTS, _SHORT_CODE_EXISTS = 0, 1, 2
+
+_CREATE_SCRIPT = """
+local existing = redis.call('GET', KEYS[2])
+if existing then
+    return {1, existing}
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return {2, ''}
+end
+redis.call('HSET', KEYS[1], 'u', ARGV[2], 'n', ARGV[3], 'i', ARGV[4])
+redis.call('SET', KEYS[2], ARGV[1])
+if ARGV[5] ~= '' then
+    redis.call('HSET', KEYS[1], 'x', ARGV[5])
+    redis.call('EXPIREAT', KEYS[1], ARGV[5])
+    redis.call('EXPIREAT', KEYS[2], ARGV[5])
+end
+redis.call('XADD', KEYS[3], '*', 'op', 'create', 'code', ARGV[1], 'url', ARGV[2],
+           'clicks', ARGV[3], 'id', ARGV[4], 'expires', ARGV[5])
+return {0, ''}
+"""
+
+_INCREMENT_SCRIPT = """
+local codes = #KEYS - 3
+local ready = redis.call('EXISTS', KEYS[codes + 2]) == 1
+local applied = {}
+for i = 1, codes do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('HINCRBY', KEYS[i], 'n', ARGV[2 * i])
+        applied[ARGV[2 * i - 1]] = tonumber(ARGV[2 * i])
+    elseif not ready then
+        -- Not loaded yet: kept aside and added when the rebuild loads the code.
+        redis.call('HINCRBY', KEYS[codes + 1], ARGV[2 * i - 1], ARGV[2 * i])
+    end
+end
+if next(applied) ~= nil then
+    redis.call('XADD', KEYS[codes + 3], '*', 'op', 'clicks', 'counts', cjson.encode(applied))
+end
+"""
+
+# Loads durable records that are not in Redis yet, adding the clicks kept aside for
+# them. KEYS: pending clicks, outbox, then the code and long URL keys of each record;
+# ARGV: short code, long URL, click count, ID and expiry of each record.
+_LOAD_SCRIPT = """
+local loaded = 0
+local applied = {}
+for i = 0, (#KEYS - 2) / 2 - 1 do
+    local code_key, long_url_key = KEYS[3 + 2 * i], KEYS[4 + 2 * i]
+    local code, expires = ARGV[1 + 5 * i], ARGV[5 + 5 * i]
+    if redis.call('EXISTS', code_key) == 0 then
+        local pending = tonumber(redis.call('HGET', KEYS[1], code) or '0')
+        redis.call('HSET', code_key, 'u', ARGV[2 + 5 * i],
+                   'n', tonumber(ARGV[3 + 5 * i]) + pending, 'i', ARGV[4 + 5 * i])
+        local kept = redis.call('SET', long_url_key, code, 'NX')
+        if expires ~= '' then
+            redis.call('HSET', code_key, 'x', expires)
+            redis.call('EXPIREAT', code_key, expires)
+            if kept then
+                redis.call('EXPIREAT', long_url_key, expires)
+            end
+        end
+        if pending ~= 0 then
+            redis.call('HDEL', KEYS[1], code)
+            applied[code] = pending
+        end
+        loaded = loaded + 1
+    end
+end
+if next(applied) ~= nil then
+    redis.call('XADD', KEYS[2], '*', 'op', 'clicks', 'counts', cjson.encode(applied))
+end
+return loaded
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _to_epoch(expires_at: datetime | None) -> str:
+    return "" if expires_at is None else str(int(expires_at.timestamp()))
+
+
+def _from_epoch(value: str | None) -> datetime | None:
+    return datetime.fromtimestamp(int(value), UTC) if value else None
+
+
+class RedisPrimaryShortURLRepository(ShortURLRepository):
+    """
+    Repository keeping the authoritative short URLs and click counts in Redis.
+
+    Each short URL is a small hash ``<prefix>:c:<short_code>`` with the long URL,
+    click count and ID, and ``<prefix>:h:<digest>`` maps a long URL digest to its short
+    code. Every write also appends an entry to the ``<prefix>:outbox`` stream in the same
+    script, from which the outbox persister copies it to MongoDB asynchronously.
+    Redis must therefore run with persistence enabled and without key eviction.
+    Expiring short URLs keep their expiry in the ``x`` field, and both of their keys
+    are set to expire at that time.
+
+    Until the Redis dataset is rebuilt from MongoDB, reads that miss in Redis fall back
+    to the durable repository, and clicks on short codes not loaded yet are kept in the
+    ``<prefix>:pending`` hash, to be added to the record when the rebuild loads it.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        durable: ShortURLRepository,
+        prefix: str = Config.REDIS_STORE_PREFIX,
+    ) -> None:
+        """
+        Initialize RedisPrimaryShortURLRepository.
+
+        :param redis: Redis client returning decoded strings.
+        :param durable: Repository the outbox is persisted to, read while rebuilding.
+        :param prefix: Prefix of every key of the store.
+        """
+        self.redis = redis
+        self.durable = durable
+        self.prefix = prefix
+        self.outbox = f"{prefix}:outbox"
+        self.ready_key = f"{prefix}:ready"
+        self.pending_key = f"{prefix}:pending"
+        self.rebuild_lock_key = f"{prefix}:rebuild-lock"
+        self.ready = False
+        self._code_prefix = f"{prefix}:c:"
+        self._create = redis.register_script(_CREATE_SCRIPT)
+        self._increment = redis.register_script(_INCREMENT_SCRIPT)
+        self._load_script = redis.register_script(_LOAD_SCRIPT)
+        self._release = redis.register_script(_RELEASE_SCRIPT)
+
+    def code_key(self, short_code: str) -> str:
+        return self._code_prefix + short_code
+
+    def long_url_key(self, digest: bytes) -> str:
+        return f"{self.prefix}:h:{digest.hex()}"
+
+    def _to_dto(self, short_code: str, fields: list[str | None]) -> ShortURLDTO:
+        long_url, click_count, id, expires_at = fields
+        return ShortURLDTO(
+            _id=id,
+            long_url=long_url,
+            short_code=short_code,
+            click_count=int(click_count),
+            expires_at=_from_epoch(expires_at),
+        )
+
+    async def _insert(self, url: ShortURLDTO) -> ShortURLDTO | None:
+        """
+        Store a short URL unless its long URL or short code is already taken.
+
+        :return: The stored short URL, or None if the short code is taken.
+        """
+        digest = long_url_digest(url.long_url)
+        id = url.id or str(ObjectId())
+        result, existing = await self._create(
+            keys=[
+                self.code_key(url.short_code),
+                self.long_url_key(digest),
+                self.outbox,
+            ],
+            args=[
+                url.short_code,
+                url.long_url,
+                url.click_count,
+                id,
+                _to_epoch(url.expires_at),
+            ],
+        )
+        if result == _LONG_URL_EXISTS:
+            logger.warning("Short URL with long URL '%s' already exists.", url.long_url)
+            return await self.get_by_short_code(existing)
+        if result == _SHORT_CODE_EXISTS:
+            return None
+        url.id = id
+        return url
+
+    async def create(self, url: ShortURLDTO) -> ShortURLDTO:
+        """
+        Store a new short URL in Redis and queue it for MongoDB.
+
+        :param url: The short URL data transfer object.
+        :return: The created short URL with its ID, or the stored one for a known long URL.
+        :raises DuplicateEntityError: If a short URL with the same code already exists.
+        """
+        stored = await self._insert(url)
+        if stored is None:
+            logger.error("Short URL with code %s already exists.", url.short_code)
+            raise DuplicateEntityError(
+                f"Short URL with code {url.short_code} already exists."
+            )
+        logger.info("Short URL created with ID %s.", stored.id)
+        return stored
+
+    async def create_many(
+        self, urls: list[ShortURLDTO]
+    ) -> tuple[list[ShortURLDTO], list[ShortURLDTO]]:
+        """
+        Store many short URLs in Redis and queue them for MongoDB.
+
+        :param urls: The short URL data transfer objects, with distinct long URLs.
+        :return: The stored short URLs and the ones whose short code already exists.
+        """
+        stored, conflicts = [], []
+        for url in urls:
+            result = await self._insert(url)
+            if result is None:
+                conflicts.append(url)
+            else:
+                stored.append(result)
+        logger.info(
+            "Created %s short URLs, %s short code conflicts.",
+            len(stored),
+            len(conflicts),
+        )
+        return stored, conflicts
+
+    async def get_by_short_code(self, short_code: str) -> ShortURLDTO | None:
+        """
+        Retrieve a short URL by its short code.
+
+        :param short_code: The short code of the URL.
+        :return: The short URL data transfer object if found, else None.
+        """
+        fields = await self.redis.hmget(self.code_key(short_code), "u", "n", "i", "x")
+        if fields[0] is not None:
+            return self._to_dto(short_code, fields)
+        if not self.ready:
+            url = await self.durable.get_by_short_code(short_code=short_code)
+            if url is not None:
+                url.click_count += await self._pending_clicks(short_code)
+            return url
+        logger.warning("Short URL with code %s not found.", short_code)
+        return None
+
+    async def get_long_url(self, short_code: str) -> str | None:
+        """
+        Retrieve only the long URL for a short code.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL if found, else None.
+        """
+        long_url = await self.redis.hget(self.code_key(short_code), "u")
+        if long_url is None and not self.ready:
+            return await self.durable.get_long_url(short_code)
+        return long_url
+
+    async def get_long_url_with_expiry(
+        self, short_code: str
+    ) -> tuple[str | None, datetime | None]:
+        """
+        Retrieve the long URL and the expiry of a short code.
+
+        :param short_code: The short code of the URL.
+        :return: The long URL and when it expires, or ``(None, None)`` if not found.
+        """
+        long_url, expires_at = await self.redis.hmget(
+            self.code_key(short_code), "u", "x"
+        )
+        if long_url is None and not self.ready:
+            return await self.durable.get_long_url_with_expiry(short_code)
+        return long_url, _from_epoch(expires_at)
+
+    async def update_click_count(self, short_code: str) -> ShortURLDTO:
+        """
+        Increment the click count of a short URL.
+
+        :param short_code: The short code of the URL.
+        :return: The updated short URL data transfer object.
+        :raises NotFoundError: If the short URL with the given code is not found.
+        """
+        await self.increment_click_counts({short_code: 1})
+        url = await self.get_by_short_code(short_code)
+        if url is None:
+            raise NotFoundError(f"Short URL with code {short_code} not found.")
+        return url
+
+    async def get_click_count(self, short_code: str) -> int | None:
+        """
+        Read the click count of a short URL.
+
+        :param short_code: The short code of the URL.
+        :return: The click count if the short URL exists, else None.
+        """
+        click_count = await self.redis.hget(self.code_key(short_code), "n")
+        if click_count is not None:
+            return int(click_count)
+        if self.ready:
+            return None
+        click_count = await self.durable.get_click_count(short_code)
+        if click_count is None:
+            return None
+        return click_count + await self._pending_clicks(short_code)
+
+    async def _pending_clicks(self, short_code: str) -> int:
+        return int(await self.redis.hget(self.pending_key, short_code) or 0)
+
+    async def increment_click_counts(self, counts: dict[str, int]) -> None:
+        """
+        Add aggregated clicks to many short URLs, skipping unknown short codes.
+
+        The applied counts are queued for MongoDB as a single outbox entry. Until the
+        rebuild finished, clicks on short codes not loaded yet are kept aside instead.
+
+        :param counts: Number of clicks to add, keyed by short code.
+        """
+        if not counts:
+            return
+        args = []
+        for short_code, count in counts.items():
+            args.extend((short_code, count))
+        await self._increment(
+            keys=[
+                *(self.code_key(code) for code in counts),
+                self.pending_key,
+                self.ready_key,
+                self.outbox,
+            ],
+            args=args,
+        )
+        logger.info("Recorded clicks for %s short URLs.", len(counts))
+
+    async def iter_short_codes(self, batch_size: int = 10_000) -> AsyncIterator[str]:
+        """
+        Stream every short code stored in Redis with SCAN.
+
+        Before the rebuild finished the durable repository's codes are streamed first,
+        so codes may repeat.
+
+        :param batch_size: SCAN count hint.
+        :return: Async iterator over the short codes.
+        """
+        if not self.ready:
+            async for short_code in self.durable.iter_short_codes(batch_size):
+                yield short_code
+        start = len(self._code_prefix)
+        async for key in self.redis.scan_iter(
+            match=f"{self._code_prefix}*", count=batch_size
+        ):
+            yield key[start:]
+
+    async def iter_short_urls(
+        self, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream every short URL stored in Redis.
+
+        :param batch_size: SCAN count hint and number of hashes read per round trip.
+        :return: Async iterator over the short URLs.
+        """
+        codes = []
+        async for short_code in self.iter_short_codes(batch_size):
+            codes.append(short_code)
+            if len(codes) >= batch_size:
+                for url in await self._read_many(codes):
+                    yield url
+                codes = []
+        for url in await self._read_many(codes):
+            yield url
+
+    async def iter_short_url_rows(
+        self, after: str | None = None, batch_size: int = 1_000
+    ) -> AsyncIterator[tuple[str, str, str, int]]:
+        """
+        Stream the fields of every short URL in ID order, with live click counts.
+
+        Redis keeps no index by ID, so the order and the links come from the durable
+        repository, which may lag the outbox slightly; the click counts of each batch
+        are read from Redis in one round trip.
+
+        :param after: Only stream short URLs whose ID sorts after this one.
+        :param batch_size: Number of short URLs read per round trip.
+        :return: Async iterator over ``(id, short_code, long_url, click_count)``.
+        """
+        rows = []
+        async for row in self.durable.iter_short_url_rows(after, batch_size):
+            rows.append(row)
+            if len(rows) >= batch_size:
+                for row in await self._with_live_counts(rows):
+                    yield row
+                rows = []
+        for row in await self._with_live_counts(rows):
+            yield row
+
+    async def _with_live_counts(
+        self, rows: list[tuple[str, str, str, int]]
+    ) -> list[tuple[str, str, str, int]]:
+        if not rows:
+            return rows
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for _, short_code, _, _ in rows:
+                pipe.hget(self.code_key(short_code), "n")
+            counts = await pipe.execute()
+        return [
+            (id, short_code, long_url, click_count if live is None else int(live))
+            for (id, short_code, long_url, click_count), live in zip(rows, counts)
+        ]
+
+    async def _read_many(self, short_codes: list[str]) -> list[ShortURLDTO]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for short_code in short_codes:
+                pipe.hmget(self.code_key(short_code), "u", "n", "i", "x")
+            rows = await pipe.execute()
+        return [
+            self._to_dto(short_code, fields)
+            for short_code, fields in zip(short_codes, rows)
+            if fields[0] is not None
+        ]
+
+    async def iter_top_short_urls(
+        self, limit: int, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        """
+        Stream the most clicked short URLs as ranked by the durable repository.
+
+        Redis keeps no index by click count, so the ranking comes from MongoDB and may
+        lag the outbox slightly; the records themselves are read from Redis.
+
+        :param limit: Largest number of short URLs returned.
+        :param batch_size: Number of short URLs read per round trip.
+        :return: Async iterator over the short URLs.
+        """
+        codes = []
+        async for url in self.durable.iter_top_short_urls(limit, batch_size):
+            codes.append(url.short_code)
+            if len(codes) >= batch_size:
+                for stored in await self._read_many(codes):
+                    yield stored
+                codes = []
+        for stored in await self._read_many(codes):
+            yield stored
+
+    async def rebuild(
+        self,
+        batch_size: int = 1_000,
+        lock_ttl: int = Config.REDIS_STORE_REBUILD_LOCK_TTL,
+        poll_interval: float = 1.0,
+    ) -> int:
+        """
+        Load every short URL of the durable repository into Redis, unless already done.
+
+        Only the worker holding the rebuild lock loads; the others wait until the store
+        is marked ready, or take over if the lock expires. Records already in Redis are
+        left alone, since Redis holds the newer data.
+
+        :param batch_size: Number of short URLs loaded per script call.
+        :param lock_ttl: Seconds the lock is held without progress before it expires.
+        :param poll_interval: Seconds between checks while another worker rebuilds.
+        :return: Number of short URLs loaded by this worker.
+        """
+        token = str(ObjectId())
+        while not await self.redis.exists(self.ready_key):
+            if not await self.redis.set(
+                self.rebuild_lock_key, token, nx=True, ex=lock_ttl
+            ):
+                await asyncio.sleep(poll_interval)
+                continue
+            try:
+                loaded = await self._rebuild(batch_size, lock_ttl)
+            finally:
+                await self._release(keys=[self.rebuild_lock_key], args=[token])
+            self.ready = True
+            logger.info("Rebuilt the Redis short URL store with %s short URLs.", loaded)
+            return loaded
+        self.ready = True
+        return 0
+
+    async def _rebuild(self, batch_size: int, lock_ttl: int) -> int:
+        loaded = 0
+        batch: list[ShortURLDTO] = []
+        async for url in self.durable.iter_short_urls(batch_size):
+            batch.append(url)
+            if len(batch) >= batch_size:
+                loaded += await self.load(batch)
+                await self.redis.expire(self.rebuild_lock_key, lock_ttl)
+                batch = []
+        loaded += await self.load(batch)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # Clicks still kept aside belong to short codes that do not exist.
+            pipe.set(self.ready_key, 1)
+            pipe.delete(self.pending_key)
+            await pipe.execute()
+        return loaded
+
+    async def load(self, urls: list[ShortURLDTO]) -> int:
+        """
+        Copy short URLs stored in the durable repository into Redis.
+
+        Short codes already in Redis are left alone, in the same script that writes the
+        others, and expired short URLs are skipped.
+
+        :param urls: Short URLs as stored in the durable repository.
+        :return: Number of short URLs loaded.
+        """
+        keys, args = [self.pending_key, self.outbox], []
+        for url in urls:
+            if url.is_expired():
+                continue
+            keys.extend(
+                (
+                    self.code_key(url.short_code),
+                    self.long_url_key(long_url_digest(url.long_url)),
+                )
+            )
+            args.extend(
+                (
+                    url.short_code,
+                    url.long_url,
+                    url.click_count,
+                    url.id,
+                    _to_epoch(url.expires_at),
+                )
+            )
+        if not args:
+            return 0
+        return await self._load_script(keys=keys, args=args)
+
+
+def outbox_entry(fields: dict[str, str]) -> tuple[str, ShortURLDTO | dict[str, int]]:
+    """
+    Decode an outbox stream entry.
+
+    :param fields: Fields of the stream entry.
+    :return: The operation and either the created short URL or the click counts.
+    """
+    if fields["op"] == OUTBOX_CREATE:
+        return OUTBOX_CREATE, ShortURLDTO(
+            _id=fields["id"],
+            long_url=fields["url"],
+            short_code=fields["code"],
+            click_count=int(fields["clicks"]),
+            expires_at=_from_epoch(fields.get("expires")),
+        )
+    return OUTBOX_CLICKS, json.loads(fields["counts"])
@@ -0,0 +1,137 @@
+from collections.abc import Awaitable, Callable
+
+from app.core.config import Config
+from app.interfaces.click_stats_interface import ClickStatsRepository
+from app.interfaces.short_code_allocator_interface import IdBlockRepository
+from app.interfaces.short_url_interface import ShortURLRepository
+
+# Storage backends are imported on first use: the MongoDB driver alone takes about
+# 150 ms to import, which the in-memory store never needs.
+
+MEMORY_REPOSITORY = "memory"
+REDIS_REPOSITORY = "redis"
+
+RepositoryGetter = Callable[[], Awaitable[ShortURLRepository]]
+
+_repository_getter: tuple[str, RepositoryGetter] | None = None
+
+
+def _load_repository_getter(backend: str) -> RepositoryGetter:
+    if backend == MEMORY_REPOSITORY:
+        from app.adapters.db.memory_db import memory_short_url_repository
+
+        async def get_memory_repository() -> ShortURLRepository:
+            return memory_short_url_repository()
+
+        return get_memory_repository
+    if backend == REDIS_REPOSITORY:
+        from app.adapters.db.redis_db import redis_short_url_repository
+
+        return redis_short_url_repository
+    from app.adapters.db.mongo_db import get_short_link_collection
+    from app.adapters.db.mongo_db.short_url_repository import (
+        MotorMongoShortURLRepository,
+    )
+
+    async def get_mongo_repository() -> ShortURLRepository:
+        return MotorMongoShortURLRepository(
+            collection=await get_short_link_collection()
+        )
+
+    return get_mongo_repository
+
+
+async def get_short_url_repository() -> ShortURLRepository:
+    """
+    Dependency returning the short URL repository selected in Config.
+
+    ``SHORT_URL_REPOSITORY=memory`` keeps every link in the worker process, for
+    benchmarks and single-node deployments; ``redis`` serves reads and writes from
+    Redis and persists them to MongoDB in the background; anything else uses MongoDB.
+    The selected backend is imported on the first call only.
+
+    :return: The short URL repository.
+    """
+    global _repository_getter
+    backend = Config.SHORT_URL_REPOSITORY
+    if _repository_getter is None or _repository_getter[0] != backend:
+        _repository_getter = backend, _load_repository_getter(backend)
+    return await _repository_getter[1]()
+
+
+def get_id_block_repository() -> IdBlockRepository:
+    """
+    Return the central ID counter matching the selected short URL repository.
+
+    :return: The ID block repository.
+    """
+    if Config.SHORT_URL_REPOSITORY == MEMORY_REPOSITORY:
+        from app.adapters.db.memory_db import memory_id_block_repository
+
+        return memory_id_block_repository()
+    from app.adapters.db.mongo_db import get_counter_collection
+    from app.adapters.db.mongo_db.id_block_repository import (
+        MotorMongoIdBlockRepository,
+    )
+
+    return MotorMongoIdBlockRepository(collection=get_counter_collection())
+
+
+async def get_click_stats_repository() -> ClickStatsRepository | None:
+    """
+    Dependency returning the click bucket store, or None if click stats are disabled.
+
+    The in-memory store goes with the in-memory short URL repository; the other modes
+    keep buckets in MongoDB.
+
+    :return: The click stats repository.
+    """
+    if not Config.CLICK_STATS_ENABLED:
+        return None
+    if Config.SHORT_URL_REPOSITORY == MEMORY_REPOSITORY:
+        from app.adapters.db.memory_db import memory_click_stats_repository
+
+        return memory_click_stats_repository()
+    from app.adapters.db.mongo_db import get_click_bucket_collection
+    from app.adapters.db.mongo_db.click_stats_repository import (
+        MotorMongoClickStatsRepository,
+    )
+
+    return MotorMongoClickStatsRepository(await get_click_bucket_collection())
+
+
+async def start_short_url_repository() -> ShortURLRepository:
+    """
+    Prepare the selected short URL repository for serving.
+
+    MongoDB connections are opened up front, the Redis-primary store is rebuilt from
+    MongoDB if Redis lost it, and its outbox persister is started.
+
+    :return: The short URL repository.
+    """
+    if Config.SHORT_URL_REPOSITORY != MEMORY_REPOSITORY:
+        from app.adapters.db.mongo_db import warm_mongo_pool
+
+        await warm_mongo_pool()
+    repo = await get_short_url_repository()
+    if Config.SHORT_URL_REPOSITORY == REDIS_REPOSITORY:
+        from app.adapters.db.redis_db.outbox import start_outbox_persister
+
+        await repo.rebuild()
+        start_outbox_persister(repo)
+    return repo
+
+
+async def stop_short_url_repository() -> None:
+    """Stop the background work of the selected short URL repository and close MongoDB."""
+    if Config.SHORT_URL_REPOSITORY == MEMORY_REPOSITORY:
+        return
+    from app.adapters.db.mongo_db import close_mongo_client
+
+    if Config.SHORT_URL_REPOSITORY == REDIS_REPOSITORY:
+        from app.adapters.db.redis_db import close_redis_short_url_repository
+        from app.adapters.db.redis_db.outbox import stop_outbox_persister
+
+        await stop_outbox_persister()
+        close_redis_short_url_repository()
+    close_mongo_client()
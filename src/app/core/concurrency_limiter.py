@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import TypeVar
+
+from app.core.config import Config
+from app.core.errors import OverloadedError
+
+T = TypeVar("T")
+
+SHED_QUEUE_FULL = "queue_full"
+SHED_TIMEOUT = "timeout"
+SHED_EVICTED = "evicted"
+
+
+class Priority(IntEnum):
+    """Order in which queued calls get a free slot; lower values go first."""
+
+    HIGH = 0
+    LOW = 1
+
+
+class ConcurrencyLimiter:
+    """
+    Adaptive (AIMD) limit on the calls in flight, with a bounded priority queue.
+
+    A call runs at once while fewer than ``limit`` calls are in flight and waits in the
+    queue of its priority otherwise. Each slot that frees up goes to the oldest high
+    priority waiter first. When the queues are full a new high priority call takes the
+    place of the newest low priority waiter, and any other call is shed at once with
+    :class:`OverloadedError`, as is a waiter still queued after ``queue_timeout``.
+
+    The limit grows by one per ``limit`` calls completed while it was fully used, and
+    shrinks by ``backoff`` when a call fails or takes longer than ``latency`` seconds, at
+    most once per ``latency`` so one slow batch does not collapse it. Calls beyond what
+    the store can serve thus wait a bounded time or fail fast instead of piling up.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = Config.CONCURRENCY_LIMIT_INITIAL,
+        min_limit: int = Config.CONCURRENCY_LIMIT_MIN,
+        max_limit: int = Config.CONCURRENCY_LIMIT_MAX,
+        latency: float = Config.CONCURRENCY_LIMIT_LATENCY,
+        backoff: float = Config.CONCURRENCY_LIMIT_BACKOFF,
+        queue_size: int = Config.CONCURRENCY_QUEUE_SIZE,
+        queue_timeout: float = Config.CONCURRENCY_QUEUE_TIMEOUT,
+        retry_after: int = Config.CONCURRENCY_RETRY_AFTER,
+        expected_errors: tuple[type[BaseException], ...] = (),
+        enabled: bool = Config.CONCURRENCY_LIMIT_ENABLED,
+    ) -> None:
+        """
+        Initialize ConcurrencyLimiter.
+
+        :param initial_limit: Calls allowed in flight at first.
+        :param min_limit: Lowest the limit can shrink to.
+        :param max_limit: Highest the limit can grow to.
+        :param latency: Call duration in seconds above which the limit shrinks.
+        :param backoff: Factor applied to the limit when it shrinks.
+        :param queue_size: Largest number of calls waiting, all priorities together.
+        :param queue_timeout: Longest time in seconds a call waits before it is shed.
+        :param retry_after: Seconds a shed caller is told to wait before retrying.
+        :param expected_errors: Exceptions that are answers rather than failures, such
+            as a duplicate key; they do not shrink the limit.
+        :param enabled: Whether to limit at all; when False calls run directly.
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency = latency
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.expected_errors = expected_errors
+        self.enabled = enabled
+        self.in_flight = 0
+        self.shed: Counter[tuple[Priority, str]] = Counter()
+        self._queues: tuple[deque[asyncio.Future], ...] = tuple(
+            deque() for _ in Priority
+        )
+        self._last_decrease = 0.0
+
+    def queue_depth(self, priority: Priority | None = None) -> int:
+        """
+        Return the number of waiting calls.
+
+        :param priority: Only count the calls of this priority.
+        """
+        if priority is not None:
+            return len(self._queues[priority])
+        return sum(len(queue) for queue in self._queues)
+
+    async def run(
+        self, priority: Priority, call: Callable[..., Awaitable[T]], *args, **kwargs
+    ) -> T:
+        """
+        Run a call once a slot is free.
+
+        :param priority: Priority of the call while it waits.
+        :param call: Coroutine function to run.
+        :param args: Positional arguments of the call.
+        :param kwargs: Keyword arguments of the call.
+        :return: The result of the call.
+        :raises OverloadedError: If the call was shed without running.
+        """
+        if not self.enabled:
+            return await call(*args, **kwargs)
+        await self._acquire(priority)
+        started = time.monotonic()
+        succeeded: bool | None = False
+        try:
+            result = await call(*args, **kwargs)
+            succeeded = True
+            return result
+        except asyncio.CancelledError:
+            # The caller went away; that says nothing about the store.
+            succeeded = None
+            raise
+        except self.expected_errors:
+            succeeded = True
+            raise
+        finally:
+            self._release(time.monotonic() - started, succeeded)
+
+    def _overloaded(self, priority: Priority, reason: str) -> OverloadedError:
+        self.shed[priority, reason] += 1
+        return OverloadedError(
+            f"Shed a {priority.name.lower()} priority call: {reason}.",
+            self.retry_after,
+        )
+
+    async def _acquire(self, priority: Priority) -> None:
+        ahead = any(self._queues[p] for p in Priority if p <= priority)
+        if self.in_flight < int(self.limit) and not ahead:
+            self.in_flight += 1
+            return
+        if self.queue_depth() >= self.queue_size:
+            low = self._queues[Priority.LOW]
+            if priority is not Priority.HIGH or not low:
+                raise self._overloaded(priority, SHED_QUEUE_FULL)
+            low.pop().set_exception(self._overloaded(Priority.LOW, SHED_EVICTED))
+        queue = self._queues[priority]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            self._forget(queue, waiter)
+            raise self._overloaded(priority, SHED_TIMEOUT) from None
+        except asyncio.CancelledError:
+            self._forget(queue, waiter)
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # The slot was handed over just as the caller went away: pass it on.
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    @staticmethod
+    def _forget(queue: deque, waiter: asyncio.Future) -> None:
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self, duration: float, succeeded: bool | None) -> None:
+        if succeeded is False or (succeeded and duration > self.latency):
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif succeeded and self.in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for queue in self._queues:
+            while queue and self.in_flight < int(self.limit):
+                waiter = queue.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    waiter.set_result(None)
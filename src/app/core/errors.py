@@ -14,3 +14,19 @@ class DuplicateEntityError(RepositoryError):
     """Raised when trying to create an entity that already exists."""
 
     pass
+
+
+class PartialWriteError(RepositoryError):
+    """Raised when a bulk write applied only some of its operations."""
+
+    def __init__(self, message: str, failed: dict) -> None:
+        super().__init__(message)
+        self.failed = failed
+
+
+class OverloadedError(Exception):
+    """Raised when a call is shed because the repository is saturated."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,13 @@
+from hashlib import blake2b
+
+LONG_URL_DIGEST_SIZE = 16
+
+
+def long_url_digest(long_url: str) -> bytes:
+    """
+    Return the fixed-size digest used to index and deduplicate long URLs.
+
+    :param long_url: The original long URL.
+    :return: A 16 byte BLAKE2b digest of the URL.
+    """
+    return blake2b(long_url.encode(), digest_size=LONG_URL_DIGEST_SIZE).digest()
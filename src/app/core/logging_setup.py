@@ -0,0 +1,197 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import Config
+from app.core.metrics import registry
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Loggers configured by uvicorn with their own synchronous handlers.
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime"}
+
+_handler: "NonBlockingQueueHandler | None" = None
+_listener: "_DrainingQueueListener | None" = None
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """
+    Parse per-logger sample rates written as ``name=rate,name=rate``.
+
+    :param value: The configured sample rates.
+    :return: Sample rates between 0 and 1, keyed by logger name.
+    """
+    rates = {}
+    for item in value.split(","):
+        name, sep, rate = item.strip().partition("=")
+        if not sep:
+            continue
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a random fraction of the INFO and DEBUG records of selected loggers.
+
+    A rate applies to the named logger and its children, the most specific name
+    winning. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        """
+        Initialize SamplingFilter.
+
+        :param rates: Sample rates between 0 and 1, keyed by logger name.
+        """
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+        self._resolved: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand records to a bounded queue without formatting them or ever waiting.
+
+    Messages are formatted by the listener thread, so arguments are rendered when the
+    record is written rather than when it is logged. When the queue is full the record
+    is dropped and counted instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room so the records queued before shutdown are still written.
+        self.queue.put(self._sentinel)
+
+
+def _output_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    if Config.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def setup_logging() -> None:
+    """
+    Route every log record through a bounded queue written by a background thread.
+
+    The root logger gets the only handler, the uvicorn loggers propagate to it, and the
+    sample rates from ``Config.LOG_SAMPLE_RATES`` apply before records are queued.
+    Calling it again has no effect.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+    log_queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+    sampling = SamplingFilter(parse_sample_rates(Config.LOG_SAMPLE_RATES))
+    handler = _handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(sampling)
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(Config.LOG_LEVEL)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    _listener = _DrainingQueueListener(log_queue, _output_handler())
+    _listener.start()
+    atexit.register(stop_logging)
+
+    registry.callback(
+        "log_records_dropped_total",
+        "Log records dropped because the log queue was full.",
+        "counter",
+        lambda: handler.dropped,
+    )
+    registry.callback(
+        "log_records_sampled_out_total",
+        "INFO and DEBUG log records skipped by sampling.",
+        "counter",
+        lambda: sampling.sampled_out,
+    )
+    registry.callback(
+        "log_queue_size",
+        "Log records waiting to be written.",
+        "gauge",
+        log_queue.qsize,
+    )
+
+
+def stop_logging() -> None:
+    """Write the queued records, stop the writer thread and log synchronously after."""
+    global _handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().handlers = list(_listener.handlers)
+    _handler = None
+    _listener = None
@@ -0,0 +1,35 @@
+import os
+import re
+import time
+from itertools import count
+
+OBJECT_ID_PATTERN = re.compile(r"[0-9a-fA-F]{24}")
+
+_counter = count()
+_process: tuple[int, str] | None = None
+
+
+def new_object_id() -> str:
+    """
+    Return a new MongoDB ObjectId as a hex string, without importing the driver.
+
+    Uses the ObjectId layout: creation time in seconds, 5 random bytes per process and
+    a 3 byte counter, so IDs created by one process sort in creation order.
+
+    :return: 24 hexadecimal digits.
+    """
+    global _process
+    pid = os.getpid()
+    if _process is None or _process[0] != pid:
+        # Forked workers must not share the random part of their parent.
+        _process = pid, os.urandom(5).hex()
+    return f"{int(time.time()):08x}{_process[1]}{next(_counter) % 0x1000000:06x}"
+
+
+def is_object_id(value: str) -> bool:
+    """
+    Check that a string is a valid ObjectId.
+
+    :param value: The string to check.
+    """
+    return bool(OBJECT_ID_PATTERN.fullmatch(value))
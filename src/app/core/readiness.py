@@ -0,0 +1,46 @@
+from collections.abc import Callable
+
+
+class Readiness:
+    """
+    Named checks deciding whether the current worker should receive traffic.
+
+    Components register a check when they start warming up; the worker is ready once
+    every check passes.
+    """
+
+    def __init__(self) -> None:
+        self._checks: dict[str, Callable[[], bool]] = {}
+
+    def add_check(self, name: str, check: Callable[[], bool]) -> None:
+        """
+        Register or replace a readiness check.
+
+        :param name: Name reported by the readiness endpoint.
+        :param check: Returns True once the component is warm.
+        """
+        self._checks[name] = check
+
+    def set(self, name: str, ready: bool) -> None:
+        """
+        Register a check with a fixed outcome, for steps that finish at a known point.
+
+        :param name: Name reported by the readiness endpoint.
+        :param ready: Whether the step has finished.
+        """
+        self._checks[name] = lambda: ready
+
+    def clear(self) -> None:
+        """Forget every check."""
+        self._checks.clear()
+
+    def status(self) -> dict[str, bool]:
+        """Return the outcome of every check."""
+        return {name: bool(check()) for name, check in self._checks.items()}
+
+    @property
+    def ready(self) -> bool:
+        return all(check() for check in self._checks.values())
+
+
+readiness = Readiness()
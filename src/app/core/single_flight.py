@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """Raised to followers when the call they were waiting for was cancelled."""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one.
+
+    The first caller of a key runs the call; callers arriving while it is in flight
+    wait for and share its result or exception. If the running caller is cancelled,
+    one of the waiters takes over instead of failing with it.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call`` unless a call for the same key is already in flight.
+
+        :param key: Key identifying equivalent calls.
+        :param call: Zero-argument coroutine function producing the result.
+        :return: The result of the call that ran for this key.
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except BaseException as e:
+            future.set_exception(
+                _LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e
+            )
+            # Mark the exception as retrieved in case nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,94 @@
+from datetime import UTC, datetime, timedelta
+
+from app.core.config import Config
+
+MINUTE = "minute"
+HOUR = "hour"
+DAY = "day"
+
+# Width of a bucket per granularity, finest first.
+BUCKET_WIDTHS = {
+    MINUTE: timedelta(minutes=1),
+    HOUR: timedelta(hours=1),
+    DAY: timedelta(days=1),
+}
+
+# Range returned when a query gives no start, per granularity.
+DEFAULT_RANGES = {
+    MINUTE: timedelta(hours=1),
+    HOUR: timedelta(days=7),
+    DAY: timedelta(days=30),
+}
+
+
+def retention(granularity: str) -> timedelta | None:
+    """
+    Return how long buckets of a granularity are kept.
+
+    :param granularity: ``minute``, ``hour`` or ``day``.
+    :return: The retention, or None for buckets kept forever.
+    """
+    if granularity == MINUTE:
+        return timedelta(days=Config.CLICK_STATS_MINUTE_RETENTION_DAYS)
+    if granularity == HOUR:
+        return timedelta(days=Config.CLICK_STATS_HOUR_RETENTION_DAYS)
+    return None
+
+
+def as_utc(at: datetime) -> datetime:
+    """
+    Return the datetime in UTC, reading naive datetimes as UTC.
+
+    :param at: The datetime.
+    :return: The timezone-aware UTC datetime.
+    """
+    if at.tzinfo is None:
+        return at.replace(tzinfo=UTC)
+    return at.astimezone(UTC)
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    """
+    Return the start of the bucket containing a point in time.
+
+    :param at: The point in time.
+    :param granularity: ``minute``, ``hour`` or ``day``.
+    :return: The UTC start of the bucket.
+    """
+    at = as_utc(at)
+    if granularity == MINUTE:
+        return at.replace(second=0, microsecond=0)
+    if granularity == HOUR:
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str) -> list[datetime]:
+    """
+    Return the starts of every bucket overlapping ``[start, end)``.
+
+    :param start: Start of the range.
+    :param end: End of the range, exclusive.
+    :param granularity: ``minute``, ``hour`` or ``day``.
+    :return: Bucket starts in ascending order.
+    """
+    width = BUCKET_WIDTHS[granularity]
+    current, end = bucket_start(start, granularity), as_utc(end)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current += width
+    return starts
+
+
+def bucket_count(start: datetime, end: datetime, granularity: str) -> int:
+    """
+    Return the number of buckets overlapping ``[start, end)`` without listing them.
+
+    :param start: Start of the range.
+    :param end: End of the range, exclusive.
+    :param granularity: ``minute``, ``hour`` or ``day``.
+    :return: The number of buckets.
+    """
+    span = as_utc(end) - bucket_start(start, granularity)
+    return max(0, -(-span // BUCKET_WIDTHS[granularity]))
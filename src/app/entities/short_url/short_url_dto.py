@@ -1,4 +1,5 @@
-from bson import ObjectId
+from datetime import UTC, datetime
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -15,9 +16,50 @@ class ShortURLDTO(BaseModel):
     click_count: int = Field(
         0, description="The number of times the short URL has been clicked."
     )
+    expires_at: datetime | None = Field(
+        None, description="When the short URL stops resolving, or None to keep it."
+    )
 
     @field_validator("id", mode="before")
     def convert_objectid_to_str(cls, v):
-        if isinstance(v, ObjectId):
+        # ObjectIds are stringified without importing bson, which memory mode never loads.
+        if v is not None and not isinstance(v, str):
             return str(v)
         return v
+
+    @field_validator("expires_at")
+    def assume_utc(cls, v):
+        # MongoDB returns naive datetimes in UTC; expiries keep whole seconds only.
+        if v is not None and v.tzinfo is None:
+            v = v.replace(tzinfo=UTC)
+        return v if v is None else v.replace(microsecond=0)
+
+    def is_expired(self, now: datetime | None = None) -> bool:
+        """
+        Tell whether the short URL has expired.
+
+        :param now: Current time, the clock by default.
+        """
+        return self.expires_at is not None and self.expires_at <= (
+            now or datetime.now(UTC)
+        )
+
+    @classmethod
+    def from_document(cls, document: dict) -> "ShortURLDTO":
+        """
+        Map a MongoDB document to a DTO field by field.
+
+        Only the DTO fields are read, so stored extras such as ``long_url_hash`` are
+        never copied, and the ObjectId is converted up front.
+
+        :param document: The short URL document.
+        :return: The short URL data transfer object.
+        """
+        id = document.get("_id")
+        return cls(
+            _id=None if id is None else str(id),
+            long_url=document["long_url"],
+            short_code=document["short_code"],
+            click_count=document.get("click_count", 0),
+            expires_at=document.get("expires_at"),
+        )
@@ -1,21 +1,43 @@
 import secrets
 import string
+from dataclasses import dataclass
+from datetime import datetime
 
-from pydantic import BaseModel, Field
+from app.entities.short_url.short_url_dto import ShortURLDTO
 
 
-class ShortURLEntity(BaseModel):
+@dataclass(slots=True)
+class ShortURLEntity:
     """
     Entity for representing Short URLs.
+
+    A plain slotted dataclass rather than a Pydantic model: entities are built on every
+    lookup from data that was already validated when it was stored, so they skip
+    validation and keep no per-instance ``__dict__``.
     """
 
-    long_url: str = Field(..., description="The original long URL.")
-    short_code: str | None = Field(
-        None, description="The generated short code for the URL."
-    )
-    click_count: int = Field(
-        0, description="The number of times the short URL has been clicked."
-    )
+    long_url: str
+    short_code: str | None = None
+    click_count: int = 0
+    expires_at: datetime | None = None
+
+    @classmethod
+    def from_dto(cls, dto: ShortURLDTO) -> "ShortURLEntity":
+        """
+        Build an entity from a repository DTO without an intermediate dict.
+
+        :param dto: The short URL data transfer object.
+        :return: The short URL entity.
+        """
+        return cls(dto.long_url, dto.short_code, dto.click_count, dto.expires_at)
+
+    def to_response(self) -> dict[str, str | datetime | None]:
+        """Return the fields exposed by the short URL endpoints."""
+        return {
+            "short_code": self.short_code,
+            "long_url": self.long_url,
+            "expires_at": self.expires_at,
+        }
 
     @classmethod
     def generate_short_url(cls) -> str:
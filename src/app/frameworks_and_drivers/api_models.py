@@ -1,4 +1,18 @@
-from pydantic import BaseModel, Field
+from datetime import UTC, datetime
+
+from app.core.config import Config
+from pydantic import BaseModel, Field, field_validator
+
+
+def _in_the_future(expires_at: datetime | None) -> datetime | None:
+    if expires_at is None:
+        return None
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=UTC)
+    if expires_at <= datetime.now(UTC):
+        raise ValueError("expires_at must be in the future")
+    # Expiries are stored and cached with whole seconds.
+    return expires_at.replace(microsecond=0)
 
 
 class URLPayload(BaseModel):
@@ -7,6 +21,31 @@ class URLPayload(BaseModel):
     """
 
     long_url: str = Field(..., description="The original long URL to be shortened.")
+    expires_at: datetime | None = Field(
+        None,
+        description="When the short URL stops resolving; naive times are UTC. "
+        "A long URL that already has a live short URL keeps that one.",
+    )
+
+    _check_expires_at = field_validator("expires_at")(_in_the_future)
+
+
+class BulkURLPayload(BaseModel):
+    """
+    A Pydantic model for the payload containing many long URLs to shorten at once.
+    """
+
+    long_urls: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=Config.BULK_CREATE_MAX_ITEMS,
+        description="The original long URLs to be shortened.",
+    )
+    expires_at: datetime | None = Field(
+        None, description="When the new short URLs stop resolving; naive times are UTC."
+    )
+
+    _check_expires_at = field_validator("expires_at")(_in_the_future)
 
 
 class ShortURLResponse(BaseModel):
@@ -16,6 +55,9 @@ class ShortURLResponse(BaseModel):
 
     short_code: str = Field(..., description="The shortened URL code.")
     long_url: str = Field(..., description="The original long URL.")
+    expires_at: datetime | None = Field(
+        None, description="When the short URL stops resolving, if it expires."
+    )
 
 
 class ClickCountResponse(BaseModel):
@@ -26,3 +68,71 @@ class ClickCountResponse(BaseModel):
     click_count: int = Field(
         ..., description="The number of times the short URL has been clicked."
     )
+
+
+class ClickBucket(BaseModel):
+    """
+    A Pydantic model for the clicks of a short URL in one time bucket.
+    """
+
+    start: datetime = Field(..., description="Start of the bucket, in UTC.")
+    clicks: int = Field(..., description="Clicks recorded in the bucket.")
+
+
+class ClickHistoryResponse(BaseModel):
+    """
+    A Pydantic model for the response containing the clicks of a short URL over time.
+    """
+
+    short_code: str = Field(..., description="The shortened URL code.")
+    granularity: str = Field(..., description="Bucket width: minute, hour or day.")
+    total: int = Field(..., description="Clicks over the whole range.")
+    buckets: list[ClickBucket] = Field(
+        ..., description="Every bucket of the range in ascending order, empty ones too."
+    )
+
+
+class BulkShortURLItem(BaseModel):
+    """
+    A Pydantic model for the result of shortening one long URL of a bulk request.
+    """
+
+    long_url: str = Field(..., description="The original long URL.")
+    short_code: str | None = Field(
+        None, description="The shortened URL code, missing if shortening failed."
+    )
+    error: str | None = Field(None, description="Why shortening failed, if it did.")
+
+
+class BulkShortURLResponse(BaseModel):
+    """
+    A Pydantic model for the response of a bulk shortening request.
+    """
+
+    items: list[BulkShortURLItem] = Field(
+        ..., description="One result per requested long URL, in request order."
+    )
+
+
+class TopLink(BaseModel):
+    """
+    A Pydantic model for one of the most clicked short URLs.
+    """
+
+    short_code: str = Field(..., description="The shortened URL code.")
+    clicks: int = Field(
+        ..., description="Estimated clicks, never below the true count."
+    )
+    min_clicks: int = Field(..., description="Clicks the short URL certainly got.")
+
+
+class TopLinksResponse(BaseModel):
+    """
+    A Pydantic model for the response listing the most clicked short URLs right now.
+    """
+
+    window_seconds: int = Field(
+        ..., description="Length of the windows; the counts cover one to two of them."
+    )
+    summaries: int = Field(..., description="Number of worker summaries merged.")
+    links: list[TopLink] = Field(..., description="Short URLs by decreasing clicks.")
@@ -1,28 +1,86 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from app.adapters.api.endpoints import init_api
-from app.adapters.cache.redis_cache import init_redis_cache
-from app.adapters.db.mongo_db import mongo_client
-from fastapi import Depends, FastAPI
+from app.adapters.cache.heavy_hitters import start_heavy_hitters, stop_heavy_hitters
+from app.adapters.cache.redis_cache import (
+    init_redis_cache,
+    start_cache_invalidation_listener,
+    stop_cache_invalidation_listener,
+    warm_redis_pool,
+)
+from app.adapters.cache.short_code_filter import (
+    short_code_filter_settled,
+    start_short_code_filter,
+    stop_short_code_filter,
+)
+from app.adapters.db.repositories import (
+    get_click_stats_repository,
+    get_id_block_repository,
+    start_short_url_repository,
+    stop_short_url_repository,
+)
+from app.core.logging_setup import setup_logging, stop_logging
+from app.core.readiness import readiness
+from app.use_cases.cache_warmer import (
+    cache_warmup_settled,
+    start_cache_warmer,
+    stop_cache_warmer,
+)
+from app.use_cases.click_aggregator import start_click_aggregator, stop_click_aggregator
+from app.use_cases.short_code_allocator import init_short_code_allocator
+from fastapi import FastAPI
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
 
-
-@app.on_event("startup")
 async def startup_event():
-    """Initialize Redis cache and MongoDB client at startup."""
+    """
+    Initialize Redis cache, the configured repository and the per-worker services.
+
+    Redis and MongoDB connections are opened concurrently before the worker serves,
+    and ``/ready`` reports ready once they are open, the short code filter is built
+    and the first cache warm-up finished.
+    """
+    readiness.set("serving", False)
+    readiness.set("connections", False)
+    readiness.add_check("short_code_filter", short_code_filter_settled)
+    readiness.add_check("cache_warmup", cache_warmup_settled)
     init_redis_cache()
+    start_cache_invalidation_listener()
+    start_heavy_hitters()
+    _, repo = await asyncio.gather(warm_redis_pool(), start_short_url_repository())
+    readiness.set("connections", True)
+    start_click_aggregator(repo, await get_click_stats_repository())
+    start_short_code_filter(repo.iter_short_codes)
+    start_cache_warmer(repo)
+    init_short_code_allocator(get_id_block_repository())
+    readiness.set("serving", True)
+
+
+async def shutdown_event():
+    """Stop taking traffic, flush pending clicks, close the stores and flush the logs."""
+    readiness.set("serving", False)
+    await stop_cache_warmer()
+    await stop_click_aggregator()
+    await stop_heavy_hitters()
+    await stop_short_code_filter()
+    await stop_cache_invalidation_listener()
+    await stop_short_url_repository()
+    stop_logging()
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up per-worker infrastructure before serving and tear it down after."""
+    await startup_event()
+    yield
+    await shutdown_event()
 
-@app.on_event("shutdown")
-async def shutdown_event(client: Depends = Depends(mongo_client)):
-    """Close MongoDB client connection at shutdown."""
-    logging.info("Closing MongoDB client...")
-    if client:
-        client.close()
 
+app = FastAPI(lifespan=lifespan)
 
-logging.info("Initializing API endpoints...")
+logger.info("Initializing API endpoints...")
 init_api(app)
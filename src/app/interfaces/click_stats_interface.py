@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class ClickStatsRepository(ABC):
+    @abstractmethod
+    async def add_clicks(self, counts: dict[str, int], at: datetime) -> None:
+        ...
+
+    @abstractmethod
+    async def get_buckets(
+        self, short_code: str, granularity: str, start: datetime, end: datetime
+    ) -> dict[datetime, int]:
+        ...
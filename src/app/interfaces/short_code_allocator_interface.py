@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+
+class ShortCodeAllocator(ABC):
+    @abstractmethod
+    async def allocate(self) -> str:
+        ...
+
+
+class IdBlockRepository(ABC):
+    @abstractmethod
+    async def lease_block(self, name: str, size: int) -> int:
+        ...
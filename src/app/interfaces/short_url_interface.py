@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
 
 from app.entities.short_url.short_url_dto import ShortURLDTO
 
@@ -8,10 +10,54 @@ class ShortURLRepository(ABC):
     async def create(self, url: ShortURLDTO) -> ShortURLDTO:
         ...
 
+    @abstractmethod
+    async def create_many(
+        self, urls: list[ShortURLDTO]
+    ) -> tuple[list[ShortURLDTO], list[ShortURLDTO]]:
+        ...
+
     @abstractmethod
     async def get_by_short_code(self, *, short_code: str) -> ShortURLDTO | None:
         ...
 
+    @abstractmethod
+    async def get_long_url(self, short_code: str) -> str | None:
+        ...
+
+    @abstractmethod
+    async def get_long_url_with_expiry(
+        self, short_code: str
+    ) -> tuple[str | None, datetime | None]:
+        ...
+
     @abstractmethod
     async def update_click_count(self, short_code: str) -> None:
         ...
+
+    @abstractmethod
+    async def get_click_count(self, short_code: str) -> int | None:
+        ...
+
+    @abstractmethod
+    async def increment_click_counts(self, counts: dict[str, int]) -> None:
+        ...
+
+    @abstractmethod
+    def iter_short_codes(self, batch_size: int = 10_000) -> AsyncIterator[str]:
+        ...
+
+    @abstractmethod
+    def iter_short_urls(self, batch_size: int = 1_000) -> AsyncIterator[ShortURLDTO]:
+        ...
+
+    @abstractmethod
+    def iter_short_url_rows(
+        self, after: str | None = None, batch_size: int = 1_000
+    ) -> AsyncIterator[tuple[str, str, str, int]]:
+        ...
+
+    @abstractmethod
+    def iter_top_short_urls(
+        self, limit: int, batch_size: int = 1_000
+    ) -> AsyncIterator[ShortURLDTO]:
+        ...
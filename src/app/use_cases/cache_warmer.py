@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+
+from app.adapters.cache.short_url_cache import get_short_url_cache
+from app.core.config import Config
+from app.core.metrics import registry
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from app.interfaces.short_url_interface import ShortURLRepository
+
+logger = logging.getLogger(__name__)
+
+# Redis keeps a few dozen bytes of bookkeeping per key on top of the key and value.
+KEY_OVERHEAD_BYTES = 64
+
+WARMUP_ENTRIES = registry.counter(
+    "cache_warmup_entries_total", "Short URLs preloaded into the cache by the warm-up."
+)
+WARMUP_SECONDS = registry.gauge(
+    "cache_warmup_last_run_seconds", "Duration of the last cache warm-up run."
+)
+
+
+def entry_bytes(url: ShortURLDTO) -> int:
+    """
+    Estimate the Redis memory taken by the two cache entries of a short URL.
+
+    :param url: The short URL.
+    :return: Approximate bytes of keys, values and per-key overhead.
+    """
+    code = len(url.short_code)
+    long_url = len(url.long_url)
+    return 2 * (KEY_OVERHEAD_BYTES + len(Config.CACHE_KEY_PREFIX) + 3 + code) + (
+        2 * long_url + 1 + (10 if url.expires_at else 0)
+    )
+
+
+class CacheWarmer:
+    """
+    Preload the most clicked short URLs into the cache.
+
+    Each run reads the top short URLs by click count and writes their long URL and
+    entity entries to Redis in pipelined batches, filling the local tier with the
+    hottest of them as well. A run stops early once it used up its time budget or once
+    the entries it wrote reach its memory budget, so a cold start never waits on it for
+    long. Runs repeat every ``interval`` seconds to follow the traffic.
+    """
+
+    def __init__(
+        self,
+        repo: ShortURLRepository,
+        top_n: int = Config.CACHE_WARMUP_TOP_N,
+        batch_size: int = Config.CACHE_WARMUP_BATCH_SIZE,
+        time_budget: float = Config.CACHE_WARMUP_TIME_BUDGET,
+        memory_budget: int = Config.CACHE_WARMUP_MEMORY_BUDGET,
+        interval: float = Config.CACHE_WARMUP_INTERVAL,
+    ) -> None:
+        """
+        Initialize CacheWarmer.
+
+        :param repo: Repository ranking the short URLs by click count.
+        :param top_n: Largest number of short URLs preloaded per run.
+        :param batch_size: Number of short URLs written per Redis pipeline.
+        :param time_budget: Longest duration of a run, in seconds.
+        :param memory_budget: Largest estimated number of cache bytes written per run.
+        :param interval: Seconds between the end of a run and the start of the next.
+        """
+        self.repo = repo
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.interval = interval
+        self.completed_runs = 0
+        self._task: asyncio.Task | None = None
+
+    async def warm(self) -> int:
+        """
+        Run one warm-up within the time and memory budgets.
+
+        :return: Number of short URLs preloaded.
+        """
+        cache = get_short_url_cache()
+        # Two local entries per short URL; leave half of the local tier to live traffic.
+        local_slots = cache.local.max_size // 4
+        started = time.monotonic()
+        loaded = used = 0
+        batch: list[ShortURLEntity] = []
+        stopped_by = "top N"
+        urls = self.repo.iter_top_short_urls(self.top_n, self.batch_size)
+        try:
+            async with asyncio.timeout(self.time_budget):
+                async for url in urls:
+                    size = entry_bytes(url)
+                    if used + size > self.memory_budget:
+                        stopped_by = "memory budget"
+                        break
+                    used += size
+                    batch.append(ShortURLEntity.from_dto(url))
+                    if len(batch) >= self.batch_size:
+                        await cache.preload(
+                            batch, Config.CACHE_TIME, max(0, local_slots - loaded)
+                        )
+                        loaded += len(batch)
+                        batch = []
+                await cache.preload(
+                    batch, Config.CACHE_TIME, max(0, local_slots - loaded)
+                )
+                loaded += len(batch)
+        except TimeoutError:
+            stopped_by = "time budget"
+        finally:
+            await urls.aclose()
+        elapsed = time.monotonic() - started
+        WARMUP_ENTRIES.inc(loaded)
+        WARMUP_SECONDS.set(elapsed)
+        logger.info(
+            "Cache warm-up preloaded %s short URLs (about %s bytes) in %.3fs, "
+            "stopped by the %s.",
+            loaded,
+            used,
+            elapsed,
+            stopped_by,
+        )
+        return loaded
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.warm()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Cache warm-up failed: %s", e)
+            self.completed_runs += 1
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start warming the cache now and then on schedule, in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduled warm-ups."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_cache_warmer: CacheWarmer | None = None
+
+
+def start_cache_warmer(repo: ShortURLRepository) -> CacheWarmer | None:
+    """
+    Create and start the cache warmer of the current worker, unless disabled.
+
+    :param repo: Repository ranking the short URLs by click count.
+    :return: The running cache warmer, or None if the warm-up is disabled.
+    """
+    global _cache_warmer
+    if Config.CACHE_WARMUP_ENABLED and _cache_warmer is None:
+        _cache_warmer = CacheWarmer(repo)
+        _cache_warmer.start()
+    return _cache_warmer
+
+
+def cache_warmup_settled() -> bool:
+    """Tell whether the first warm-up finished, or the warm-up is disabled."""
+    return _cache_warmer is None or _cache_warmer.completed_runs > 0
+
+
+async def stop_cache_warmer() -> None:
+    """Stop the cache warmer of the current worker."""
+    global _cache_warmer
+    if _cache_warmer is not None:
+        await _cache_warmer.stop()
+    _cache_warmer = None
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
+
+from app.core.config import Config
+from app.core.errors import PartialWriteError
+from app.interfaces.click_stats_interface import ClickStatsRepository
+from app.interfaces.short_url_interface import ShortURLRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ClickAggregator:
+    """
+    Write-behind buffer for click counts.
+
+    Clicks are summed per short code in process memory and written to the repository
+    in a single bulk update, either every ``flush_interval`` seconds or as soon as
+    ``max_pending`` distinct short codes are waiting, whichever comes first. After a
+    failed flush the next one waits ``flush_interval`` seconds, doubled with every
+    further failure up to ``max_backoff``, however many clicks pile up meanwhile.
+
+    With a click stats repository, each flushed batch is also added to the time
+    buckets of the moment its first click was recorded, so bucket times are accurate
+    to about ``flush_interval``.
+    """
+
+    def __init__(
+        self,
+        repo: ShortURLRepository,
+        flush_interval: float = Config.CLICK_FLUSH_INTERVAL,
+        max_pending: int = Config.CLICK_FLUSH_MAX_PENDING,
+        click_stats: ClickStatsRepository | None = None,
+        max_backoff: float = Config.CLICK_FLUSH_MAX_BACKOFF,
+    ) -> None:
+        """
+        Initialize ClickAggregator.
+
+        :param repo: Repository the aggregated clicks are written to.
+        :param flush_interval: Longest time in seconds a click may stay unflushed.
+        :param max_pending: Number of distinct short codes that triggers an early flush.
+        :param click_stats: Time buckets the flushed clicks are also added to.
+        :param max_backoff: Longest wait in seconds before retrying a failed flush.
+        """
+        self.repo = repo
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.click_stats = click_stats
+        self.max_backoff = max_backoff
+        self._failures = 0
+        self._retry_at = 0.0
+        self._pending: dict[str, int] = {}
+        self._pending_since: datetime | None = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add(self, short_code: str, count: int = 1) -> None:
+        """
+        Record clicks for a short code without touching the repository.
+
+        :param short_code: The short code that was clicked.
+        :param count: Number of clicks to add.
+        """
+        if not self._pending:
+            self._pending_since = datetime.now(UTC)
+        self._pending[short_code] = self._pending.get(short_code, 0) + count
+        if (
+            len(self._pending) >= self.max_pending
+            and time.monotonic() >= self._retry_at
+        ):
+            self._wakeup.set()
+
+    def pending(self, short_code: str) -> int:
+        """
+        Return the clicks recorded for a short code that are not flushed yet.
+
+        :param short_code: The short code to look up.
+        """
+        return self._pending.get(short_code, 0)
+
+    async def flush(self) -> None:
+        """
+        Write every pending click to the repository with one bulk update.
+
+        On failure the clicks are put back so the next flush retries them; when the
+        bulk update was partly applied, only the clicks of the failed updates are. Click
+        buckets are best effort: a failed bucket write is logged and not retried, so
+        the lifetime counts are never applied twice.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            since = self._pending_since
+            try:
+                await self.repo.increment_click_counts(batch)
+            except Exception as e:
+                self._failures += 1
+                self._retry_at = time.monotonic() + min(
+                    self.max_backoff,
+                    self.flush_interval * 2 ** min(self._failures - 1, 16),
+                )
+                self._wakeup.clear()
+                failed = e.failed if isinstance(e, PartialWriteError) else batch
+                for short_code, count in failed.items():
+                    self.add(short_code, count)
+                self._pending_since = since
+                raise
+            self._failures = 0
+            self._retry_at = 0.0
+            if self.click_stats is not None:
+                try:
+                    await self.click_stats.add_clicks(batch, since)
+                except Exception as e:
+                    logger.error("Failed to add clicks to the time buckets: %s", e)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=max(self.flush_interval, self._retry_at - time.monotonic()),
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Failed to flush click counts: %s", e)
+
+    def start(self) -> None:
+        """Start the periodic background flush."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flush and write out whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_click_aggregator: ClickAggregator | None = None
+
+
+def start_click_aggregator(
+    repo: ShortURLRepository, click_stats: ClickStatsRepository | None = None
+) -> ClickAggregator:
+    """
+    Create and start the click aggregator of the current worker.
+
+    :param repo: Repository the aggregated clicks are written to.
+    :param click_stats: Time buckets the flushed clicks are also added to.
+    :return: The running click aggregator.
+    """
+    global _click_aggregator
+    if _click_aggregator is None:
+        _click_aggregator = ClickAggregator(repo, click_stats=click_stats)
+        _click_aggregator.start()
+    return _click_aggregator
+
+
+def get_click_aggregator() -> ClickAggregator | None:
+    """Return the click aggregator of the current worker, if it was started."""
+    return _click_aggregator
+
+
+async def stop_click_aggregator() -> None:
+    """Flush the remaining clicks and stop the click aggregator of the current worker."""
+    global _click_aggregator
+    if _click_aggregator is not None:
+        await _click_aggregator.stop()
+    _click_aggregator = None
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import string
+from hashlib import blake2b
+
+from app.core.config import Config
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from app.interfaces.short_code_allocator_interface import (
+    IdBlockRepository,
+    ShortCodeAllocator,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE62_ALPHABET = string.ascii_letters + string.digits
+FEISTEL_ROUNDS = 4
+SHORT_CODE_COUNTER_NAME = "short_code"
+
+
+def _round_value(key: bytes, round_index: int, value: int, mask: int) -> int:
+    digest = blake2b(
+        value.to_bytes(8, "big") + bytes([round_index]), key=key, digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") & mask
+
+
+def permute(value: int, domain: int, key: bytes) -> int:
+    """
+    Map a value of ``[0, domain)`` to another one with a keyed bijection.
+
+    A balanced Feistel network permutes the smallest even bit width covering the
+    domain, and values falling outside the domain are walked through the network
+    again until they land inside it.
+
+    :param value: Value to permute, lower than ``domain``.
+    :param domain: Size of the domain.
+    :param key: Secret key selecting the permutation.
+    :return: The permuted value.
+    """
+    bits = max(2, (domain - 1).bit_length())
+    bits += bits % 2
+    half = bits // 2
+    mask = (1 << half) - 1
+    while True:
+        left, right = value >> half, value & mask
+        for round_index in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ _round_value(key, round_index, right, mask)
+        value = (left << half) | right
+        if value < domain:
+            return value
+
+
+def encode_id(short_id: int, secret: str, min_length: int) -> str:
+    """
+    Turn a sequential ID into a random looking base62 short code.
+
+    IDs fill the keyspace of ``min_length`` characters first and then move on to one
+    more character, so codes only grow when the shorter keyspace is exhausted.
+    Distinct IDs always produce distinct codes.
+
+    :param short_id: Non-negative sequential ID.
+    :param secret: Secret that keys the permutation; it must never change.
+    :param min_length: Length of the shortest codes.
+    :return: The short code.
+    """
+    length = min_length
+    domain = len(BASE62_ALPHABET) ** length
+    while short_id >= domain:
+        short_id -= domain
+        length += 1
+        domain = len(BASE62_ALPHABET) ** length
+    key = blake2b(f"{secret}:{length}".encode(), digest_size=32).digest()
+    value = permute(short_id, domain, key)
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, len(BASE62_ALPHABET))
+        chars.append(BASE62_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+class RandomShortCodeAllocator(ShortCodeAllocator):
+    """Allocator drawing random codes; collisions must be retried by the caller."""
+
+    async def allocate(self) -> str:
+        return ShortURLEntity.generate_short_url()
+
+
+class BlockShortCodeAllocator(ShortCodeAllocator):
+    """
+    Collision-free allocator leasing blocks of IDs from a central counter.
+
+    Each worker reserves ``block_size`` IDs at a time, so the counter is only hit
+    once per block, and maps every ID to a code through :func:`encode_id`.
+    """
+
+    def __init__(
+        self,
+        id_blocks: IdBlockRepository,
+        block_size: int = Config.SHORT_CODE_BLOCK_SIZE,
+        secret: str = Config.SHORT_CODE_SECRET,
+        min_length: int = Config.SHORT_CODE_MIN_LENGTH,
+    ) -> None:
+        """
+        Initialize BlockShortCodeAllocator.
+
+        :param id_blocks: Central counter handing out ID blocks.
+        :param block_size: Number of IDs leased at once.
+        :param secret: Secret keying the ID to code permutation.
+        :param min_length: Length of the shortest codes.
+        """
+        self.id_blocks = id_blocks
+        self.block_size = block_size
+        self.secret = secret
+        self.min_length = min_length
+        self._next_id = 0
+        self._end_id = 0
+        self._lease_lock = asyncio.Lock()
+
+    async def allocate(self) -> str:
+        if self._next_id >= self._end_id:
+            async with self._lease_lock:
+                if self._next_id >= self._end_id:
+                    start = await self.id_blocks.lease_block(
+                        SHORT_CODE_COUNTER_NAME, self.block_size
+                    )
+                    self._next_id, self._end_id = start, start + self.block_size
+        short_id = self._next_id
+        self._next_id += 1
+        return encode_id(short_id, self.secret, self.min_length)
+
+
+_short_code_allocator: ShortCodeAllocator | None = None
+
+
+def init_short_code_allocator(id_blocks: IdBlockRepository) -> ShortCodeAllocator:
+    """
+    Create the short code allocator of the current worker as selected in Config.
+
+    :param id_blocks: Central counter used by the block allocator.
+    :return: The short code allocator.
+    """
+    global _short_code_allocator
+    if Config.SHORT_CODE_ALLOCATOR == "random":
+        _short_code_allocator = RandomShortCodeAllocator()
+    else:
+        _short_code_allocator = BlockShortCodeAllocator(id_blocks)
+    return _short_code_allocator
+
+
+def get_short_code_allocator() -> ShortCodeAllocator | None:
+    """Return the short code allocator of the current worker, if it was created."""
+    return _short_code_allocator
@@ -1,29 +1,119 @@
+import asyncio
 import logging
+import math
+import random
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime
 
-from app.adapters.cache.redis_cache import my_key_builder
+from app.adapters.cache.redis_cache import announce_short_codes
+from app.adapters.cache.short_code_filter import short_code_filter
+from app.adapters.cache.short_url_cache import cache_ttl, get_short_url_cache
+from app.core.concurrency_limiter import ConcurrencyLimiter, Priority
 from app.core.config import Config
-from app.core.errors import DuplicateEntityError
+from app.core.errors import DuplicateEntityError, NotFoundError
+from app.core.metrics import registry
+from app.core.single_flight import SingleFlight
+from app.entities.click_stats.click_buckets import bucket_starts
 from app.entities.short_url.short_url_dto import ShortURLDTO
 from app.entities.short_url.short_url_entity import ShortURLEntity
+from app.interfaces.click_stats_interface import ClickStatsRepository
+from app.interfaces.short_code_allocator_interface import ShortCodeAllocator
 from app.interfaces.short_url_interface import ShortURLRepository
-from fastapi_cache.decorator import cache
+from app.use_cases.click_aggregator import ClickAggregator
+from app.use_cases.short_code_allocator import RandomShortCodeAllocator
 
 logger = logging.getLogger(__name__)
 
+# Weight of the newest sample in the moving average of long URL fetch times.
+FETCH_TIME_SMOOTHING = 0.1
+
+_background_refreshes: set[asyncio.Task] = set()
+
+SHORT_CODE_COLLISIONS = registry.counter(
+    "short_code_collisions_total",
+    "Short codes that collided with a stored one and had to be regenerated.",
+    ("operation",),
+)
+_create_collisions = SHORT_CODE_COLLISIONS.labels("create")
+_create_many_collisions = SHORT_CODE_COLLISIONS.labels("create_many")
+
+# Shared by every use case of the worker: redirect reads go before creates.
+repository_limiter = ConcurrencyLimiter(
+    expected_errors=(DuplicateEntityError, NotFoundError)
+)
+registry.callback(
+    "repository_concurrency_limit",
+    "Repository calls allowed in flight by the adaptive limiter.",
+    "gauge",
+    lambda: repository_limiter.limit,
+)
+registry.callback(
+    "repository_calls_in_flight",
+    "Repository calls currently running.",
+    "gauge",
+    lambda: repository_limiter.in_flight,
+)
+registry.callback(
+    "repository_queue_depth",
+    "Repository calls waiting for a slot, by priority.",
+    "gauge",
+    lambda: {
+        (priority.name.lower(),): repository_limiter.queue_depth(priority)
+        for priority in Priority
+    },
+    ("priority",),
+)
+registry.callback(
+    "repository_calls_shed_total",
+    "Repository calls rejected without running, by priority and reason.",
+    "counter",
+    lambda: {
+        (priority.name.lower(), reason): value
+        for (priority, reason), value in repository_limiter.shed.items()
+    },
+    ("priority", "reason"),
+)
+
 
 class ShortURLUseCase:
-    """Use Case for managing Short URLs."""
+    """
+    Use Case for managing Short URLs.
+
+    Repository calls go through the worker's adaptive concurrency limiter, reads ahead
+    of writes, and raise OverloadedError when the limiter sheds them.
+    """
 
     cache_namespace: str = "get_by_short_code"
+    long_url_cache_namespace: str = "resolve_long_url"
 
-    def __init__(self, repo: ShortURLRepository) -> None:
+    _single_flight = SingleFlight()
+    _long_url_fetch_seconds: float = 0.0
+
+    def __init__(
+        self,
+        repo: ShortURLRepository,
+        click_aggregator: ClickAggregator | None = None,
+        code_allocator: ShortCodeAllocator | None = None,
+        click_stats: ClickStatsRepository | None = None,
+    ) -> None:
         """
         Initialize ShortURLUseCase.
 
         :param repo: Repository interface for Short URLs.
         :type repo: ShortURLRepository
+        :param click_aggregator: Write-behind buffer for clicks; without it clicks
+            are written to the repository one by one.
+        :type click_aggregator: ClickAggregator | None
+        :param code_allocator: Source of new short codes, random codes by default.
+        :type code_allocator: ShortCodeAllocator | None
+        :param click_stats: Pre-aggregated click buckets, for click history queries.
+        :type click_stats: ClickStatsRepository | None
         """
         self.repo = repo
+        self.click_aggregator = click_aggregator
+        self.code_allocator = code_allocator or RandomShortCodeAllocator()
+        self.click_stats = click_stats
 
     async def create(self, url_entity: ShortURLEntity) -> ShortURLEntity:
         """
@@ -37,37 +127,268 @@ class ShortURLUseCase:
         """
         for _ in range(Config.RETRY_COUNT_TO_CREATE_UNIQUE_SHORT_CODE):
             try:
-                url_entity.short_code = ShortURLEntity.generate_short_url()
-                new_url = await self.repo.create(ShortURLDTO(**url_entity.model_dump()))
-                return ShortURLEntity(**new_url.model_dump())
+                url_entity.short_code = await self.code_allocator.allocate()
+                new_url = await repository_limiter.run(
+                    Priority.LOW,
+                    self.repo.create,
+                    ShortURLDTO(
+                        long_url=url_entity.long_url,
+                        short_code=url_entity.short_code,
+                        click_count=url_entity.click_count,
+                        expires_at=url_entity.expires_at,
+                    ),
+                )
+                await self._announce_created([new_url.short_code])
+                return ShortURLEntity.from_dto(new_url)
             except DuplicateEntityError:
+                _create_collisions.inc()
                 logger.warning("DuplicateEntityError occurred. Retrying...")
                 continue
         logger.error(
-            f"Failed to create a unique short URL after "
-            f"{Config.RETRY_COUNT_TO_CREATE_UNIQUE_SHORT_CODE} attempts."
+            "Failed to create a unique short URL after %s attempts.",
+            Config.RETRY_COUNT_TO_CREATE_UNIQUE_SHORT_CODE,
         )
         raise DuplicateEntityError(
             "Failed to create a unique short URL after 5 attempts."
         )
 
-    @cache(
-        expire=Config.CACHE_TIME, key_builder=my_key_builder, namespace=cache_namespace
-    )
+    async def create_many(
+        self, url_entities: list[ShortURLEntity]
+    ) -> list[ShortURLEntity | None]:
+        """
+        Create short URLs for many long URLs at once.
+
+        Long URLs are processed in batches of ``BULK_CREATE_BATCH_SIZE``. Only the items
+        whose short code collided get a new code and are inserted again.
+
+        :param url_entities: Entities containing the long URLs to shorten.
+        :type url_entities: list[ShortURLEntity]
+        :return: The created entity for every input item, in input order, or None for
+            items that still had no unique short code after all retries.
+        :rtype: list[ShortURLEntity | None]
+        """
+        created: dict[str, ShortURLEntity] = {}
+        for start in range(0, len(url_entities), Config.BULK_CREATE_BATCH_SIZE):
+            batch = url_entities[start : start + Config.BULK_CREATE_BATCH_SIZE]
+            pending: dict[str, ShortURLDTO] = {}
+            for url_entity in batch:
+                if url_entity.long_url in created or url_entity.long_url in pending:
+                    continue
+                pending[url_entity.long_url] = ShortURLDTO(
+                    long_url=url_entity.long_url,
+                    short_code=await self.code_allocator.allocate(),
+                    click_count=url_entity.click_count,
+                    expires_at=url_entity.expires_at,
+                )
+            conflicts = list(pending.values())
+            for _ in range(Config.RETRY_COUNT_TO_CREATE_UNIQUE_SHORT_CODE):
+                stored, conflicts = await repository_limiter.run(
+                    Priority.LOW, self.repo.create_many, conflicts
+                )
+                await self._announce_created([dto.short_code for dto in stored])
+                for dto in stored:
+                    created[dto.long_url] = ShortURLEntity.from_dto(dto)
+                if not conflicts:
+                    break
+                _create_many_collisions.inc(len(conflicts))
+                logger.warning(
+                    "%s short code conflicts occurred. Retrying...", len(conflicts)
+                )
+                for dto in conflicts:
+                    dto.short_code = await self.code_allocator.allocate()
+            else:
+                logger.error(
+                    "Failed to create unique short URLs for %s long URLs after %s attempts.",
+                    len(conflicts),
+                    Config.RETRY_COUNT_TO_CREATE_UNIQUE_SHORT_CODE,
+                )
+        return [created.get(url_entity.long_url) for url_entity in url_entities]
+
     async def get_by_short_code(self, *, short_code: str) -> ShortURLEntity | None:
         """
         Retrieve a short URL by its short code.
 
+        Codes rejected by the short code filter are answered without any I/O. Cache
+        entries of an expiring short URL expire with it, but its expiry stays cached,
+        so later lookups report it missing without asking the repository.
+        Cached entries leave out the click count, so the returned entity only carries
+        the count it was loaded with; use :meth:`get_click_count` for the live count.
+
         :param short_code: The short code corresponding to the URL.
         :type short_code: str
         :return: The retrieved short URL entity or None if not found.
         :rtype: ShortURLEntity | None
         """
-        dto = await self.repo.get_by_short_code(short_code=short_code)
-        if dto:
-            return ShortURLEntity(**dto.model_dump())
-        logger.info(f"No short URL found for short_code: {short_code}")
-        return None
+        if not short_code_filter.might_exist(short_code):
+            return None
+        url = await self._single_flight.do(
+            (self.cache_namespace, short_code),
+            lambda: self._get_by_short_code(short_code=short_code),
+        )
+        if url is None:
+            short_code_filter.remember_missing(short_code)
+        return url
+
+    async def _get_by_short_code(self, *, short_code: str) -> ShortURLEntity | None:
+        cache = get_short_url_cache()
+        try:
+            cached = await cache.get_entity(short_code)
+        except Exception:
+            logger.warning(
+                "Error reading cached short URL for %s", short_code, exc_info=True
+            )
+            cached = None
+        if cached is not None:
+            return cached
+        if await self._expired(short_code):
+            return None
+        dto = await repository_limiter.run(
+            Priority.HIGH, self.repo.get_by_short_code, short_code=short_code
+        )
+        if not dto:
+            logger.info("No short URL found for short_code: %s", short_code)
+            return None
+        url = ShortURLEntity.from_dto(dto)
+        ttl = cache_ttl(Config.CACHE_TIME, url.expires_at)
+        if ttl <= 0:
+            return url
+        try:
+            await cache.set_entity(url, ttl)
+            if ttl < Config.CACHE_TIME:
+                await cache.set_expiry(short_code, url.expires_at)
+        except Exception:
+            logger.warning("Error caching short URL for %s", short_code, exc_info=True)
+        return url
+
+    async def resolve_long_url(self, *, short_code: str) -> str | None:
+        """
+        Resolve a short code to its long URL as a plain string.
+
+        This is the redirect hot path: it only caches and fetches the long URL, and
+        codes rejected by the short code filter are answered without any I/O.
+        Expired short URLs are never cached past their expiry and resolve to None
+        without a repository read while their expiry stays cached.
+        Concurrent misses for the same code share a single fetch, and hot entries may
+        be refreshed in the background shortly before they expire.
+
+        :param short_code: The short code corresponding to the URL.
+        :type short_code: str
+        :return: The long URL or None if not found.
+        :rtype: str | None
+        """
+        if not short_code_filter.might_exist(short_code):
+            return None
+        long_url = await self._single_flight.do(
+            (self.long_url_cache_namespace, short_code),
+            lambda: self._load_long_url(short_code),
+        )
+        if long_url is None:
+            short_code_filter.remember_missing(short_code)
+        return long_url
+
+    async def _load_long_url(self, short_code: str) -> str | None:
+        try:
+            ttl, long_url = await get_short_url_cache().get_long_url_with_ttl(
+                short_code
+            )
+        except Exception:
+            logger.warning(
+                "Error reading cached long URL for %s", short_code, exc_info=True
+            )
+            ttl, long_url = 0, None
+        if long_url is None:
+            return await self._fetch_long_url(short_code)
+        if self._should_refresh_early(ttl):
+            self._refresh_in_background(short_code)
+        return long_url
+
+    async def _fetch_long_url(self, short_code: str) -> str | None:
+        if await self._expired(short_code):
+            return None
+        started = time.perf_counter()
+        long_url, expires_at = await repository_limiter.run(
+            Priority.HIGH, self.repo.get_long_url_with_expiry, short_code
+        )
+        ShortURLUseCase._long_url_fetch_seconds += FETCH_TIME_SMOOTHING * (
+            time.perf_counter() - started - ShortURLUseCase._long_url_fetch_seconds
+        )
+        ttl = cache_ttl(Config.CACHE_TIME, expires_at)
+        if long_url is not None and ttl > 0:
+            try:
+                cache = get_short_url_cache()
+                await cache.set_long_url(short_code, long_url, ttl)
+                if ttl < Config.CACHE_TIME:
+                    await cache.set_expiry(short_code, expires_at)
+            except Exception:
+                logger.warning(
+                    "Error caching long URL for %s", short_code, exc_info=True
+                )
+        return long_url
+
+    async def _expired(self, short_code: str) -> bool:
+        """
+        Tell whether the cache recorded that a short URL has expired.
+
+        Lets lookups of expired short URLs skip the repository until the record goes.
+
+        :param short_code: The short code to check.
+        :type short_code: str
+        :rtype: bool
+        """
+        try:
+            expires_at = await get_short_url_cache().get_expiry(short_code)
+        except Exception:
+            logger.warning(
+                "Error reading cached expiry for %s", short_code, exc_info=True
+            )
+            return False
+        return expires_at is not None and expires_at.timestamp() <= time.time()
+
+    def _should_refresh_early(self, ttl: int) -> bool:
+        """
+        Decide whether to refresh a cache entry before it expires (XFetch).
+
+        The probability grows as the remaining TTL shrinks relative to the time a fetch
+        takes, so hot entries are usually refreshed by one request before they expire.
+
+        :param ttl: Remaining time to live of the entry, in seconds.
+        :type ttl: int
+        :rtype: bool
+        """
+        beta = Config.CACHE_EARLY_REFRESH_BETA
+        if beta <= 0 or ttl <= 0:
+            return False
+        delta = self._long_url_fetch_seconds
+        return -delta * beta * math.log(1.0 - random.random()) >= ttl
+
+    def _refresh_in_background(self, short_code: str) -> None:
+        async def refresh() -> None:
+            try:
+                await self._single_flight.do(
+                    ("refresh", self.long_url_cache_namespace, short_code),
+                    lambda: self._fetch_long_url(short_code),
+                )
+            except Exception as e:
+                logger.warning("Early refresh of %s failed: %s", short_code, e)
+
+        task = asyncio.create_task(refresh())
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+
+    async def _announce_created(self, short_codes: list[str]) -> None:
+        """
+        Make newly created short codes visible to the lookups of every worker.
+
+        Codes of expired short URLs may be issued again, so their expiries are dropped.
+
+        :param short_codes: The created short codes.
+        :type short_codes: list[str]
+        """
+        try:
+            await get_short_url_cache().forget_expiries(short_codes)
+        except Exception:
+            logger.warning("Error dropping cached expiries", exc_info=True)
+        await announce_short_codes(short_codes)
 
     async def update_click_count(self, short_code: str) -> None:
         """
@@ -76,5 +397,103 @@ class ShortURLUseCase:
         :param short_code: The short code of the URL whose click count needs to be updated.
         :type short_code: str
         """
-        logger.info(f"Updating click count for short_code: {short_code}")
-        await self.repo.update_click_count(short_code)
+        logger.info("Updating click count for short_code: %s", short_code)
+        if self.click_aggregator:
+            self.click_aggregator.add(short_code)
+        else:
+            await repository_limiter.run(
+                Priority.LOW, self.repo.update_click_count, short_code
+            )
+
+    async def get_click_count(self, short_code: str) -> int | None:
+        """
+        Retrieve the current click count of a short URL.
+
+        Reads the persisted count and adds the clicks this worker has not flushed yet.
+
+        :param short_code: The short code of the URL.
+        :type short_code: str
+        :return: The click count or None if the short URL does not exist.
+        :rtype: int | None
+        """
+        if not short_code_filter.might_exist(short_code):
+            return None
+        count = await repository_limiter.run(
+            Priority.HIGH, self.repo.get_click_count, short_code
+        )
+        if count is not None and self.click_aggregator:
+            count += self.click_aggregator.pending(short_code)
+        return count
+
+    async def get_click_history(
+        self, short_code: str, granularity: str, start: datetime, end: datetime
+    ) -> list[tuple[datetime, int]] | None:
+        """
+        Retrieve the clicks of a short URL per time bucket.
+
+        Answered from pre-aggregated buckets only, so the cost depends on the number of
+        buckets in the range and not on the traffic of the link. Clicks not flushed yet
+        by the click aggregators are not included.
+
+        :param short_code: The short code of the URL.
+        :type short_code: str
+        :param granularity: ``minute``, ``hour`` or ``day``.
+        :type granularity: str
+        :param start: Start of the range.
+        :type start: datetime
+        :param end: End of the range, exclusive.
+        :type end: datetime
+        :return: Every bucket start in the range with its clicks, zero included, or None
+            if the short URL does not exist.
+        :rtype: list[tuple[datetime, int]] | None
+        """
+        if not short_code_filter.might_exist(short_code):
+            return None
+        count = await repository_limiter.run(
+            Priority.HIGH, self.repo.get_click_count, short_code
+        )
+        if count is None:
+            return None
+        buckets = await self.click_stats.get_buckets(
+            short_code, granularity, start, end
+        )
+        return [
+            (bucket, buckets.get(bucket, 0))
+            for bucket in bucket_starts(start, end, granularity)
+        ]
+
+    async def iter_short_url_rows(
+        self, *, after: str | None = None, limit: int | None = None
+    ) -> AsyncIterator[tuple[str, str, str, int]]:
+        """
+        Stream the short URLs in ID order, with their click counts.
+
+        The ID of the last row is the cursor: passing it as ``after`` resumes the
+        listing right after that row. Clicks not flushed yet by the click aggregators
+        are not included.
+
+        :param after: Only stream short URLs whose ID sorts after this one.
+        :type after: str | None
+        :param limit: Largest number of rows streamed, or None for all of them.
+        :type limit: int | None
+        :return: Async iterator over ``(id, short_code, long_url, click_count)``.
+        :rtype: AsyncIterator[tuple[str, str, str, int]]
+        """
+        rows = self.repo.iter_short_url_rows(after, Config.EXPORT_BATCH_SIZE)
+        streamed = 0
+        try:
+            async for row in rows:
+                yield row
+                streamed += 1
+                if streamed == limit:
+                    break
+        finally:
+            await rows.aclose()
+
+
+registry.callback(
+    "single_flight_calls_in_flight",
+    "Cache misses currently being fetched, shared by all concurrent requests.",
+    "gauge",
+    lambda: len(ShortURLUseCase._single_flight),
+)
@@ -0,0 +1,128 @@
+"""
+Compare the generic FastAPI cache layout with the purpose-built short URL cache.
+
+Measures per-entry CPU cost of building the key and encoding/decoding the value, the
+key and value bytes per entry, and, with ``--redis``, the Redis memory actually
+used per million entries (``INFO memory`` before and after writing a sample)::
+
+    cd src && python -m benchmarks.cache_encoding
+    cd src && python -m benchmarks.cache_encoding --redis --entries 100000
+"""
+import argparse
+import asyncio
+import time
+
+from app.adapters.cache.short_url_cache import (
+    ENTITY_KEY_TAG,
+    LONG_URL_KEY_TAG,
+    decode_entity,
+    encode_entity,
+)
+from app.core.config import Config
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import JsonCoder
+from fastapi_cache.key_builder import default_key_builder
+from redis import asyncio as aioredis
+
+SAMPLE_LONG_URL = (
+    "https://www.example.com/articles/2023/10/some-long-article-slug?ref=home"
+)
+
+
+async def _get_by_short_code(*, short_code: str):
+    """Stand-in for the cached use case method, used only to build generic keys."""
+
+
+def generic_entry(entity: ShortURLEntity) -> tuple[str, str]:
+    key = default_key_builder(
+        _get_by_short_code,
+        f"{FastAPICache.get_prefix()}:get_by_short_code",
+        kwargs={"short_code": entity.short_code},
+    )
+    return key, JsonCoder.encode(entity)
+
+
+def compact_entry(entity: ShortURLEntity) -> tuple[str, str]:
+    key = f"{Config.CACHE_KEY_PREFIX}:{ENTITY_KEY_TAG}:{entity.short_code}"
+    return key, encode_entity(entity)
+
+
+def raw_long_url_entry(entity: ShortURLEntity) -> tuple[str, str]:
+    key = f"{Config.CACHE_KEY_PREFIX}:{LONG_URL_KEY_TAG}:{entity.short_code}"
+    return key, entity.long_url
+
+
+LAYOUTS = {
+    "generic (md5 key + JsonCoder)": (
+        generic_entry,
+        lambda code, value: ShortURLEntity(**JsonCoder.decode(value)),
+    ),
+    "compact entity": (compact_entry, decode_entity),
+    "raw long URL": (raw_long_url_entry, lambda code, value: value),
+}
+
+
+def entities(count: int) -> list[ShortURLEntity]:
+    return [
+        ShortURLEntity(
+            long_url=f"{SAMPLE_LONG_URL}&id={i}",
+            short_code=f"{i:07d}",
+            click_count=i % 1000,
+        )
+        for i in range(count)
+    ]
+
+
+def time_per_entry(call, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        call(item)
+    return (time.perf_counter() - started) / len(items)
+
+
+async def redis_bytes_per_million(build, sample: list[ShortURLEntity]) -> float:
+    redis = aioredis.from_url(
+        Config.REDIS_CACHE_URL, encoding="utf8", decode_responses=True
+    )
+    entries = [build(entity) for entity in sample]
+    before = (await redis.info("memory"))["used_memory"]
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, value in entries:
+            pipe.set(key, value, ex=Config.CACHE_TIME)
+        await pipe.execute()
+    after = (await redis.info("memory"))["used_memory"]
+    for start in range(0, len(entries), 10_000):
+        await redis.delete(*(key for key, _ in entries[start : start + 10_000]))
+    await redis.close()
+    return (after - before) / len(sample) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument(
+        "--redis", action="store_true", help="Measure memory in Redis too."
+    )
+    args = parser.parse_args()
+
+    FastAPICache.init(None, prefix="fastapi-cache")
+    sample = entities(args.entries)
+    print(f"{'layout':<32}{'encode':>10}{'decode':>10}{'bytes/entry':>13}")
+    for name, (build, decode) in LAYOUTS.items():
+        encoded = [build(entity) for entity in sample]
+        encode_ns = time_per_entry(build, sample) * 1e9
+        values = [
+            (entity.short_code, value) for entity, (_, value) in zip(sample, encoded)
+        ]
+        decode_ns = time_per_entry(lambda pair: decode(*pair), values) * 1e9
+        size = sum(len(key) + len(value) for key, value in encoded) / len(encoded)
+        line = f"{name:<32}{encode_ns:>8.0f}ns{decode_ns:>8.0f}ns{size:>13.1f}"
+        if args.redis:
+            used = asyncio.run(redis_bytes_per_million(build, sample)) / 1e6
+            line += f"  redis: {used:.1f} MB/1M"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
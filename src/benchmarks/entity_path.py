@@ -0,0 +1,114 @@
+"""
+Compare the per-request cost of the old and the lean short URL entity paths.
+
+Each path turns a MongoDB document into the JSON body of ``GET get_long_url`` (and a
+click count into the body of ``GET count``). The old path validates a DTO, dumps it to
+a dict, validates a Pydantic entity, and lets FastAPI validate and serialize it against
+the response model. The lean path maps the document straight to a DTO, builds a
+slotted entity and renders it with orjson. Prints CPU time and peak allocated bytes per
+request::
+
+    cd src && python -m benchmarks.entity_path --requests 100000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from app.frameworks_and_drivers.api_models import ClickCountResponse, ShortURLResponse
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+
+DOCUMENT = {
+    "_id": ObjectId(),
+    "long_url": "https://www.example.com/articles/2023/10/some-long-article-slug",
+    "short_code": "aZ3kQ",
+    "click_count": 42,
+}
+
+SHORT_URL_FIELD = create_response_field("response", ShortURLResponse)
+CLICK_COUNT_FIELD = create_response_field("response", ClickCountResponse)
+
+
+class PydanticShortURLEntity(BaseModel):
+    """The entity as it was before: a validated Pydantic model."""
+
+    long_url: str
+    short_code: str | None = None
+    click_count: int = 0
+
+
+async def old_lookup() -> bytes:
+    dto = ShortURLDTO(**DOCUMENT)
+    entity = PydanticShortURLEntity(**dto.model_dump())
+    content = await serialize_response(field=SHORT_URL_FIELD, response_content=entity)
+    return JSONResponse(content).body
+
+
+async def lean_lookup() -> bytes:
+    entity = ShortURLEntity.from_dto(ShortURLDTO.from_document(DOCUMENT))
+    return ORJSONResponse(entity.to_response()).body
+
+
+async def old_count() -> bytes:
+    content = await serialize_response(
+        field=CLICK_COUNT_FIELD,
+        response_content=ClickCountResponse(click_count=DOCUMENT["click_count"]),
+    )
+    return JSONResponse(content).body
+
+
+async def lean_count() -> bytes:
+    return ORJSONResponse({"click_count": DOCUMENT["click_count"]}).body
+
+
+PATHS = {
+    "get_long_url old": old_lookup,
+    "get_long_url lean": lean_lookup,
+    "count old": old_count,
+    "count lean": lean_count,
+}
+
+
+async def cpu_per_request(path, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await path()
+    return (time.perf_counter() - started) / requests
+
+
+async def peak_bytes_per_request(path, samples: int = 1_000) -> float:
+    await path()
+    tracemalloc.start()
+    total = 0
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await path()
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total / samples
+
+
+async def run(requests: int) -> None:
+    print(f"{'path':<22}{'cpu/request':>14}{'peak bytes/request':>21}")
+    for name, path in PATHS.items():
+        cpu_us = await cpu_per_request(path, requests) * 1e6
+        peak = await peak_bytes_per_request(path)
+        print(f"{name:<22}{cpu_us:>12.2f}µs{peak:>21.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+End-to-end load benchmark driving the ASGI app in-process.
+
+Runs a traffic mix against ``app.frameworks_and_drivers.asgi`` with Zipfian key
+popularity and reports throughput and p50/p95/p99 latency per endpoint. Results are
+also written as JSON so runs can be compared over time.
+
+Against the MongoDB/Redis configured in ``Config``::
+
+    cd src && python -m benchmarks.load --mix redirect-heavy
+
+Against the in-memory repository and fakeredis (needs the ``bench`` dependency group),
+which isolates the cost of the application layer::
+
+    cd src && python -m benchmarks.load --mix redirect-heavy --backend memory
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+
+MIXES = {
+    "redirect-heavy": {
+        "redirect": 0.90,
+        "count": 0.05,
+        "create": 0.04,
+        "get_long_url": 0.01,
+    },
+    "create-burst": {"create": 0.80, "redirect": 0.20},
+    "count-polling": {"count": 0.80, "redirect": 0.20},
+}
+
+API_PREFIX = "/api/short_url"
+
+
+def use_in_memory_backends() -> None:
+    """Use the in-memory repository and an in-process Redis stand-in."""
+    import fakeredis
+    from app.adapters.cache import redis_cache
+    from app.core.config import Config
+
+    Config.SHORT_URL_REPOSITORY = "memory"
+    redis_cache.aioredis.from_url = fakeredis.aioredis.FakeRedis.from_url
+
+
+class ZipfSampler:
+    """Draw indexes of ``[0, n)`` with probability proportional to ``1 / (rank + 1) ** s``."""
+
+    def __init__(self, n: int, s: float, seed: int) -> None:
+        self._cumulative = list(
+            itertools.accumulate(1 / (rank + 1) ** s for rank in range(n))
+        )
+        self._random = random.Random(seed)
+
+    def sample(self) -> int:
+        point = self._random.random() * self._cumulative[-1]
+        return bisect.bisect_left(self._cumulative, point)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(
+    latencies: dict[str, list[float]], errors: dict[str, int], elapsed: float
+):
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "total_requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+async def seed(
+    client: httpx.AsyncClient, count: int, batch_size: int = 1_000
+) -> list[str]:
+    """Create ``count`` links through the bulk endpoint and return their short codes."""
+    codes = []
+    for start in range(0, count, batch_size):
+        response = await client.post(
+            f"{API_PREFIX}/generate_short_urls/",
+            json={
+                "long_urls": [
+                    f"https://example.com/seed/{i}"
+                    for i in range(start, min(count, start + batch_size))
+                ]
+            },
+        )
+        response.raise_for_status()
+        codes.extend(item["short_code"] for item in response.json()["items"])
+    return codes
+
+
+async def run(args) -> dict:
+    if args.backend == "memory":
+        use_in_memory_backends()
+    from app.frameworks_and_drivers.asgi import app, shutdown_event, startup_event
+
+    logging.getLogger().setLevel(args.log_level)
+    await startup_event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        codes = await seed(client, args.keys)
+        sampler = ZipfSampler(len(codes), args.zipf, args.seed)
+        mix = MIXES[args.mix]
+        operations = list(mix)
+        weights = list(itertools.accumulate(mix.values()))
+        op_random = random.Random(args.seed + 1)
+        created = itertools.count()
+        latencies: dict[str, list[float]] = {name: [] for name in operations}
+        errors: dict[str, int] = {}
+        remaining = args.requests
+
+        def request_for(operation: str):
+            if operation == "create":
+                return (
+                    "POST",
+                    f"{API_PREFIX}/generate_short_url/",
+                    {
+                        "long_url": f"https://example.com/new/{args.seed}/{next(created)}"
+                    },
+                )
+            code = codes[sampler.sample()]
+            if operation == "redirect":
+                return "GET", f"{API_PREFIX}/{code}", None
+            if operation == "count":
+                return "GET", f"{API_PREFIX}/count/{code}", None
+            return "GET", f"{API_PREFIX}/get_long_url/{code}", None
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                operation = operations[
+                    bisect.bisect_left(weights, op_random.random() * weights[-1])
+                ]
+                method, url, body = request_for(operation)
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies[operation].append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors[operation] = errors.get(operation, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    await shutdown_event()
+    return summarize(latencies, errors, elapsed)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="redirect-heavy")
+    parser.add_argument("--backend", choices=["local", "memory"], default="local")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--keys", type=int, default=10_000, help="Links seeded before the run."
+    )
+    parser.add_argument(
+        "--zipf", type=float, default=1.1, help="Zipf exponent of popularity."
+    )
+    parser.add_argument("--seed", type=int, default=int(time.time()))
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output-dir", type=Path, default=Path("bench_results"))
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    result = {
+        "benchmark": "load",
+        "timestamp": datetime.now(UTC).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {key: str(value) for key, value in vars(args).items()},
+        **summary,
+    }
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output = args.output_dir / f"load-{args.mix}-{args.backend}-{int(time.time())}.json"
+    output.write_text(json.dumps(result, indent=2))
+
+    print(f"{args.mix} on {args.backend}: {summary['throughput_rps']} req/s overall")
+    print(
+        f"{'endpoint':<14}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+    )
+    for name, stats in summary["endpoints"].items():
+        print(
+            f"{name:<14}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10}"
+            f"{stats['p50_ms']:>9}ms{stats['p95_ms']:>8}ms{stats['p99_ms']:>8}ms"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
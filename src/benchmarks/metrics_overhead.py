@@ -0,0 +1,75 @@
+"""
+Measure the per-request cost of the metrics subsystem.
+
+Times a trivial ASGI app called directly and through ``MetricsMiddleware``, the
+primitive metric updates used on hot paths, and rendering the registry::
+
+    cd src && python -m benchmarks.metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.adapters.api.metrics_middleware import MetricsMiddleware
+from app.core.metrics import MetricsRegistry
+
+
+class _Route:
+    path = "/api/short_url/{short_code}"
+
+
+async def _endpoint(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 302, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def time_app(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/api/short_url/abc"}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests
+
+
+def time_call(call, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(time_app(_endpoint, args.requests))
+    wrapped = asyncio.run(time_app(MetricsMiddleware(_endpoint), args.requests))
+    print(f"bare ASGI call:        {bare * 1e9:8.0f} ns/request")
+    print(f"with MetricsMiddleware: {wrapped * 1e9:7.0f} ns/request")
+    print(f"middleware overhead:   {(wrapped - bare) * 1e9:8.0f} ns/request")
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Bench.", ("result",))
+    histogram = registry.histogram("bench_seconds", "Bench.", ("operation",))
+    child = histogram.labels("get")
+    inc = time_call(lambda: counter.labels("hit").inc(), args.requests)
+    observe = time_call(lambda: child.observe(0.003), args.requests)
+    print(f"counter.labels().inc(): {inc * 1e9:7.0f} ns")
+    print(f"histogram child observe:{observe * 1e9:7.0f} ns")
+    for i in range(200):
+        histogram.labels(f"op{i}").observe(0.01)
+    print(f"render 200 histograms:  {time_call(registry.render, 100) * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Count MongoDB connections opened while serving a batch of requests.
+
+Compares the legacy per-request client (a new ``AsyncIOMotorClient`` plus a
+``create_index`` call for every request) with the lifespan-managed pool.
+
+Requires a reachable MongoDB at ``Config.MONGODB_DB_URL``::
+
+    cd src && python -m benchmarks.mongo_connections --requests 10000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from app.adapters.db.mongo_db import (
+    SHORT_URL_COLLECTION_NAME,
+    close_mongo_client,
+    get_short_link_collection,
+    short_url_db,
+)
+from app.core.config import Config
+from app.frameworks_and_drivers.asgi import app, shutdown_event, startup_event
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+
+class ConnectionCounter(monitoring.ConnectionPoolListener):
+    """Pool listener counting every connection pymongo opens."""
+
+    def __init__(self):
+        self.created = 0
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+async def legacy_short_link_collection():
+    """Reproduce the old dependency chain: new client and index build per request."""
+    client = AsyncIOMotorClient(Config.MONGODB_DB_URL)
+    collection = client[Config.LINK_MINIMIZER_DB_NAME][SHORT_URL_COLLECTION_NAME]
+    await collection.create_index("short_code", unique=True)
+    return collection
+
+
+async def run(mode: str, requests: int, concurrency: int) -> dict:
+    counter = ConnectionCounter()
+    monitoring.register(counter)
+    if mode == "legacy":
+        app.dependency_overrides[
+            get_short_link_collection
+        ] = legacy_short_link_collection
+    else:
+        app.dependency_overrides.pop(get_short_link_collection, None)
+
+    await startup_event()
+    collection = short_url_db()[SHORT_URL_COLLECTION_NAME]
+    await collection.delete_many({"short_code": "bench"})
+    await collection.insert_one(
+        {"long_url": "https://example.com", "short_code": "bench"}
+    )
+    counter.created = 0
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.get("/api/short_url/count/bench")
+                response.raise_for_status()
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    await collection.delete_many({"short_code": "bench"})
+    await shutdown_event()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "connections_opened": counter.created,
+        "connections_per_10k": counter.created * 10_000 / requests,
+        "seconds": round(elapsed, 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Responses must reach Mongo on every request, so keep the HTTP cache out of the way.
+    FastAPICache.init(InMemoryBackend(), prefix="bench", enable=False)
+    for mode in ("legacy", "pooled"):
+        print(await run(mode, args.requests, args.concurrency))
+        close_mongo_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Measure short URL cache throughput as Redis nodes are added to the hash ring.
+
+For 1, 2, ... N of the given nodes, fills the cache with ``--keys`` long URLs, then
+several client processes read random batches of them with a single MGET for
+``--seconds`` and the total keys read per second is printed, along with the share of
+keys that changed node when the last node joined the ring.
+
+Start a few local Redis processes first, for example::
+
+    for port in 6380 6381 6382 6383; do redis-server --port $port --save '' & done
+    cd src && python -m benchmarks.sharded_cache --nodes \\
+        redis://localhost:6380,redis://localhost:6381,redis://localhost:6382,redis://localhost:6383
+"""
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.adapters.cache.redis_ring import HashRing, ShardedRedis
+from app.adapters.cache.short_url_cache import ShortURLCache
+
+PREFIX = "shardbench"
+
+
+def make_cache(urls: list[str]) -> ShortURLCache:
+    return ShortURLCache(
+        ShardedRedis.from_urls(urls), LocalTTLCache(max_size=1, ttl=1), PREFIX
+    )
+
+
+def codes(keys: int) -> list[str]:
+    return [f"{i:x}" for i in range(keys)]
+
+
+async def fill(urls: list[str], keys: int) -> None:
+    cache = make_cache(urls)
+    all_codes = codes(keys)
+    for start in range(0, keys, 1_000):
+        async with cache.redis.pipeline(transaction=False) as pipe:
+            for code in all_codes[start:][:1_000]:
+                pipe.set(
+                    cache.long_url_key(code), f"https://example.com/{code}", ex=600
+                )
+            await pipe.execute()
+    await cache.redis.close()
+
+
+async def drain(urls: list[str], keys: int) -> None:
+    cache = make_cache(urls)
+    all_codes = codes(keys)
+    for start in range(0, keys, 1_000):
+        await cache.redis.delete(
+            *(cache.long_url_key(code) for code in all_codes[start:][:1_000])
+        )
+    await cache.redis.close()
+
+
+async def read(
+    urls: list[str], keys: int, seconds: float, concurrency: int, batch: int
+) -> int:
+    cache = make_cache(urls)
+    all_codes = codes(keys)
+    deadline = time.perf_counter() + seconds
+    read_keys = 0
+
+    async def client():
+        nonlocal read_keys
+        while time.perf_counter() < deadline:
+            values = await cache.redis.mget(
+                [cache.long_url_key(code) for code in random.sample(all_codes, batch)]
+            )
+            read_keys += sum(value is not None for value in values)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    await cache.redis.close()
+    return read_keys
+
+
+def read_process(
+    urls: list[str], keys: int, seconds: float, concurrency: int, batch: int
+) -> int:
+    return asyncio.run(read(urls, keys, seconds, concurrency, batch))
+
+
+def moved_share(previous: list[str], current: list[str], keys: list[str]) -> float:
+    if not previous:
+        return 0.0
+    before, after = HashRing(previous), HashRing(current)
+    moved = sum(before.node_for(key) != after.node_for(key) for key in keys)
+    return moved / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", required=True, help="Comma-separated Redis URLs.")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=20)
+    args = parser.parse_args()
+
+    nodes = args.nodes.split(",")
+    sample = [f"{PREFIX}:u:{code}" for code in codes(args.keys)]
+    for count in range(1, len(nodes) + 1):
+        urls = nodes[:count]
+        asyncio.run(fill(urls, args.keys))
+        try:
+            with ProcessPoolExecutor(args.processes) as pool:
+                futures = [
+                    pool.submit(
+                        read_process,
+                        urls,
+                        args.keys,
+                        args.seconds,
+                        args.concurrency,
+                        args.batch,
+                    )
+                    for _ in range(args.processes)
+                ]
+                read_keys = sum(future.result() for future in futures)
+        finally:
+            asyncio.run(drain(urls, args.keys))
+        print(
+            {
+                "nodes": count,
+                "keys_per_second": round(read_keys / args.seconds),
+                "moved_share": round(moved_share(nodes[: count - 1], urls, sample), 3),
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
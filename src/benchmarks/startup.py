@@ -0,0 +1,95 @@
+"""
+Measure how long a worker takes to import the app, start up and become ready.
+
+Import time is the median over fresh interpreters, per storage backend. Startup runs
+the lifespan startup in process, then polls ``/ready`` and times the first requests::
+
+    cd src && python -m benchmarks.startup --runs 5
+    cd src && python -m benchmarks.startup --backend memory
+
+With ``--backend memory`` the startup part uses the in-memory repository and
+fakeredis (needs the ``bench`` dependency group); import times are always measured
+for both backends.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.load import use_in_memory_backends
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "import app.frameworks_and_drivers.asgi; "
+    "print(time.perf_counter() - started, file=__import__('sys').stderr)"
+)
+
+
+def import_seconds(backend: str, runs: int) -> list[float]:
+    env = {**os.environ, "SHORT_URL_REPOSITORY": backend}
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stderr.strip().splitlines()[-1]))
+    return timings
+
+
+async def startup_timings(ready_timeout: float) -> dict[str, float]:
+    from app.frameworks_and_drivers.asgi import app, shutdown_event, startup_event
+
+    timings = {}
+    started = time.perf_counter()
+    await startup_event()
+    timings["lifespan startup"] = time.perf_counter() - started
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        while (await client.get("/ready")).status_code != 200:
+            if time.perf_counter() - started > ready_timeout:
+                raise TimeoutError("The worker did not become ready.")
+            await asyncio.sleep(0.01)
+        timings["ready"] = time.perf_counter() - started
+        created = await client.post(
+            "/api/short_url/generate_short_url/",
+            json={"long_url": f"https://example.com/startup/{time.time_ns()}"},
+        )
+        path = f"/api/short_url/{created.json()['short_code']}"
+        for label in ("first redirect", "second redirect"):
+            request_started = time.perf_counter()
+            await client.get(path)
+            timings[label] = time.perf_counter() - request_started
+    await shutdown_event()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", choices=["local", "memory"], default="local")
+    parser.add_argument("--ready-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    for backend in ("mongo", "memory"):
+        timings = import_seconds(backend, args.runs)
+        print(
+            f"import ({backend} backend): median {statistics.median(timings) * 1e3:.0f} ms,"
+            f" min {min(timings) * 1e3:.0f} ms over {args.runs} runs"
+        )
+
+    if args.backend == "memory":
+        use_in_memory_backends()
+    for label, seconds in asyncio.run(startup_timings(args.ready_timeout)).items():
+        print(f"{label}: {seconds * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure bulk import and export throughput of the transfer tool.
+
+Writes ``--rows`` synthetic short URLs to a JSONL file, imports them into a scratch
+database, exports them back and prints rows per second for both directions.
+
+Requires a reachable MongoDB at ``Config.MONGODB_DB_URL``::
+
+    cd src && python -m benchmarks.transfer --rows 1000000 --concurrency 8
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+
+import orjson
+from app.adapters.db.mongo_db import (
+    close_mongo_client,
+    init_short_link_collection,
+    mongo_client,
+    short_url_db,
+)
+from app.adapters.db.mongo_db.short_url_repository import MotorMongoShortURLRepository
+from app.adapters.db.mongo_db.transfer import (
+    Progress,
+    export_short_urls,
+    import_short_urls,
+    read_rows,
+)
+
+SCRATCH_DB_NAME = "link_minimizer_transfer_bench"
+
+
+def write_input(path: str, rows: int) -> None:
+    with open(path, "w", buffering=1 << 20) as stream:
+        for i in range(rows):
+            stream.write(
+                orjson.dumps(
+                    {
+                        "short_code": f"b{i:x}",
+                        "long_url": f"https://example.com/bench/{i}",
+                        "click_count": i % 1_000,
+                    }
+                ).decode()
+            )
+            stream.write("\n")
+
+
+async def run(args: argparse.Namespace, path: str) -> None:
+    db = short_url_db(db_name=SCRATCH_DB_NAME)
+    await mongo_client().drop_database(SCRATCH_DB_NAME)
+    repo = MotorMongoShortURLRepository(await init_short_link_collection(db=db))
+    try:
+        progress = Progress("import")
+        with open(path) as stream:
+            await import_short_urls(
+                repo,
+                read_rows(stream, "jsonl"),
+                args.import_batch_size,
+                args.concurrency,
+                progress,
+            )
+        progress.finish()
+
+        progress = Progress("export")
+        await export_short_urls(
+            repo, io.StringIO(), "jsonl", args.export_batch_size, progress
+        )
+        progress.finish()
+    finally:
+        await mongo_client().drop_database(SCRATCH_DB_NAME)
+        close_mongo_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--import-batch-size", type=int, default=5_000)
+    parser.add_argument("--export-batch-size", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    try:
+        write_input(path, args.rows)
+        asyncio.run(run(args, path))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
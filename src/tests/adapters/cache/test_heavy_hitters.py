@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+from app.adapters.cache.heavy_hitters import HeavyHitters
+from app.adapters.cache.space_saving import SpaceSaving
+from fastapi_cache import FastAPICache
+
+
+def test_space_saving_counts_exactly_below_capacity():
+    """Test that counts are exact and ranked while every item has a counter."""
+    summary = SpaceSaving(capacity=3)
+    for item in ["a", "b", "a", "c", "a", "b"]:
+        summary.add(item)
+
+    assert summary.top(2) == [("a", 3, 0), ("b", 2, 0)]
+    assert summary.count("c") == 1
+    assert summary.total == 6
+
+
+def test_space_saving_bounds_counts_after_evictions():
+    """
+    Test that memory stays at capacity, that evicted counts become error bounds
+    and that a frequent item is always kept with its true count in range.
+    """
+    summary = SpaceSaving(capacity=4)
+    true_counts: dict[str, int] = {}
+    for i in range(1_000):
+        item = "hot" if i % 3 == 0 else f"cold{i}"
+        summary.add(item)
+        true_counts[item] = true_counts.get(item, 0) + 1
+
+    assert len(summary) == 4
+    assert summary.total == 1_000
+    (item, count, error), *rest = summary.top(4)
+    assert item == "hot"
+    assert count - error <= true_counts["hot"] <= count
+    for item, count, error in rest:
+        assert count - error <= true_counts[item] <= count
+
+
+@pytest.mark.asyncio
+async def test_heavy_hitters_merge_across_workers():
+    """Test that the summaries published by several workers are summed in Redis."""
+    prefix = f"test-hh:{uuid.uuid4().hex}"
+    redis = FastAPICache.get_backend().redis
+    first = HeavyHitters(redis, capacity=10, window=600, prefix=prefix)
+    second = HeavyHitters(redis, capacity=10, window=600, prefix=prefix)
+
+    assert await first.top(5) == (0, [])
+    for code in ["aaa", "aaa", "bbb"]:
+        first.add(code)
+    for code in ["bbb", "bbb", "ccc"]:
+        second.add(code)
+    await first.publish()
+    await second.publish()
+
+    summaries, top = await first.top(2)
+    assert summaries == 2
+    assert top == [("bbb", 3, 0), ("aaa", 2, 0)]
+
+
+@pytest.mark.asyncio
+async def test_heavy_hitters_merge_bounds_codes_evicted_by_a_worker():
+    """
+    Test that a code missing from a full summary is counted at that summary's
+    floor, so the merged bounds still hold its true clicks.
+    """
+    prefix = f"test-hh:{uuid.uuid4().hex}"
+    redis = FastAPICache.get_backend().redis
+    first = HeavyHitters(redis, capacity=2, window=600, prefix=prefix)
+    second = HeavyHitters(redis, capacity=2, window=600, prefix=prefix)
+    clicks = {"first": ["aaa", "aaa", "bbb", "ccc"], "second": ["bbb"] * 3}
+    for code in clicks["first"]:
+        first.add(code)
+    for code in clicks["second"]:
+        second.add(code)
+    await first.publish()
+    await second.publish()
+
+    assert first.summary.floor() == 2
+    assert second.summary.floor() == 0
+    _, top = await second.top(3)
+    assert top[0] == ("bbb", 5, 2)
+    for code, count, error in top:
+        true_count = sum(codes.count(code) for codes in clicks.values())
+        assert count - error <= true_count <= count
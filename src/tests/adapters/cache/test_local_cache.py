@@ -0,0 +1,57 @@
+import time
+from unittest.mock import patch
+
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.adapters.cache.redis_cache import apply_invalidation, local_cache
+
+
+def test_get_and_set():
+    """
+    Test that stored values are returned and counted as hits,
+    while unknown keys are counted as misses.
+    """
+    cache = LocalTTLCache(max_size=10, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.get("unknown") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the cache stays bounded and evicts the least recently used entry."""
+    cache = LocalTTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_entry_expires_after_ttl():
+    """Test that entries expire after the shorter of the given and default TTL."""
+    cache = LocalTTLCache(max_size=10, ttl=60)
+    cache.set("key", "value", ttl=1)
+    with patch.object(time, "monotonic", return_value=time.monotonic() + 2):
+        assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_apply_invalidation():
+    """Test that invalidation messages drop single keys and whole namespaces."""
+    local_cache.set("fastapi-cache:ns:1", "one")
+    local_cache.set("fastapi-cache:ns:2", "two")
+    local_cache.set("fastapi-cache:other:3", "three")
+
+    apply_invalidation("key:fastapi-cache:ns:1")
+    assert local_cache.get("fastapi-cache:ns:1") is None
+    assert local_cache.get("fastapi-cache:ns:2") == "two"
+
+    apply_invalidation("ns:fastapi-cache:ns")
+    assert local_cache.get("fastapi-cache:ns:2") is None
+    assert local_cache.get("fastapi-cache:other:3") == "three"
+    local_cache.clear()
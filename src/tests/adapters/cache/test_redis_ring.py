@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+from app.adapters.cache.local_cache import LocalTTLCache
+from app.adapters.cache.redis_ring import HashRing, ShardedRedis
+from app.adapters.cache.short_url_cache import ShortURLCache
+from app.entities.short_url.short_url_entity import ShortURLEntity
+
+KEYS = [f"lm:u:{i:x}" for i in range(20_000)]
+
+
+def test_ring_spreads_keys_evenly():
+    """Test that every node owns close to its fair share of the keys."""
+    ring = HashRing(["a", "b", "c", "d"])
+    owners = Counter(ring.node_for(key) for key in KEYS)
+
+    assert set(owners) == {"a", "b", "c", "d"}
+    for owned in owners.values():
+        assert abs(owned - len(KEYS) / 4) < len(KEYS) / 4 * 0.3
+
+
+def test_ring_moves_only_keys_of_the_changed_node():
+    """
+    Test that adding a node only moves keys onto it, about a fair share of
+    them, and that removing a node only moves the keys it owned.
+    """
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in KEYS}
+
+    ring.add("d")
+    after = {key: ring.node_for(key) for key in KEYS}
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert 0.15 < len(moved) / len(KEYS) < 0.35
+
+    ring.remove("b")
+    for key in KEYS:
+        if after[key] != "b":
+            assert ring.node_for(key) == after[key]
+        else:
+            assert ring.node_for(key) in {"a", "c", "d"}
+
+
+@pytest.mark.asyncio
+async def test_short_url_cache_over_sharded_redis():
+    """
+    Test that the short URL cache works unchanged over several Redis nodes and
+    that each key is stored on the node the ring assigns it to.
+    """
+    # Separate databases stand in for separate Redis processes.
+    sharded = ShardedRedis.from_urls(
+        [f"redis://localhost/{db}" for db in (1, 2, 3)], replicas=64
+    )
+    cache = ShortURLCache(sharded, LocalTTLCache(max_size=100, ttl=60), "ringtest")
+    long_urls = {f"ring{i}": f"https://example.com/ring/{i}" for i in range(50)}
+    entity = ShortURLEntity(long_url="https://example.com/e", short_code="ringE")
+
+    for short_code, long_url in long_urls.items():
+        await cache.set_long_url(short_code, long_url, 60)
+    await cache.set_entity(entity, 60)
+    cache.local.clear()
+
+    for short_code, long_url in long_urls.items():
+        assert (await cache.get_long_url_with_ttl(short_code))[1] == long_url
+    assert (await cache.get_long_url_with_ttl("ringMissing"))[1] is None
+    ttl, long_url = await cache.get_long_url_with_ttl("ring7")
+    assert 0 < ttl <= 60
+    assert long_url == long_urls["ring7"]
+    assert await cache.get_entity("ringE") == entity
+    key = cache.long_url_key("ring3")
+    assert await sharded.client_for(key).get(key) == long_urls["ring3"]
+
+    keys = [cache.long_url_key(code) for code in long_urls]
+    assert await sharded.delete(*keys, cache.entity_key("ringE")) == 51
+    await sharded.close()
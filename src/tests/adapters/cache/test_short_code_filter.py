@@ -0,0 +1,110 @@
+import pytest
+from app.adapters.cache import short_code_filter as short_code_filter_module
+from app.adapters.cache.bloom_filter import BloomFilter
+from app.adapters.cache.short_code_filter import (
+    ShortCodeFilter,
+    rebuild_short_code_filter,
+)
+
+
+async def _codes(*codes):
+    for code in codes:
+        yield code
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """
+    Test that every added item is reported as present and that the false
+    positive rate stays close to the configured one at capacity.
+    """
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"code{i}")
+
+    assert all(f"code{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives / 10_000 < 0.02
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.1)
+
+
+def test_malformed_codes_are_rejected():
+    """Test that codes with foreign characters or an impossible length are rejected."""
+    short_code_filter = ShortCodeFilter(capacity=100, error_rate=0.01, max_length=8)
+
+    assert short_code_filter.might_exist("abc12")
+    assert not short_code_filter.might_exist("abc-12")
+    assert not short_code_filter.might_exist("../etc/passwd")
+    assert not short_code_filter.might_exist("a" * 9)
+
+
+@pytest.mark.asyncio
+async def test_built_filter_rejects_unknown_codes():
+    """
+    Test that once built, the filter only lets through stored codes,
+    codes created afterwards and codes not remembered as missing.
+    """
+    short_code_filter = ShortCodeFilter(capacity=100, error_rate=0.001, grace=0)
+    await short_code_filter.build(_codes("known"))
+
+    assert short_code_filter.might_exist("known")
+    assert not short_code_filter.might_exist("unknown")
+
+    short_code_filter.add("unknown")
+    assert short_code_filter.might_exist("unknown")
+
+    short_code_filter.remember_missing("known")
+    assert not short_code_filter.might_exist("known")
+    short_code_filter.add("known")
+    assert short_code_filter.might_exist("known")
+
+
+@pytest.mark.asyncio
+async def test_rebuild_picks_up_codes_announced_while_disconnected(monkeypatch):
+    """
+    Test that a reset filter stops rejecting unseen codes and that the rebuild
+    loads the codes stored in the meantime.
+    """
+    stored = ["known"]
+    short_code_filter = ShortCodeFilter(capacity=100, error_rate=0.001, grace=0)
+    monkeypatch.setattr(
+        short_code_filter_module, "short_code_filter", short_code_filter
+    )
+    monkeypatch.setattr(
+        short_code_filter_module, "_short_codes", lambda: _codes(*stored)
+    )
+    monkeypatch.setattr(short_code_filter_module, "_build_task", None)
+    await short_code_filter.build(_codes(*stored))
+    short_code_filter.remember_missing("late")
+
+    # Created by another worker while this one was not subscribed.
+    stored.append("late")
+    short_code_filter.reset()
+    assert short_code_filter.might_exist("late")
+
+    rebuild_short_code_filter()
+    await short_code_filter_module._build_task
+    assert short_code_filter.ready
+    assert short_code_filter.might_exist("late")
+    assert not short_code_filter.might_exist("unknown")
+
+
+@pytest.mark.asyncio
+async def test_unseen_codes_are_looked_up_during_the_grace_window(monkeypatch):
+    """
+    Test that codes the Bloom filter has not seen are let through for a while
+    after the build and after each announcement, so a code created on another
+    worker is not rejected before its announcement arrives.
+    """
+    now = [100.0]
+    monkeypatch.setattr(short_code_filter_module.time, "monotonic", lambda: now[0])
+    short_code_filter = ShortCodeFilter(capacity=100, error_rate=0.001, grace=5)
+    await short_code_filter.build(_codes("known"))
+
+    assert short_code_filter.might_exist("elsewhere")
+    now[0] += 5
+    assert not short_code_filter.might_exist("elsewhere")
+
+    short_code_filter.add("local")
+    assert short_code_filter.might_exist("elsewhere")
+    short_code_filter.remember_missing("gone")
+    assert not short_code_filter.might_exist("gone")
@@ -0,0 +1,69 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.adapters.cache.short_url_cache import (
+    cache_ttl,
+    decode_entity,
+    encode_entity,
+    get_short_url_cache,
+)
+from app.core.config import Config
+from app.entities.short_url.short_url_entity import ShortURLEntity
+
+
+def test_entity_encoding_round_trip():
+    """
+    Test that entities survive encoding, including colons in the long URL,
+    except for their click count, which is never cached.
+    """
+    entity = ShortURLEntity(
+        long_url="https://example.com:8080/a?b=c:d", short_code="abcde", click_count=7
+    )
+
+    assert encode_entity(entity) == ":https://example.com:8080/a?b=c:d"
+    entity.click_count = 0
+    assert decode_entity("abcde", encode_entity(entity)) == entity
+
+    entity.expires_at = datetime.fromtimestamp(1_900_000_000, UTC)
+    assert encode_entity(entity) == "1900000000:https://example.com:8080/a?b=c:d"
+    assert decode_entity("abcde", encode_entity(entity)) == entity
+
+
+def test_cache_ttl_is_capped_by_the_expiry():
+    """Test that entries of expiring short URLs never outlive them."""
+    assert cache_ttl(60, None) == 60
+    assert cache_ttl(60, datetime.now(UTC) + timedelta(days=1)) == 60
+    assert 0 < cache_ttl(60, datetime.fromtimestamp(time.time() + 30, UTC)) <= 30
+    assert cache_ttl(60, datetime.now(UTC) - timedelta(seconds=1)) <= 0
+
+
+@pytest.mark.asyncio
+async def test_long_urls_use_direct_keys():
+    """
+    Test that long URLs are stored under the plain short code key as raw
+    strings and read back with their remaining TTL.
+    """
+    cache = get_short_url_cache()
+    await cache.set_long_url("cacheA", "https://example.com/a", 60)
+
+    assert await cache.redis.get(f"{Config.CACHE_KEY_PREFIX}:u:cacheA") == (
+        "https://example.com/a"
+    )
+    ttl, long_url = await cache.get_long_url_with_ttl("cacheA")
+    assert 0 < ttl <= 60
+    assert long_url == "https://example.com/a"
+    await cache.redis.delete(cache.long_url_key("cacheA"))
+
+
+@pytest.mark.asyncio
+async def test_entities_round_trip_through_redis():
+    """Test that a cached entity is read back from Redis once the local tier is empty."""
+    cache = get_short_url_cache()
+    entity = ShortURLEntity(long_url="https://example.com/e", short_code="cacheE")
+    await cache.set_entity(entity, 60)
+    cache.local.clear()
+
+    assert await cache.get_entity("cacheE") == entity
+    assert await cache.get_entity("cacheF") is None
+    await cache.redis.delete(cache.entity_key("cacheE"))
@@ -1,3 +1,6 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
 import httpx
@@ -5,16 +8,27 @@ import pytest
 import pytest_asyncio
 from adapters.endpoints.test_factory_api_model import URLPayloadFactory
 from app.adapters.api.endpoints.error_messages import (
+    ERROR_CLICK_RANGE_TOO_LARGE,
+    ERROR_INVALID_CURSOR,
+    ERROR_OVERLOADED,
     ERROR_SHORT_CODE_CONFLICT,
     ERROR_SHORT_URL_NOT_FOUND,
 )
-from app.core.errors import DuplicateEntityError
+from app.adapters.cache.heavy_hitters import get_heavy_hitters
+from app.adapters.cache.short_url_cache import get_short_url_cache
+from app.core.config import Config
+from app.core.errors import DuplicateEntityError, OverloadedError
+from app.core.readiness import readiness
 from app.frameworks_and_drivers.api_models import (
+    BulkShortURLResponse,
     ClickCountResponse,
+    ClickHistoryResponse,
     ShortURLResponse,
+    TopLinksResponse,
     URLPayload,
 )
 from app.frameworks_and_drivers.asgi import app, startup_event
+from app.use_cases.click_aggregator import get_click_aggregator
 from fastapi_cache import FastAPICache
 
 
@@ -35,9 +49,13 @@ class TestShortURL:
     """Test class for ShortURL endpoints."""
 
     create_short_url_name: str = "create_short_url"
+    create_short_urls_name: str = "create_short_urls"
     get_long_url_name: str = "get_long_url"
     redirect_name: str = "redirect_to_long_url"
     get_click_count_name: str = "get_click_count"
+    get_click_history_name: str = "get_click_history"
+    get_top_links_name: str = "get_top_links"
+    export_name: str = "export_short_urls"
 
     @staticmethod
     def get_api_path(name: str, short_code: str | None = None) -> str:
@@ -61,6 +79,63 @@ class TestShortURL:
         assert response.status_code == 200
         assert ShortURLResponse(**response.json())
 
+    @pytest.mark.asyncio
+    async def test_create_expiring_short_url(self, async_client):
+        """
+        Test that an expiry is returned with the short URL, that its cached
+        long URL lives no longer than the link, and that past expiries are rejected.
+        """
+        expires_at = datetime.now(UTC) + timedelta(seconds=30)
+        response = await async_client.post(
+            self.get_api_path(self.create_short_url_name),
+            json={
+                "long_url": URLPayloadFactory.build().long_url,
+                "expires_at": expires_at.isoformat(),
+            },
+        )
+        assert response.status_code == 200
+        created = ShortURLResponse(**response.json())
+        assert abs(created.expires_at - expires_at) < timedelta(seconds=1)
+
+        response = await async_client.get(
+            self.get_api_path(self.get_long_url_name, short_code=created.short_code)
+        )
+        assert response.status_code == 200
+        assert ShortURLResponse(**response.json()).expires_at == created.expires_at
+        cache = get_short_url_cache()
+        ttl = await cache.redis.ttl(cache.entity_key(created.short_code))
+        assert 0 < ttl <= 30
+
+        response = await async_client.post(
+            self.get_api_path(self.create_short_url_name),
+            json={
+                "long_url": URLPayloadFactory.build().long_url,
+                "expires_at": (datetime.now(UTC) - timedelta(1)).isoformat(),
+            },
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_create_short_urls(self, async_client):
+        """
+        Test the endpoint for generating short URLs in bulk.
+
+        This test ensures that every requested long URL gets a result in request
+        order and that repeated long URLs share the same short code.
+        """
+        long_urls = [f"{URLPayloadFactory.build().long_url}bulk/{i}" for i in range(3)]
+        long_urls.append(long_urls[0])
+        response = await async_client.post(
+            self.get_api_path(self.create_short_urls_name),
+            json={"long_urls": long_urls},
+        )
+        assert response.status_code == 200
+        items = BulkShortURLResponse(**response.json()).items
+        assert [item.long_url for item in items] == long_urls
+        assert all(item.short_code and item.error is None for item in items)
+        assert items[0].short_code == items[-1].short_code
+        assert len({item.short_code for item in items}) == 3
+
     @pytest.mark.asyncio
     async def test_get_long_url(self, async_client):
         """
@@ -89,8 +164,8 @@ class TestShortURL:
         """
         Test the redirection endpoint using a short code.
 
-        This test first creates a short URL and then uses the generated
-        short code to redirect to the original long URL.
+        This test first creates a short URL and then checks that the generated
+        short code redirects straight to the original long URL in one response.
         """
         request_data: URLPayload = URLPayloadFactory.build()
         response = await async_client.post(
@@ -102,7 +177,8 @@ class TestShortURL:
         response = await async_client.get(
             self.get_api_path(self.redirect_name, short_code=response_data.short_code)
         )
-        assert response.status_code == 307
+        assert response.status_code == Config.REDIRECT_STATUS_CODE
+        assert response.headers["location"] == response_data.long_url
 
     @pytest.mark.asyncio
     async def test_get_click_count(self, async_client):
@@ -142,6 +218,104 @@ class TestShortURL:
 
         assert ClickCountResponse(**response_after_click.json()).click_count == 1
 
+    @pytest.mark.asyncio
+    async def test_get_click_history(self, async_client):
+        """
+        Test the endpoint for retrieving the clicks of a short code per time bucket.
+
+        Flushed clicks show up in the bucket of the current hour, and a range
+        needing too many buckets is rejected.
+        """
+        request_data: URLPayload = URLPayloadFactory.build()
+        response = await async_client.post(
+            self.get_api_path(self.create_short_url_name),
+            json=request_data.model_dump(),
+        )
+        short_code = ShortURLResponse(**response.json()).short_code
+        for _ in range(2):
+            await async_client.get(self.get_api_path(self.redirect_name, short_code))
+        await get_click_aggregator().flush()
+
+        response = await async_client.get(
+            self.get_api_path(self.get_click_history_name, short_code)
+        )
+        assert response.status_code == 200
+        history = ClickHistoryResponse(**response.json())
+        assert history.granularity == "hour"
+        assert history.total == 2
+        assert history.buckets[-1].clicks == 2
+
+        response = await async_client.get(
+            self.get_api_path(self.get_click_history_name, short_code),
+            params={"granularity": "minute", "start": "2000-01-01T00:00:00Z"},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == ERROR_CLICK_RANGE_TOO_LARGE
+
+        response = await async_client.get(
+            self.get_api_path(self.get_click_history_name, "nonexistent")
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_top_links(self, async_client):
+        """Test that the most redirected short code leads the published top links."""
+        request_data: URLPayload = URLPayloadFactory.build()
+        response = await async_client.post(
+            self.get_api_path(self.create_short_url_name),
+            json=request_data.model_dump(),
+        )
+        short_code = ShortURLResponse(**response.json()).short_code
+        heavy_hitters = get_heavy_hitters()
+        clicks = 5 + (heavy_hitters.summary.top(1) or [("", 0, 0)])[0][1]
+        for _ in range(clicks):
+            await async_client.get(self.get_api_path(self.redirect_name, short_code))
+        await heavy_hitters.publish()
+
+        response = await async_client.get(
+            self.get_api_path(self.get_top_links_name), params={"limit": 1}
+        )
+        assert response.status_code == 200
+        top = TopLinksResponse(**response.json())
+        assert [link.short_code for link in top.links] == [short_code]
+        assert top.links[0].clicks >= clicks
+
+    @pytest.mark.asyncio
+    async def test_export_short_urls(self, async_client):
+        """
+        Test that the export streams NDJSON rows in id order, honours the limit
+        and resumes after the id of the last row received.
+        """
+        for _ in range(3):
+            await async_client.post(
+                self.get_api_path(self.create_short_url_name),
+                json=URLPayloadFactory.build().model_dump(),
+            )
+
+        response = await async_client.get(
+            self.get_api_path(self.export_name), params={"limit": 2}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        first_page = [json.loads(line) for line in response.text.splitlines()]
+        assert len(first_page) == 2
+        assert set(first_page[0]) == {"id", "short_code", "long_url", "click_count"}
+
+        response = await async_client.get(
+            self.get_api_path(self.export_name),
+            params={"after": first_page[-1]["id"]},
+        )
+        rest = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rest) == 1
+        ids = [row["id"] for row in first_page + rest]
+        assert ids == sorted(ids)
+
+        response = await async_client.get(
+            self.get_api_path(self.export_name), params={"after": "not-an-id"}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == ERROR_INVALID_CURSOR
+
     @pytest.mark.asyncio
     async def test_get_long_url_nonexistent_code(self, async_client):
         """Test retrieving a long URL with a nonexistent short code."""
@@ -188,3 +362,72 @@ class TestShortURL:
             )
             assert response.status_code == 409
             assert response.json()["detail"] == ERROR_SHORT_CODE_CONFLICT
+
+    @pytest.mark.asyncio
+    async def test_overloaded_repository_answers_503(self, async_client):
+        """
+        Test that a request shed by the concurrency limiter gets a fast 503
+        with a Retry-After header.
+        """
+        with patch(
+            "app.use_cases.short_url_use_case.ShortURLUseCase.create",
+            side_effect=OverloadedError("shed", retry_after=2),
+        ):
+            response = await async_client.post(
+                self.get_api_path(self.create_short_url_name),
+                json=URLPayloadFactory.build().model_dump(),
+            )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+        assert response.json()["detail"] == ERROR_OVERLOADED
+
+    @pytest.mark.asyncio
+    async def test_metrics(self, async_client):
+        """
+        Test that served requests show up in the metrics endpoint, labelled
+        by route template instead of the requested short code.
+        """
+        await async_client.get(
+            self.get_api_path(self.redirect_name, short_code="nonexistentcode")
+        )
+
+        response = await async_client.get(app.url_path_for("metrics"))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/api/short_url/{short_code}",status="404"}' in response.text
+        )
+        assert "nonexistentcode" not in response.text
+        assert "http_requests_in_flight 1" in response.text
+        assert "repository_concurrency_limit " in response.text
+        assert 'repository_queue_depth{priority="high"} 0' in response.text
+
+    @pytest.mark.asyncio
+    async def test_ready(self, async_client):
+        """
+        Test that the readiness endpoint reports ready once startup warmed the
+        connections and the short code filter build settled, and 503 otherwise.
+        """
+        for _ in range(100):
+            if readiness.ready:
+                break
+            await asyncio.sleep(0.01)
+
+        response = await async_client.get(app.url_path_for("ready"))
+
+        assert response.status_code == 200
+        assert response.json()["checks"]["connections"] is True
+
+        readiness.set("warming_up", False)
+        try:
+            response = await async_client.get(app.url_path_for("ready"))
+        finally:
+            readiness.set("warming_up", True)
+
+        assert response.status_code == 503
+        assert response.json() == {
+            "ready": False,
+            "checks": {**response.json()["checks"], "warming_up": False},
+        }
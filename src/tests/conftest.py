@@ -5,10 +5,13 @@ import pytest
 import pytest_asyncio
 from app.adapters.cache.redis_cache import init_redis_cache
 from app.adapters.db.mongo_db import (
-    get_short_link_collection,
+    close_mongo_client,
+    get_counter_collection,
+    init_short_link_collection,
     mongo_client,
     short_url_db,
 )
+from app.adapters.db.mongo_db.id_block_repository import MotorMongoIdBlockRepository
 from app.adapters.db.mongo_db.short_url_repository import MotorMongoShortURLRepository
 from app.use_cases.short_url_use_case import ShortURLUseCase
 from motor.motor_asyncio import (
@@ -34,7 +37,7 @@ def mongo_client_fixture() -> AsyncIOMotorClient:
     client = mongo_client()
     yield client
     logging.info("Closing MongoDB client...")
-    client.close()
+    close_mongo_client()
 
 
 @pytest.fixture(scope="session")
@@ -48,7 +51,7 @@ def mongo_db(mongo_client_fixture) -> AsyncIOMotorDatabase:
 async def mongo_collection(mongo_db) -> AsyncIOMotorCollection:
     """Initialize and yield MongoDB collection."""
     logging.info("Initializing MongoDB collection...")
-    collection = await get_short_link_collection(db=mongo_db)
+    collection = await init_short_link_collection(db=mongo_db)
     yield collection
 
 
@@ -67,6 +70,15 @@ def short_url_repository_fixture(mongo_collection) -> MotorMongoShortURLReposito
     return MotorMongoShortURLRepository(collection=mongo_collection)
 
 
+@pytest_asyncio.fixture
+async def id_block_repository_fixture(mongo_db) -> MotorMongoIdBlockRepository:
+    """Initialize and yield ID block repository, dropping its counters afterwards."""
+    logging.info("Initializing ID block repository...")
+    collection = get_counter_collection(db=mongo_db)
+    yield MotorMongoIdBlockRepository(collection=collection)
+    await collection.delete_many({})
+
+
 @pytest.fixture
 def short_url_use_case_fixture(short_url_repository_fixture) -> ShortURLUseCase:
     """Initialize and yield Short URL use case."""
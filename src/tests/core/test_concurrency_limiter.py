@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from app.core.concurrency_limiter import (
+    SHED_EVICTED,
+    SHED_QUEUE_FULL,
+    SHED_TIMEOUT,
+    ConcurrencyLimiter,
+    Priority,
+)
+from app.core.errors import DuplicateEntityError, OverloadedError
+
+
+def make_limiter(**kwargs) -> ConcurrencyLimiter:
+    options = {
+        "initial_limit": 1,
+        "min_limit": 1,
+        "max_limit": 10,
+        "latency": 0.05,
+        "queue_size": 10,
+        "queue_timeout": 1.0,
+        "retry_after": 3,
+        "enabled": True,
+    }
+    return ConcurrencyLimiter(**{**options, **kwargs})
+
+
+async def hold(limiter: ConcurrencyLimiter, release: asyncio.Event) -> asyncio.Task:
+    """Take the only slot of the limiter until ``release`` is set."""
+    task = asyncio.create_task(limiter.run(Priority.LOW, release.wait))
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_high_priority_waiters_get_the_next_slot():
+    """Test that queued reads run before writes that were queued earlier."""
+    limiter = make_limiter()
+    release = asyncio.Event()
+    blocker = await hold(limiter, release)
+    order = []
+
+    async def call(name):
+        order.append(name)
+
+    low = asyncio.create_task(limiter.run(Priority.LOW, call, "low"))
+    high = asyncio.create_task(limiter.run(Priority.HIGH, call, "high"))
+    await asyncio.sleep(0)
+    assert limiter.queue_depth() == 2
+    assert limiter.queue_depth(Priority.HIGH) == 1
+
+    release.set()
+    await asyncio.gather(blocker, low, high)
+
+    assert order == ["high", "low"]
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_writes_and_reads_evict_them():
+    """
+    Test that a full queue rejects writes at once and that a read takes the
+    place of the newest queued write.
+    """
+    limiter = make_limiter(queue_size=1)
+    release = asyncio.Event()
+    blocker = await hold(limiter, release)
+    queued_write = asyncio.create_task(limiter.run(Priority.LOW, asyncio.sleep, 0))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError) as shed:
+        await limiter.run(Priority.LOW, asyncio.sleep, 0)
+    read = asyncio.create_task(limiter.run(Priority.HIGH, asyncio.sleep, 0, "read"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert shed.value.retry_after == 3
+    with pytest.raises(OverloadedError):
+        await queued_write
+    assert await read == "read"
+    await blocker
+    assert limiter.shed == {
+        (Priority.LOW, SHED_QUEUE_FULL): 1,
+        (Priority.LOW, SHED_EVICTED): 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_shed_after_the_queue_timeout():
+    """Test that a call waiting longer than the queue timeout fails fast."""
+    limiter = make_limiter(queue_timeout=0.01)
+    release = asyncio.Event()
+    blocker = await hold(limiter, release)
+
+    with pytest.raises(OverloadedError):
+        await limiter.run(Priority.HIGH, asyncio.sleep, 0)
+    release.set()
+    await blocker
+
+    assert limiter.shed == {(Priority.HIGH, SHED_TIMEOUT): 1}
+    assert limiter.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_used_and_shrinks_on_slow_or_failed_calls():
+    """
+    Test that the limit grows additively while fully used, shrinks
+    multiplicatively after a slow call and ignores expected errors.
+    """
+    limiter = make_limiter(
+        initial_limit=2, backoff=0.5, expected_errors=(DuplicateEntityError,)
+    )
+    for _ in range(10):
+        await asyncio.gather(
+            *(
+                limiter.run(Priority.HIGH, asyncio.sleep, 0.001)
+                for _ in range(int(limiter.limit))
+            )
+        )
+    grown = limiter.limit
+    assert grown > 2
+
+    async def duplicate():
+        raise DuplicateEntityError
+
+    with pytest.raises(DuplicateEntityError):
+        await limiter.run(Priority.LOW, duplicate)
+    assert limiter.limit >= grown
+
+    await limiter.run(Priority.HIGH, asyncio.sleep, 0.06)
+    assert limiter.limit == pytest.approx(grown * 0.5)
+
+
+@pytest.mark.asyncio
+async def test_disabled_limiter_runs_calls_directly():
+    """Test that a disabled limiter never queues or sheds."""
+    limiter = make_limiter(enabled=False, queue_size=0)
+    results = await asyncio.gather(
+        *(limiter.run(Priority.LOW, asyncio.sleep, 0.001, i) for i in range(5))
+    )
+
+    assert results == list(range(5))
+    assert limiter.in_flight == 0
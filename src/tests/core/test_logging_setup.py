@@ -0,0 +1,74 @@
+import json
+import logging
+import queue
+
+from app.core.logging_setup import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    parse_sample_rates,
+)
+
+
+def _record(name: str, level: int, msg: str = "message", *args, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_sample_rates():
+    """Test that rates are parsed per logger and clamped to [0, 1]."""
+    rates = parse_sample_rates("app.db=0.01, uvicorn.access = 2,broken")
+
+    assert rates == {"app.db": 0.01, "uvicorn.access": 1.0}
+
+
+def test_sampling_filter_keeps_warnings_and_unsampled_loggers():
+    """Test that warnings of sampled loggers and every record of other loggers pass."""
+    sampling = SamplingFilter({"app.db": 0.0})
+
+    assert not sampling.filter(_record("app.db.mongo", logging.INFO))
+    assert sampling.filter(_record("app.db.mongo", logging.WARNING))
+    assert sampling.filter(_record("app.db.mongo", logging.ERROR))
+    assert sampling.filter(_record("app.dbx", logging.INFO))
+    assert sampling.filter(_record("app.api", logging.INFO))
+    assert sampling.sampled_out == 1
+
+
+def test_sampling_filter_most_specific_rate_wins():
+    """Test that a child logger's own rate overrides its parent's."""
+    sampling = SamplingFilter({"app": 0.0, "app.api": 1.0})
+
+    assert sampling.rate_for("app.api.short_url") == 1.0
+    assert sampling.rate_for("app.db") == 0.0
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    """Test that records are queued unformatted and dropped instead of blocking."""
+    log_queue = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+    first = _record("app", logging.INFO, "clicks for %s", 3)
+
+    handler.handle(first)
+    handler.handle(_record("app", logging.INFO))
+
+    assert log_queue.get_nowait() is first
+    assert first.args == (3,) and first.getMessage() == "clicks for 3"
+    assert handler.dropped == 1
+
+
+def test_json_formatter():
+    """Test that records are rendered as JSON with extra fields and exceptions."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _record("app.api", logging.ERROR, "failed %s", "abc", short_code="x")
+        record.exc_info = __import__("sys").exc_info()
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "app.api"
+    assert entry["message"] == "failed abc"
+    assert entry["short_code"] == "x"
+    assert "ValueError: boom" in entry["exc_info"]
@@ -0,0 +1,57 @@
+import pytest
+from app.core.metrics import MetricsRegistry, timed
+
+
+def test_render_counters_and_gauges():
+    """Test the text format of labelled counters and unlabelled gauges."""
+    registry = MetricsRegistry()
+    counter = registry.counter("lookups_total", "Lookups.", ("result",))
+    gauge = registry.gauge("in_flight", "In flight.")
+    counter.labels("hit").inc(2)
+    counter.labels('mi"ss').inc()
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = registry.render()
+
+    assert "# TYPE lookups_total counter" in text
+    assert 'lookups_total{result="hit"} 2' in text
+    assert 'lookups_total{result="mi\\"ss"} 1' in text
+    assert "in_flight 1" in text
+    assert registry.counter("lookups_total", "Lookups.", ("result",)) is counter
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket counts include every smaller bucket and +Inf counts all."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+
+
+@pytest.mark.asyncio
+async def test_timed_and_callback_metrics():
+    """Test that timed coroutines are observed and callbacks are read at render time."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("operation_seconds", "Operations.", ("operation",))
+    size = 0
+    registry.callback("entries", "Entries.", "gauge", lambda: size)
+
+    @timed(histogram, "get")
+    async def get():
+        return "value"
+
+    assert await get() == "value"
+    size = 3
+
+    text = registry.render()
+    assert 'operation_seconds_count{operation="get"} 1' in text
+    assert "entries 3" in text
@@ -0,0 +1,13 @@
+from app.core.object_id import is_object_id, new_object_id
+from bson import ObjectId
+
+
+def test_new_object_ids_are_valid_and_ordered():
+    """Test that generated IDs are ObjectIds and sort in creation order."""
+    ids = [new_object_id() for _ in range(1_000)]
+
+    assert all(ObjectId.is_valid(id) and is_object_id(id) for id in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert not is_object_id("not-an-object-id")
+    assert not is_object_id("0" * 23)
@@ -0,0 +1,18 @@
+from app.core.readiness import Readiness
+
+
+def test_ready_once_every_check_passes():
+    """Test that readiness needs every check and that checks are read on demand."""
+    readiness = Readiness()
+    built = []
+    readiness.set("connections", True)
+    readiness.add_check("filter", lambda: bool(built))
+
+    assert not readiness.ready
+    assert readiness.status() == {"connections": True, "filter": False}
+
+    built.append(True)
+
+    assert readiness.ready
+    readiness.set("connections", False)
+    assert not readiness.ready
@@ -0,0 +1,67 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from app.adapters.db.memory_db.click_stats_repository import (
+    InMemoryClickStatsRepository,
+)
+from app.adapters.db.mongo_db import init_click_bucket_collection
+from app.adapters.db.mongo_db.click_stats_repository import (
+    MotorMongoClickStatsRepository,
+)
+from app.entities.click_stats.click_buckets import DAY, HOUR, MINUTE
+
+# Yesterday, so minute and hour buckets are still within their TTL.
+DAY_START = datetime.now(UTC).replace(
+    hour=0, minute=0, second=0, microsecond=0
+) - timedelta(days=1)
+AT = DAY_START.replace(hour=10, minute=15, second=30)
+
+
+@pytest_asyncio.fixture(params=["mongo", "memory"])
+async def click_stats_repository(request, mongo_db):
+    """Click stats repository of each backend, with its buckets dropped afterwards."""
+    if request.param == "memory":
+        yield InMemoryClickStatsRepository()
+        return
+    collection = await init_click_bucket_collection(db=mongo_db)
+    yield MotorMongoClickStatsRepository(collection)
+    await collection.delete_many({})
+
+
+@pytest.mark.asyncio
+async def test_clicks_roll_up_to_every_granularity(click_stats_repository):
+    """
+    Test that flushed clicks are summed per minute, hour and day bucket and
+    that ranges only return the buckets starting inside them.
+    """
+    await click_stats_repository.add_clicks({"abc": 2, "xyz": 1}, AT)
+    await click_stats_repository.add_clicks({"abc": 3}, AT + timedelta(seconds=10))
+    await click_stats_repository.add_clicks({"abc": 4}, AT + timedelta(hours=1))
+
+    day_start = DAY_START
+    minutes = await click_stats_repository.get_buckets(
+        "abc", MINUTE, AT, AT + timedelta(minutes=1)
+    )
+    hours = await click_stats_repository.get_buckets(
+        "abc", HOUR, day_start, day_start + timedelta(days=1)
+    )
+    days = await click_stats_repository.get_buckets(
+        "abc", DAY, day_start, day_start + timedelta(days=1)
+    )
+
+    assert minutes == {AT.replace(second=0): 5}
+    assert hours == {
+        day_start.replace(hour=10): 5,
+        day_start.replace(hour=11): 4,
+    }
+    assert days == {day_start: 9}
+    assert await click_stats_repository.get_buckets(
+        "xyz", DAY, day_start, day_start + timedelta(days=1)
+    ) == {day_start: 1}
+    assert (
+        await click_stats_repository.get_buckets(
+            "abc", HOUR, AT + timedelta(hours=2), AT + timedelta(hours=3)
+        )
+        == {}
+    )
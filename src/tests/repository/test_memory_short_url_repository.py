@@ -0,0 +1,136 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.adapters.db.memory_db.id_block_repository import InMemoryIdBlockRepository
+from app.adapters.db.memory_db.short_url_repository import InMemoryShortURLRepository
+from app.core.errors import DuplicateEntityError, NotFoundError
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from repository.test_factory_dto_short_url import ShortURLDTOFactory
+
+
+@pytest.fixture
+def memory_repository() -> InMemoryShortURLRepository:
+    return InMemoryShortURLRepository()
+
+
+@pytest.mark.asyncio
+async def test_create_and_get(memory_repository):
+    """Test that a created short URL is returned with an ID and can be read back."""
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/a")
+    result = await memory_repository.create(data)
+
+    assert result.id is not None
+    stored = await memory_repository.get_by_short_code(short_code=data.short_code)
+    assert stored.model_dump() == result.model_dump()
+    assert await memory_repository.get_long_url(data.short_code) == data.long_url
+    assert await memory_repository.get_by_short_code(short_code="missing") is None
+
+
+@pytest.mark.asyncio
+async def test_create_deduplicates_long_urls_and_rejects_duplicate_codes(
+    memory_repository,
+):
+    """
+    Test that creating a known long URL returns the stored record, while
+    reusing a short code for another long URL raises DuplicateEntityError.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/a")
+    await memory_repository.create(data)
+
+    again = await memory_repository.create(
+        ShortURLDTOFactory.build(long_url=data.long_url)
+    )
+    assert again.short_code == data.short_code
+    with pytest.raises(DuplicateEntityError):
+        await memory_repository.create(
+            ShortURLDTOFactory.build(
+                long_url="https://example.com/b", short_code=data.short_code
+            )
+        )
+    assert len(memory_repository) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_many(memory_repository):
+    """
+    Test that bulk creation returns already stored long URLs as they are,
+    inserts new ones and reports short code conflicts separately.
+    """
+    existing: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/a")
+    await memory_repository.create(existing)
+    new: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/b")
+    conflicting: ShortURLDTO = ShortURLDTOFactory.build(
+        long_url="https://example.com/c", short_code=existing.short_code
+    )
+
+    stored, conflicts = await memory_repository.create_many(
+        [ShortURLDTOFactory.build(long_url=existing.long_url), new, conflicting]
+    )
+
+    assert {url.short_code for url in stored} == {existing.short_code, new.short_code}
+    assert conflicts == [conflicting]
+
+
+@pytest.mark.asyncio
+async def test_click_counts(memory_repository):
+    """
+    Test single and aggregated click updates, with unknown short codes
+    ignored by the bulk update and rejected by the single one.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/a")
+    await memory_repository.create(data)
+
+    updated = await memory_repository.update_click_count(data.short_code)
+    await memory_repository.increment_click_counts({data.short_code: 3, "missing": 2})
+
+    assert updated.click_count == data.click_count + 1
+    assert (
+        await memory_repository.get_click_count(data.short_code) == data.click_count + 4
+    )
+    assert await memory_repository.get_click_count("missing") is None
+    with pytest.raises(NotFoundError):
+        await memory_repository.update_click_count("missing")
+
+
+@pytest.mark.asyncio
+async def test_iter_short_codes_and_id_blocks(memory_repository):
+    """Test streaming short codes and leasing consecutive ID blocks."""
+    urls = [
+        ShortURLDTOFactory.build(long_url=f"https://example.com/{i}") for i in range(5)
+    ]
+    await memory_repository.create_many(urls)
+    id_blocks = InMemoryIdBlockRepository()
+
+    assert [
+        code async for code in memory_repository.iter_short_codes(batch_size=2)
+    ] == [url.short_code for url in urls]
+    assert await id_blocks.lease_block("short_code", 10) == 0
+    assert await id_blocks.lease_block("short_code", 10) == 10
+
+
+@pytest.mark.asyncio
+async def test_iter_short_url_rows_resumes_after_id(memory_repository):
+    """
+    Test that rows come in ID order, resume right after the given ID and
+    leave out records dropped on expiry.
+    """
+    urls = [
+        ShortURLDTOFactory.build(long_url=f"https://example.com/{i}") for i in range(5)
+    ]
+    urls[3].expires_at = datetime.now(UTC) - timedelta(seconds=1)
+    await memory_repository.create_many(urls)
+    assert await memory_repository.get_by_short_code(urls[3].short_code) is None
+
+    rows = [
+        row
+        async for row in memory_repository.iter_short_url_rows(
+            after=urls[1].id, batch_size=1
+        )
+    ]
+    assert rows == [
+        (url.id, url.short_code, url.long_url, url.click_count)
+        for url in (urls[2], urls[4])
+    ]
+    assert [row async for row in memory_repository.iter_short_url_rows()][0][0] == (
+        urls[0].id
+    )
@@ -0,0 +1,228 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from app.adapters.db.redis_db.outbox import OutboxPersister
+from app.adapters.db.redis_db.short_url_repository import (
+    OUTBOX_CREATE,
+    RedisPrimaryShortURLRepository,
+    outbox_entry,
+)
+from app.core.errors import DuplicateEntityError, PartialWriteError
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from fastapi_cache import FastAPICache
+from repository.test_factory_dto_short_url import ShortURLDTOFactory
+
+
+@pytest_asyncio.fixture
+async def redis_repository(
+    short_url_repository_fixture,
+) -> RedisPrimaryShortURLRepository:
+    """Redis-primary repository over the MongoDB one, with its keys dropped afterwards."""
+    redis = FastAPICache.get_backend().redis
+    repo = RedisPrimaryShortURLRepository(
+        redis, short_url_repository_fixture, prefix="test-lms"
+    )
+    yield repo
+    keys = [key async for key in redis.scan_iter(match="test-lms:*")]
+    if keys:
+        await redis.delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_create_and_read_from_redis(redis_repository):
+    """
+    Test that creates are served from Redis with the Mongo repository's
+    semantics for duplicate long URLs and short codes.
+    """
+    redis_repository.ready = True
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/r/a")
+    created = await redis_repository.create(data)
+
+    assert await redis_repository.get_long_url(data.short_code) == data.long_url
+    assert (await redis_repository.get_by_short_code(data.short_code)) == created
+    again = await redis_repository.create(
+        ShortURLDTOFactory.build(long_url=data.long_url)
+    )
+    assert again.short_code == data.short_code
+    with pytest.raises(DuplicateEntityError):
+        await redis_repository.create(
+            ShortURLDTOFactory.build(
+                long_url="https://example.com/r/b", short_code=data.short_code
+            )
+        )
+    await redis_repository.increment_click_counts({data.short_code: 2, "missing": 1})
+    assert (
+        await redis_repository.get_click_count(data.short_code) == data.click_count + 2
+    )
+    assert await redis_repository.get_click_count("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_outbox_is_persisted_to_mongo(
+    redis_repository, short_url_repository_fixture
+):
+    """
+    Test that creates and clicks queued in the outbox reach MongoDB
+    and are removed from the stream once persisted.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/r/c")
+    created = await redis_repository.create(data)
+    await redis_repository.increment_click_counts({data.short_code: 3})
+    persister = OutboxPersister(redis_repository, block_ms=10)
+    await persister.ensure_group()
+
+    assert await short_url_repository_fixture.get_long_url(data.short_code) is None
+    await persister.persist(await persister._next_batch())
+
+    stored = await short_url_repository_fixture.get_by_short_code(data.short_code)
+    assert stored.id == created.id
+    assert stored.click_count == data.click_count + 3
+    assert await redis_repository.redis.xlen(redis_repository.outbox) == 0
+
+
+@pytest.mark.asyncio
+async def test_rebuild_from_mongo(redis_repository, short_url_repository_fixture):
+    """
+    Test that a lost Redis dataset is rebuilt from MongoDB once,
+    after which misses no longer fall back to MongoDB.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/r/d")
+    await short_url_repository_fixture.create(data)
+
+    assert await redis_repository.get_long_url(data.short_code) == data.long_url
+    assert await redis_repository.rebuild() == 1
+    assert (
+        await redis_repository.redis.hget(
+            redis_repository.code_key(data.short_code), "u"
+        )
+        == data.long_url
+    )
+    assert [code async for code in redis_repository.iter_short_codes()] == [
+        data.short_code
+    ]
+    assert await redis_repository.rebuild() == 0
+    assert await redis_repository.get_long_url("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_iter_short_url_rows_reads_live_click_counts(
+    redis_repository, short_url_repository_fixture
+):
+    """Test that rows are ordered by MongoDB while click counts come from Redis."""
+    data: ShortURLDTO = ShortURLDTOFactory.build(
+        long_url="https://example.com/r/e", click_count=1
+    )
+    created = await short_url_repository_fixture.create(data)
+    await redis_repository.rebuild()
+    await redis_repository.increment_click_counts({data.short_code: 4})
+
+    assert [row async for row in redis_repository.iter_short_url_rows()] == [
+        (created.id, data.short_code, data.long_url, 5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_failed_entries_first_and_once(
+    redis_repository, short_url_repository_fixture, monkeypatch
+):
+    """
+    Test that a worker retries its own failed entries before newer ones and
+    that clicks already applied by a partly failed write are not added again.
+    """
+    first: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/r/h")
+    second: ShortURLDTO = ShortURLDTOFactory.build(long_url="https://example.com/r/i")
+    await redis_repository.create(first)
+    await redis_repository.create(second)
+    persister = OutboxPersister(redis_repository, block_ms=10)
+    await persister.ensure_group()
+    durable = short_url_repository_fixture
+    create_many = durable.create_many
+
+    async def failing_create_many(urls):
+        raise ConnectionError("MongoDB is down")
+
+    monkeypatch.setattr(durable, "create_many", failing_create_many)
+    with pytest.raises(ConnectionError):
+        await persister.persist(await persister._next_batch())
+    monkeypatch.setattr(durable, "create_many", create_many)
+
+    await redis_repository.increment_click_counts(
+        {first.short_code: 2, second.short_code: 3}
+    )
+    batch = await persister._next_batch()
+    assert [outbox_entry(fields)[0] for _, fields in batch] == [OUTBOX_CREATE] * 2
+    await persister.persist(batch)
+
+    increment_click_counts = durable.increment_click_counts
+
+    async def partly_failing_increment(counts):
+        applied = {first.short_code: counts.pop(first.short_code)}
+        await increment_click_counts(applied)
+        raise PartialWriteError("Failed to flush clicks.", counts)
+
+    monkeypatch.setattr(durable, "increment_click_counts", partly_failing_increment)
+    with pytest.raises(PartialWriteError):
+        await persister.persist(await persister._next_batch())
+    monkeypatch.setattr(durable, "increment_click_counts", increment_click_counts)
+    await persister.persist(await persister._next_batch())
+
+    assert await durable.get_click_count(first.short_code) == first.click_count + 2
+    assert await durable.get_click_count(second.short_code) == second.click_count + 3
+    assert await redis_repository.redis.xlen(redis_repository.outbox) == 0
+
+
+@pytest.mark.asyncio
+async def test_clicks_before_the_rebuild_are_kept(
+    redis_repository, short_url_repository_fixture
+):
+    """
+    Test that clicks on short codes not loaded yet are counted on reads, added
+    once the rebuild loads the code and queued for MongoDB, while clicks on
+    unknown codes are dropped.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(
+        long_url="https://example.com/r/f", click_count=1
+    )
+    await short_url_repository_fixture.create(data)
+
+    await redis_repository.increment_click_counts({data.short_code: 2, "missing": 1})
+    updated = await redis_repository.update_click_count(data.short_code)
+    assert updated.click_count == 4
+    assert await redis_repository.get_click_count(data.short_code) == 4
+
+    assert await redis_repository.rebuild() == 1
+    assert await redis_repository.get_click_count(data.short_code) == 4
+    assert not await redis_repository.redis.exists(redis_repository.pending_key)
+    persister = OutboxPersister(redis_repository, block_ms=10)
+    await persister.ensure_group()
+    await persister.persist(await persister._next_batch())
+    assert await short_url_repository_fixture.get_click_count(data.short_code) == 4
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_newer_records_and_waits_for_the_lock(
+    redis_repository, short_url_repository_fixture
+):
+    """
+    Test that loading never overwrites a record already in Redis and that a
+    worker finding the rebuild locked waits for the holder to finish.
+    """
+    data: ShortURLDTO = ShortURLDTOFactory.build(
+        long_url="https://example.com/r/g", click_count=1
+    )
+    await short_url_repository_fixture.create(data)
+    await redis_repository.redis.hset(
+        redis_repository.code_key(data.short_code),
+        mapping={"u": data.long_url, "n": 9, "i": "newer"},
+    )
+    await redis_repository.redis.set(redis_repository.rebuild_lock_key, "other")
+
+    waiting = asyncio.create_task(redis_repository.rebuild(poll_interval=0.01))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    await redis_repository.redis.delete(redis_repository.rebuild_lock_key)
+
+    assert await waiting == 0
+    assert await redis_repository.get_click_count(data.short_code) == 9
+    assert not await redis_repository.redis.exists(redis_repository.rebuild_lock_key)
@@ -1,5 +1,15 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, call
+
 import pytest
+from app.adapters.db.mongo_db import (
+    ensure_short_link_indexes,
+    shard_short_link_collection,
+)
+from app.adapters.db.mongo_db.migrations import backfill_long_url_hashes
+from app.core.errors import DuplicateEntityError, PartialWriteError
 from app.entities.short_url.short_url_dto import ShortURLDTO
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from repository.test_factory_dto_short_url import ShortURLDTOFactory
 
 
@@ -50,3 +60,253 @@ async def test_update_click_count(short_url_repository_fixture):
         data.short_code
     )
     assert (data.click_count + 1) == result_after_update.click_count
+
+
+@pytest.mark.asyncio
+async def test_increment_click_counts(short_url_repository_fixture):
+    """
+    Test that aggregated clicks for several short URLs are applied
+    with a single bulk update.
+    """
+    first: ShortURLDTO = ShortURLDTOFactory.build()
+    second: ShortURLDTO = ShortURLDTOFactory.build()
+    await short_url_repository_fixture.create(first)
+    await short_url_repository_fixture.create(second)
+
+    await short_url_repository_fixture.increment_click_counts(
+        {first.short_code: 3, second.short_code: 1}
+    )
+
+    assert await short_url_repository_fixture.get_click_count(first.short_code) == (
+        first.click_count + 3
+    )
+    assert await short_url_repository_fixture.get_click_count(second.short_code) == (
+        second.click_count + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_long_url(short_url_repository_fixture):
+    """Test that only the long URL is returned for an existing short code."""
+    data: ShortURLDTO = ShortURLDTOFactory.build()
+    await short_url_repository_fixture.create(data)
+
+    assert (
+        await short_url_repository_fixture.get_long_url(data.short_code)
+        == data.long_url
+    )
+    assert await short_url_repository_fixture.get_long_url("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_create_many(short_url_repository_fixture):
+    """
+    Test that bulk creation returns already stored long URLs as they are,
+    inserts new ones and reports short code conflicts separately.
+    """
+    existing: ShortURLDTO = ShortURLDTOFactory.build()
+    await short_url_repository_fixture.create(existing)
+    new: ShortURLDTO = ShortURLDTOFactory.build(long_url=f"{existing.long_url}new")
+    conflicting: ShortURLDTO = ShortURLDTOFactory.build(
+        long_url=f"{existing.long_url}conflicting", short_code=existing.short_code
+    )
+
+    stored, conflicts = await short_url_repository_fixture.create_many(
+        [ShortURLDTOFactory.build(long_url=existing.long_url), new, conflicting]
+    )
+
+    assert {url.short_code for url in stored} == {existing.short_code, new.short_code}
+    assert conflicts == [conflicting]
+    assert (
+        await short_url_repository_fixture.get_long_url(new.short_code) == new.long_url
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_long_url_hashes(short_url_repository_fixture):
+    """
+    Test that legacy documents without a long URL digest are backfilled,
+    after which creating the same long URL returns the legacy record.
+    """
+    legacy: ShortURLDTO = ShortURLDTOFactory.build()
+    await short_url_repository_fixture.collection.insert_one(
+        legacy.model_dump(exclude_none=True)
+    )
+
+    assert await backfill_long_url_hashes(short_url_repository_fixture.collection) == 1
+    result = await short_url_repository_fixture.create(
+        ShortURLDTOFactory.build(long_url=legacy.long_url)
+    )
+    assert result.short_code == legacy.short_code
+
+
+@pytest.mark.asyncio
+async def test_iter_top_short_urls(short_url_repository_fixture):
+    """Test that the most clicked short URLs come first and the limit applies."""
+    hot = [ShortURLDTOFactory.build(click_count=1_000_000_000 + i) for i in range(3)]
+    for url in hot:
+        await short_url_repository_fixture.create(url)
+
+    top = [
+        url.short_code
+        async for url in short_url_repository_fixture.iter_top_short_urls(2)
+    ]
+
+    assert top == [hot[2].short_code, hot[1].short_code]
+
+
+@pytest.mark.asyncio
+async def test_iter_short_url_rows_resumes_after_id(short_url_repository_fixture):
+    """Test that rows come in ID order as tuples and resume after a given ID."""
+    urls = [ShortURLDTOFactory.build(click_count=i) for i in range(3)]
+    for url in urls:
+        await short_url_repository_fixture.create(url)
+    expected = [
+        (url.id, url.short_code, url.long_url, url.click_count)
+        for url in sorted(urls, key=lambda url: url.id)
+    ]
+
+    rows = [row async for row in short_url_repository_fixture.iter_short_url_rows()]
+    resumed = [
+        row
+        async for row in short_url_repository_fixture.iter_short_url_rows(
+            after=expected[0][0], batch_size=1
+        )
+    ]
+
+    assert rows == expected
+    assert resumed == expected[1:]
+
+
+@pytest.mark.asyncio
+async def test_expired_short_urls_are_missing(short_url_repository_fixture):
+    """
+    Test that an expired short URL is reported missing before the TTL monitor
+    removes it, and that its long URL can be shortened again.
+    """
+    expires_at = datetime.now(UTC).replace(microsecond=0) + timedelta(days=1)
+    live = ShortURLDTOFactory.build(expires_at=expires_at)
+    expired = ShortURLDTOFactory.build(expires_at=datetime.now(UTC) - timedelta(1))
+    await short_url_repository_fixture.create(live)
+    await short_url_repository_fixture.create(expired)
+
+    assert await short_url_repository_fixture.get_long_url_with_expiry(
+        live.short_code
+    ) == (live.long_url, expires_at)
+    assert (
+        await short_url_repository_fixture.get_by_short_code(expired.short_code) is None
+    )
+    assert await short_url_repository_fixture.get_long_url_with_expiry(
+        expired.short_code
+    ) == (None, None)
+
+    renewed = ShortURLDTOFactory.build(long_url=expired.long_url)
+    result = await short_url_repository_fixture.create(renewed)
+    assert result.short_code == renewed.short_code
+    assert result.expires_at is None
+
+
+@pytest.mark.asyncio
+async def test_shard_short_link_collection():
+    """
+    Test that the hashed short code index exists before the collection is
+    sharded on it.
+    """
+    collection = MagicMock(full_name="link_minimizer.short_urls")
+    collection.database.name = "link_minimizer"
+    collection.create_index = AsyncMock()
+    collection.database.client.admin.command = AsyncMock()
+    calls = MagicMock()
+    calls.attach_mock(collection.create_index, "create_index")
+    calls.attach_mock(collection.database.client.admin.command, "command")
+
+    await shard_short_link_collection(collection)
+
+    assert calls.mock_calls == [
+        call.create_index([("short_code", "hashed")]),
+        call.command("enableSharding", "link_minimizer"),
+        call.command(
+            "shardCollection",
+            "link_minimizer.short_urls",
+            key={"short_code": "hashed"},
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sharded_indexes_do_not_require_unique_long_urls(mongo_db):
+    """
+    Test that switching a collection to sharded keeps short codes unique and
+    replaces the unique long URL digest index by a plain one, and back.
+    """
+    collection = mongo_db["sharded_short_urls"]
+    await ensure_short_link_indexes(collection)
+    await ensure_short_link_indexes(collection, sharded=True)
+    sharded = await collection.index_information()
+    await ensure_short_link_indexes(collection)
+    unsharded = await collection.index_information()
+    await collection.drop()
+
+    assert sharded["short_code_1"].get("unique") is True
+    assert "long_url_hash_1" not in sharded
+    assert not sharded["long_url_hash_sharded"].get("unique")
+    assert "long_url_hash_sharded" not in unsharded
+    assert unsharded["long_url_hash_1"].get("unique") is True
+
+
+@pytest.mark.asyncio
+async def test_increment_click_counts_reports_failed_updates(
+    short_url_repository_fixture, monkeypatch
+):
+    """Test that a partly failed bulk update reports only the failed short codes."""
+
+    async def partial_bulk_write(requests, ordered):
+        raise BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 2, "errmsg": "boom"}]}
+        )
+
+    monkeypatch.setattr(
+        short_url_repository_fixture.collection, "bulk_write", partial_bulk_write
+    )
+
+    with pytest.raises(PartialWriteError) as error:
+        await short_url_repository_fixture.increment_click_counts({"a": 1, "b": 2})
+    assert error.value.failed == {"b": 2}
+
+
+@pytest.mark.asyncio
+async def test_create_retries_when_the_conflicting_long_url_is_gone(
+    short_url_repository_fixture, monkeypatch
+):
+    """
+    Test that a long URL digest conflict whose record can no longer be read
+    back is retried instead of failing, and that a conflict which keeps
+    recurring raises DuplicateEntityError.
+    """
+    collection = short_url_repository_fixture.collection
+    insert_one = collection.insert_one
+    conflict = DuplicateKeyError(
+        "duplicate", 11000, {"keyPattern": {"long_url_hash": 1}}
+    )
+    attempts = []
+
+    async def insert_after_a_conflict(document):
+        attempts.append(document)
+        if len(attempts) == 1:
+            raise conflict
+        return await insert_one(document)
+
+    monkeypatch.setattr(collection, "insert_one", insert_after_a_conflict)
+    data: ShortURLDTO = ShortURLDTOFactory.build()
+    data.id = None
+    created = await short_url_repository_fixture.create(data)
+    assert created.id is not None
+    assert len(attempts) == 2
+    assert (
+        await short_url_repository_fixture.get_long_url(data.short_code)
+        == data.long_url
+    )
+
+    monkeypatch.setattr(collection, "insert_one", AsyncMock(side_effect=conflict))
+    with pytest.raises(DuplicateEntityError):
+        await short_url_repository_fixture.create(ShortURLDTOFactory.build())
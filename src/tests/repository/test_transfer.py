@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from app.adapters.db.mongo_db.transfer import (
+    CSV,
+    JSONL,
+    Progress,
+    export_short_urls,
+    import_short_urls,
+    read_rows,
+)
+from app.entities.short_url.short_url_dto import ShortURLDTO
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_format", [JSONL, CSV])
+async def test_export_then_import_round_trip(
+    short_url_repository_fixture, mongo_collection, file_format
+):
+    """
+    Test that an export imported into an empty collection restores IDs, codes
+    and click counts, and that importing it again skips every row.
+    """
+    urls = [
+        ShortURLDTO(
+            long_url=f"https://example.com/{i}", short_code=f"t{i}", click_count=i
+        )
+        for i in range(25)
+    ]
+    await short_url_repository_fixture.create_many(urls)
+    stream = io.StringIO()
+
+    written = await export_short_urls(
+        short_url_repository_fixture, stream, file_format, batch_size=10
+    )
+    await mongo_collection.delete_many({})
+    announced: list[str] = []
+
+    async def announce(imported: list[ShortURLDTO]) -> None:
+        announced.extend(url.short_code for url in imported)
+
+    progress = Progress("import", stream=io.StringIO())
+    stream.seek(0)
+    imported, skipped, failed = await import_short_urls(
+        short_url_repository_fixture,
+        read_rows(stream, file_format),
+        batch_size=4,
+        concurrency=2,
+        progress=progress,
+        on_imported=announce,
+    )
+
+    assert written == imported == progress.rows == 25
+    assert skipped == failed == 0
+    assert sorted(announced) == sorted(url.short_code for url in urls)
+    restored = [url async for url in short_url_repository_fixture.iter_short_urls()]
+    assert restored == urls
+
+    stream.seek(0)
+    assert await import_short_urls(
+        short_url_repository_fixture, read_rows(stream, file_format), batch_size=10
+    ) == (0, 25, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_follow_up_is_finished_by_running_the_import_again(
+    short_url_repository_fixture,
+):
+    """
+    Test that a failing follow-up neither stops the other batches nor loses
+    its rows: they are counted, and the next run hands them over again.
+    """
+    urls = [
+        ShortURLDTO(long_url=f"https://example.com/f/{i}", short_code=f"f{i}")
+        for i in range(6)
+    ]
+    followed: list[str] = []
+
+    async def load(imported: list[ShortURLDTO]) -> None:
+        if any(url.short_code == "f0" for url in imported):
+            raise ConnectionError("Redis is down")
+        followed.extend(url.short_code for url in imported)
+
+    assert await import_short_urls(
+        short_url_repository_fixture, iter(urls), batch_size=2, on_imported=load
+    ) == (6, 0, 2)
+    assert sorted(followed) == ["f2", "f3", "f4", "f5"]
+
+    async def retry(imported: list[ShortURLDTO]) -> None:
+        followed.extend(url.short_code for url in imported)
+
+    followed.clear()
+    assert await import_short_urls(
+        short_url_repository_fixture, iter(urls), batch_size=2, on_imported=retry
+    ) == (0, 6, 0)
+    assert sorted(followed) == [url.short_code for url in urls]
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from app.adapters.cache.short_url_cache import get_short_url_cache
+from app.adapters.db.memory_db.short_url_repository import InMemoryShortURLRepository
+from app.entities.short_url.short_url_dto import ShortURLDTO
+from app.use_cases.cache_warmer import CacheWarmer, entry_bytes
+
+
+async def _repository(count: int) -> InMemoryShortURLRepository:
+    repo = InMemoryShortURLRepository()
+    for i in range(count):
+        await repo.create(
+            ShortURLDTO(
+                long_url=f"https://example.com/warm/{i}",
+                short_code=f"warm{i}",
+                click_count=i,
+            )
+        )
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_warm_preloads_the_most_clicked_short_urls():
+    """Test that the top N short URLs by clicks land in both cache entries."""
+    cache = get_short_url_cache()
+    cache.local.clear()
+    warmer = CacheWarmer(await _repository(5), top_n=3, batch_size=2)
+
+    assert await warmer.warm() == 3
+
+    for i in (4, 3, 2):
+        _, long_url = await cache.get_long_url_with_ttl(f"warm{i}")
+        assert long_url == f"https://example.com/warm/{i}"
+    assert (await cache.get_long_url_with_ttl("warm1"))[1] is None
+    entity = await cache.get_entity("warm4")
+    assert entity.long_url == "https://example.com/warm/4"
+    assert cache.local.get(cache.long_url_key("warm4")) is not None
+    await cache.redis.delete(
+        *(cache.long_url_key(f"warm{i}") for i in range(5)),
+        *(cache.entity_key(f"warm{i}") for i in range(5)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_warm_stops_at_the_memory_budget():
+    """Test that a run stops before the estimated cache bytes exceed the budget."""
+    repo = await _repository(3)
+    first = await repo.get_by_short_code(short_code="warm2")
+    warmer = CacheWarmer(repo, top_n=3, memory_budget=entry_bytes(first) + 1)
+
+    assert await warmer.warm() == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_stops_at_the_time_budget():
+    """Test that a slow repository cannot hold a run past its time budget."""
+    repo = await _repository(1)
+
+    async def slow_top(limit, batch_size=1_000):
+        await asyncio.sleep(10)
+        yield await repo.get_by_short_code(short_code="warm0")
+
+    repo.iter_top_short_urls = slow_top
+    warmer = CacheWarmer(repo, time_budget=0.05)
+
+    assert await asyncio.wait_for(warmer.warm(), timeout=1) == 0
@@ -0,0 +1,161 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.adapters.db.memory_db.click_stats_repository import (
+    InMemoryClickStatsRepository,
+)
+from app.core.errors import PartialWriteError, RepositoryError
+from app.entities.click_stats.click_buckets import HOUR
+from app.entities.short_url.short_url_entity import ShortURLEntity
+from app.use_cases.click_aggregator import ClickAggregator
+from app.use_cases.short_url_use_case import ShortURLUseCase
+from use_cases.test_factory_entity_short_url import ShortURLEntityFactory
+
+
+@pytest.mark.asyncio
+async def test_clicks_are_buffered_until_flush(short_url_repository_fixture):
+    """
+    Test that clicks are kept in memory and written with a single flush,
+    while the use case already reports them in the click count.
+    """
+    aggregator = ClickAggregator(short_url_repository_fixture, flush_interval=60)
+    use_case = ShortURLUseCase(
+        short_url_repository_fixture, click_aggregator=aggregator
+    )
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build(click_count=0)
+    await use_case.create(url_entity)
+
+    for _ in range(3):
+        await use_case.update_click_count(url_entity.short_code)
+
+    assert (
+        await short_url_repository_fixture.get_click_count(url_entity.short_code) == 0
+    )
+    assert await use_case.get_click_count(url_entity.short_code) == 3
+
+    await aggregator.flush()
+
+    assert aggregator.pending(url_entity.short_code) == 0
+    assert (
+        await short_url_repository_fixture.get_click_count(url_entity.short_code) == 3
+    )
+    assert await use_case.get_click_count(url_entity.short_code) == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_clicks(short_url_repository_fixture):
+    """Test that stopping the aggregator writes out the clicks still pending."""
+    aggregator = ClickAggregator(short_url_repository_fixture, flush_interval=60)
+    aggregator.start()
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build(click_count=0)
+    await ShortURLUseCase(short_url_repository_fixture).create(url_entity)
+
+    aggregator.add(url_entity.short_code, 5)
+    await aggregator.stop()
+
+    assert (
+        await short_url_repository_fixture.get_click_count(url_entity.short_code) == 5
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_clicks(short_url_repository_fixture, monkeypatch):
+    """Test that clicks survive a failed flush and are retried by the next one."""
+
+    async def failing_increment(counts):
+        raise RepositoryError
+
+    aggregator = ClickAggregator(short_url_repository_fixture, flush_interval=60)
+    aggregator.add("code", 2)
+    monkeypatch.setattr(
+        short_url_repository_fixture, "increment_click_counts", failing_increment
+    )
+
+    with pytest.raises(RepositoryError):
+        await aggregator.flush()
+    assert aggregator.pending("code") == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flushes_back_off(short_url_repository_fixture, monkeypatch):
+    """
+    Test that failed flushes are retried after exponentially growing waits,
+    that piling up clicks does not cut the wait short, and that a successful
+    flush resets the backoff.
+    """
+    increment_click_counts = short_url_repository_fixture.increment_click_counts
+
+    async def failing_increment(counts):
+        raise RepositoryError
+
+    aggregator = ClickAggregator(
+        short_url_repository_fixture, flush_interval=1, max_pending=1, max_backoff=3
+    )
+    monkeypatch.setattr(
+        short_url_repository_fixture, "increment_click_counts", failing_increment
+    )
+    waits = []
+    for _ in range(3):
+        aggregator.add("code")
+        assert aggregator._wakeup.is_set()
+        aggregator._wakeup.clear()
+        with pytest.raises(RepositoryError):
+            await aggregator.flush()
+        waits.append(aggregator._retry_at - time.monotonic())
+        aggregator.add("other")
+        assert not aggregator._wakeup.is_set()
+        aggregator._retry_at = 0.0
+    assert waits == pytest.approx([1, 2, 3], abs=0.1)
+
+    monkeypatch.setattr(
+        short_url_repository_fixture, "increment_click_counts", increment_click_counts
+    )
+    await aggregator.flush()
+    assert aggregator._failures == 0
+    assert aggregator._retry_at == 0.0
+
+
+@pytest.mark.asyncio
+async def test_partly_applied_flush_keeps_only_failed_clicks(
+    short_url_repository_fixture, monkeypatch
+):
+    """
+    Test that after a partly applied bulk update only the clicks of the failed
+    updates are retried, so applied ones are not counted twice.
+    """
+
+    async def partial_increment(counts):
+        raise PartialWriteError("partial", {"failed": counts["failed"]})
+
+    aggregator = ClickAggregator(short_url_repository_fixture, flush_interval=60)
+    aggregator.add("applied", 3)
+    aggregator.add("failed", 2)
+    monkeypatch.setattr(
+        short_url_repository_fixture, "increment_click_counts", partial_increment
+    )
+
+    with pytest.raises(PartialWriteError):
+        await aggregator.flush()
+    assert aggregator.pending("applied") == 0
+    assert aggregator.pending("failed") == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_adds_clicks_to_time_buckets(short_url_repository_fixture):
+    """Test that a flushed batch lands in the buckets of its first click."""
+    click_stats = InMemoryClickStatsRepository()
+    aggregator = ClickAggregator(
+        short_url_repository_fixture, flush_interval=60, click_stats=click_stats
+    )
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build(click_count=0)
+    await ShortURLUseCase(short_url_repository_fixture).create(url_entity)
+    before = datetime.now(UTC)
+
+    aggregator.add(url_entity.short_code, 2)
+    await aggregator.flush()
+
+    buckets = await click_stats.get_buckets(
+        url_entity.short_code, HOUR, before, datetime.now(UTC) + timedelta(hours=1)
+    )
+    assert sum(buckets.values()) == 2
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from app.use_cases.short_code_allocator import (
+    BASE62_ALPHABET,
+    BlockShortCodeAllocator,
+    encode_id,
+    permute,
+)
+
+
+def test_permute_is_a_bijection():
+    """Test that the keyed permutation maps a domain onto itself without collisions."""
+    domain = 62**2
+    assert sorted(permute(value, domain, b"key") for value in range(domain)) == list(
+        range(domain)
+    )
+
+
+def test_encode_id_grows_code_length_when_keyspace_is_exhausted():
+    """
+    Test that IDs fill the shortest keyspace first and then produce longer codes,
+    without ever repeating a code.
+    """
+    codes = [
+        encode_id(short_id, "secret", min_length=1) for short_id in range(62 + 100)
+    ]
+
+    assert {len(code) for code in codes[:62]} == {1}
+    assert {len(code) for code in codes[62:]} == {2}
+    assert len(set(codes)) == len(codes)
+    assert all(char in BASE62_ALPHABET for code in codes for char in code)
+
+
+@pytest.mark.asyncio
+async def test_block_allocators_never_collide(id_block_repository_fixture):
+    """
+    Test that allocators of different workers lease disjoint ID blocks
+    and hand out distinct codes.
+    """
+    allocators = [
+        BlockShortCodeAllocator(id_block_repository_fixture, block_size=10)
+        for _ in range(3)
+    ]
+
+    codes = await asyncio.gather(
+        *(allocator.allocate() for allocator in allocators for _ in range(25))
+    )
+
+    assert len(set(codes)) == len(codes)
@@ -1,6 +1,10 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
 import pytest
+from app.adapters.cache.short_code_filter import ShortCodeFilter
+from app.adapters.cache.short_url_cache import get_short_url_cache
 from app.core.errors import DuplicateEntityError
 from app.entities.short_url.short_url_entity import ShortURLEntity
 from use_cases.test_factory_entity_short_url import ShortURLEntityFactory
@@ -67,7 +71,166 @@ async def test_update_click_count(short_url_use_case_fixture):
     before_update = await short_url_use_case_fixture.create(url_entity)
 
     await short_url_use_case_fixture.update_click_count(url_entity.short_code)
-    after_update = await short_url_use_case_fixture.get_by_short_code(
-        short_code=url_entity.short_code
+    after_update = await short_url_use_case_fixture.get_click_count(
+        url_entity.short_code
+    )
+    assert before_update.click_count + 1 == after_update
+
+
+@pytest.mark.asyncio
+async def test_cached_short_url_is_served_without_the_repository(
+    short_url_use_case_fixture,
+):
+    """
+    Test that a short URL found in the cache is returned without reading the
+    repository.
+    """
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build()
+    created = await short_url_use_case_fixture.create(url_entity)
+    await short_url_use_case_fixture.get_by_short_code(short_code=created.short_code)
+
+    repo = short_url_use_case_fixture.repo
+    with patch.object(repo, "get_by_short_code") as get_by_short_code, patch.object(
+        repo, "get_click_count"
+    ) as get_click_count:
+        cached = await short_url_use_case_fixture.get_by_short_code(
+            short_code=created.short_code
+        )
+    assert cached.long_url == created.long_url
+    get_by_short_code.assert_not_called()
+    get_click_count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_long_url(short_url_use_case_fixture):
+    """
+    Test that a short code resolves to the plain long URL string,
+    and that an unknown code resolves to None.
+    """
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build()
+    await short_url_use_case_fixture.create(url_entity)
+
+    assert (
+        await short_url_use_case_fixture.resolve_long_url(
+            short_code=url_entity.short_code
+        )
+        == url_entity.long_url
     )
-    assert before_update.click_count + 1 == after_update.click_count
+    assert (
+        await short_url_use_case_fixture.resolve_long_url(
+            short_code=url_entity.short_code + "wrong"
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_many_regenerates_only_conflicting_codes(
+    short_url_use_case_fixture,
+):
+    """
+    Test that bulk creation retries only the items whose short code collided
+    and returns results in input order.
+    """
+    taken: ShortURLEntity = ShortURLEntityFactory.build()
+    await short_url_use_case_fixture.create(taken)
+    url_entities = [
+        ShortURLEntityFactory.build(long_url=f"https://example.com/bulk/{i}")
+        for i in range(3)
+    ]
+    codes = iter([taken.short_code, "bulk1", "bulk2", "bulk3"])
+
+    with patch.object(
+        ShortURLEntity, "generate_short_url", side_effect=lambda: next(codes)
+    ):
+        result = await short_url_use_case_fixture.create_many(url_entities)
+
+    assert [url.long_url for url in result] == [url.long_url for url in url_entities]
+    assert [url.short_code for url in result] == ["bulk3", "bulk1", "bulk2"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_short_code_is_rejected_without_io(short_url_use_case_fixture):
+    """
+    Test that a short code unknown to the short code filter is answered
+    without reaching the cache or the repository.
+    """
+    short_code_filter = ShortCodeFilter(capacity=100, error_rate=0.001)
+    short_code_filter.ready = True
+    with patch(
+        "app.use_cases.short_url_use_case.short_code_filter", short_code_filter
+    ), patch.object(
+        short_url_use_case_fixture.repo, "get_long_url_with_expiry"
+    ) as get_long_url:
+        assert (
+            await short_url_use_case_fixture.resolve_long_url(short_code="abcde")
+            is None
+        )
+    get_long_url.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(short_url_use_case_fixture):
+    """
+    Test that concurrent lookups of an uncached short code
+    reach the repository only once.
+    """
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build()
+    await short_url_use_case_fixture.create(url_entity)
+    get_long_url = short_url_use_case_fixture.repo.get_long_url_with_expiry
+
+    with patch.object(
+        short_url_use_case_fixture.repo,
+        "get_long_url_with_expiry",
+        side_effect=get_long_url,
+    ) as patched:
+        results = await asyncio.gather(
+            *(
+                short_url_use_case_fixture.resolve_long_url(
+                    short_code=url_entity.short_code
+                )
+                for _ in range(20)
+            )
+        )
+
+    assert results == [url_entity.long_url] * 20
+    patched.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_expired_short_url_skips_the_repository(short_url_use_case_fixture):
+    """
+    Test that caching a short URL until its expiry also records the expiry,
+    that once it has passed lookups answer None without the repository, and
+    that issuing the code again drops it.
+    """
+    expires_at = datetime.now(UTC).replace(microsecond=0) + timedelta(seconds=30)
+    url_entity: ShortURLEntity = ShortURLEntityFactory.build(expires_at=expires_at)
+    await short_url_use_case_fixture.create(url_entity)
+    short_code = url_entity.short_code
+    assert (
+        await short_url_use_case_fixture.resolve_long_url(short_code=short_code)
+        == url_entity.long_url
+    )
+    cache = get_short_url_cache()
+    assert await cache.get_expiry(short_code) == expires_at
+
+    # The cached entries expired with the short URL.
+    await cache.redis.delete(cache.long_url_key(short_code))
+    cache.local.clear()
+    await cache.set_expiry(short_code, datetime.now(UTC) - timedelta(seconds=1))
+    repo = short_url_use_case_fixture.repo
+    with patch.object(repo, "get_long_url_with_expiry") as get_long_url, patch.object(
+        repo, "get_by_short_code"
+    ) as get_by_short_code:
+        assert await short_url_use_case_fixture._load_long_url(short_code) is None
+        assert (
+            await short_url_use_case_fixture._get_by_short_code(short_code=short_code)
+            is None
+        )
+    get_long_url.assert_not_called()
+    get_by_short_code.assert_not_called()
+
+    # The code may be issued again once the expired short URL is gone.
+    await short_url_use_case_fixture._announce_created([short_code])
+    assert await cache.get_expiry(short_code) is None
@@ -1,3 +1,5 @@
+import shlex
+
 from invoke import task
 
 DOCKER_TAG = "link_minimizer"
@@ -26,3 +28,49 @@ def test_full(ctx):
         "docker-compose -f docker-compose-dev.yml "
         "-f docker-compose-test.yml up --abort-on-container-exit"
     )
+
+
+@task
+def backfill_long_url_hashes(ctx):
+    ctx.run(
+        "python -m app.adapters.db.mongo_db.migrations",
+        env={"PYTHONPATH": "src"},
+    )
+
+
+@task(
+    help={
+        "path": "JSONL or CSV file to write, or - for stdout.",
+        "format": "jsonl or csv; taken from the file extension by default.",
+        "batch_size": "Documents fetched per cursor round trip.",
+    }
+)
+def export_short_urls(ctx, path, format="", batch_size=10_000):
+    options = f"--batch-size {batch_size}" + (f" --format {format}" if format else "")
+    ctx.run(
+        f"python -m app.adapters.db.mongo_db.transfer export {shlex.quote(path)} {options}",
+        env={"PYTHONPATH": "src"},
+    )
+
+
+@task(
+    help={
+        "path": "JSONL or CSV file to read, or - for stdin.",
+        "format": "jsonl or csv; taken from the file extension by default.",
+        "batch_size": "Documents per unordered insert_many.",
+        "concurrency": "Inserts running at once.",
+        "announce": "Tell running workers about the imported short codes.",
+    }
+)
+def import_short_urls(
+    ctx, path, format="", batch_size=5_000, concurrency=4, announce=True
+):
+    options = f"--batch-size {batch_size} --concurrency {concurrency}"
+    if format:
+        options += f" --format {format}"
+    if not announce:
+        options += " --no-announce"
+    ctx.run(
+        f"python -m app.adapters.db.mongo_db.transfer import {shlex.quote(path)} {options}",
+        env={"PYTHONPATH": "src"},
+    )